@@ -1,10 +1,18 @@
+import hmac
 from datetime import timedelta
-from typing import Optional, Tuple
+from typing import List, Optional, Set, Tuple
 
 from entities.entites import UserPydantic
 from entities.models import db
-from entities.types import SessionStatus
-from flask import Flask, Response, jsonify, render_template, request
+from entities.types import Difficulty, GameOptions
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    render_template,
+    request,
+    stream_with_context,
+)
 from flask_api import status
 from flask_cors import CORS
 from flask_jwt_extended import (
@@ -15,11 +23,27 @@ from flask_jwt_extended import (
     jwt_required,
 )
 from repos.db_repo import GameDBRepo, UserDBRepo, UserSessionDBRepo
-from settings import get_db_url, settings
+from repos.identity_map import IdentityMap, current_identity_map
+from repos.managers import default_win_length
+from repos.replicas import (
+    READ_PRIMARY_COOKIE,
+    ReadScope,
+    choose_replica,
+    current_read_scope,
+)
+from repos.unit_of_work import UnitOfWork
+from settings import get_db_url, get_engine_options, get_replica_binds, settings
 from use_cases.use_case import UserUseCase
+from utils.exceptions import StaleGameException
+from utils.pool import InstrumentedPool
 
 app = Flask(__name__)
 app.config["SQLALCHEMY_DATABASE_URI"] = get_db_url()
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    **get_engine_options(),
+    "poolclass": InstrumentedPool,
+}
+app.config["SQLALCHEMY_BINDS"] = get_replica_binds()
 app.config["JWT_SECRET_KEY"] = settings.jwt_secret
 db.init_app(app)
 
@@ -28,12 +52,118 @@ CORS(app)
 
 jwt = JWTManager(app)
 
+REPLICAS: List[str] = list(app.config["SQLALCHEMY_BINDS"])
+# endpoints whose GET only reads, served from replica when there is one
+READ_ONLY_ENDPOINTS: Set[str] = {"account_detail", "play_start", "high_scores"}
+
 player = UserUseCase(
     db_repo=UserDBRepo, user_session_repo=UserSessionDBRepo, game_db_repo=GameDBRepo
 )
 
 
+@app.before_request
+def open_identity_map() -> None:
+    """Entities read during request are kept for its other reads."""
+    IdentityMap().open()
+
+
+@app.before_request
+def open_read_scope() -> None:
+    """
+    Read-only requests read from replica, unless client wrote within
+    replica lag and sends READ_PRIMARY_COOKIE back.
+    """
+    replica: Optional[str] = None
+    if (
+        request.method == "GET"
+        and request.endpoint in READ_ONLY_ENDPOINTS
+        and READ_PRIMARY_COOKIE not in request.cookies
+    ):
+        replica = choose_replica(REPLICAS)
+    ReadScope(replica).open()
+
+
+@app.before_request
+def authorize_internal() -> Optional[Tuple[Response, int]]:
+    """/internal/ endpoints need settings.internal_token as Bearer token."""
+    if not request.path.startswith("/internal/"):
+        return None
+    if not settings.internal_token:
+        return jsonify({"error": "Internal endpoints are disabled"}), 403
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme != "Bearer" or not hmac.compare_digest(
+        token.encode(), settings.internal_token.encode()
+    ):
+        return jsonify({"error": "Invalid internal token"}), 401
+    return None
+
+
+@app.after_request
+def add_queries_saved(response: Response) -> Response:
+    if (identity_map := current_identity_map()) is not None:
+        response.headers["X-Queries-Saved"] = str(identity_map.queries_saved)
+    return response
+
+
+@app.after_request
+def set_read_primary_cookie(response: Response) -> Response:
+    """Client that just wrote reads its write from the primary."""
+    scope: Optional[ReadScope] = current_read_scope()
+    if REPLICAS and scope is not None and scope.wrote:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, "1", max_age=settings.db.replica_lag, httponly=True
+        )
+    return response
+
+
+@app.teardown_request
+def close_identity_map(error: Optional[BaseException]) -> None:
+    if (identity_map := current_identity_map()) is not None:
+        identity_map.close()
+
+
+@app.teardown_request
+def close_read_scope(error: Optional[BaseException]) -> None:
+    if (scope := current_read_scope()) is not None:
+        scope.close()
+
+
+@app.errorhandler(StaleGameException)
+def stale_game(error: StaleGameException) -> Tuple[Response, int]:
+    """Move raced another one of the same game, unit of work is rolled back."""
+    return jsonify({"error": str(error)}), status.HTTP_409_CONFLICT
+
+
+def with_etag(response: Response, etag: Optional[str]) -> Response:
+    """Tag response, client has to revalidate it on every use."""
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def not_modified(etag: Optional[str]) -> Optional[Tuple[Response, int]]:
+    """304 response when client already has representation tagged etag."""
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    return with_etag(Response(), etag), status.HTTP_304_NOT_MODIFIED
+
+
+def game_options() -> GameOptions:
+    """
+    Read new game options from query string: difficulty, board size and
+    line length needed to win, e.g. ?size=15&win_length=5.
+    """
+    size: int = request.args.get("size", 3, type=int)
+    return GameOptions(
+        difficulty=request.args.get("difficulty", Difficulty.EASY.value),
+        size=size,
+        win_length=request.args.get("win_length", default_win_length(size), type=int),
+    )
+
+
 @app.route("/register", methods=["POST"])
+@UnitOfWork()
 def register() -> Tuple[Response, int]:
     """
     Simple register view.
@@ -66,18 +196,27 @@ def login() -> Tuple[Response, int]:
 @app.route("/account", methods=["GET"])
 @jwt_required()
 def account_detail() -> Tuple[Response, int]:
-    """Returns account details."""
+    """
+    Returns account details. Client sending ETag of current details in
+    If-None-Match gets 304, checked on user row version only.
+    """
     current_user_id: str = get_jwt_identity()
+    if request.if_none_match and (
+        cached := not_modified(player.account_etag(current_user_id))
+    ):
+        return cached
     user: UserPydantic | None = player.get_user(id=current_user_id)
 
     if user:
         user_data: dict = user.dict(exclude={"password"})
-        return jsonify(user_data), status.HTTP_200_OK
+        etag: str = str(user.version)
+        return with_etag(jsonify(user_data), etag), status.HTTP_200_OK
     return jsonify({"message": "User not found"}), status.HTTP_404_NOT_FOUND
 
 
 @app.route("/account/update", methods=["PATCH"])
 @jwt_required()
+@UnitOfWork()
 def account_update() -> Tuple[Response, int]:
     """Updates account details."""
     current_user_id: int = get_jwt_identity()
@@ -91,30 +230,35 @@ def account_update() -> Tuple[Response, int]:
 
 @app.route("/session", methods=["GET"])
 @jwt_required()
+@UnitOfWork()
 def session() -> Tuple[Response, int]:
     """Starts game session and return object id."""
     current_user_id: int = get_jwt_identity()
     response: str
     status_code: int
-    response, status_code = player.start_session(user_id=current_user_id)
+    response, status_code = player.start_session(
+        user_id=current_user_id, options=game_options()
+    )
     return jsonify(response), status_code
 
 
 @app.route("/session/<int:session_id>/game", methods=["GET"])
 @jwt_required()
+@UnitOfWork()
 def new_game(session_id: int) -> Tuple[Response, int]:
     """Create new board for session. Return board id."""
     current_user_id: int = get_jwt_identity()
     response: str
     status_code: int
     response, status_code = player.create_new_game(
-        user_id=current_user_id, session_id=session_id
+        user_id=current_user_id, session_id=session_id, options=game_options()
     )
     return jsonify(response), status_code
 
 
 @app.route("/session/<int:session_id>/game/<int:board_id>", methods=["GET", "POST"])
 @jwt_required()
+@UnitOfWork()
 def play_start(session_id: int, board_id: int) -> Tuple[Response, int]:
     """Starts game session and return session id."""
     current_user_id: int = get_jwt_identity()
@@ -128,39 +272,54 @@ def play_start(session_id: int, board_id: int) -> Tuple[Response, int]:
     except BadRequest:
         data = None
 
-    session_status: SessionStatus = player.check_session_status(
-        session_id=session_id, user_id=current_user_id
-    )
-    if not session_status.active:
-        return jsonify(session_status.session_data), session_status.status_code
+    if request.method == "POST":
+        response, status_code = player.play_move(
+            session_id=session_id,
+            user_id=current_user_id,
+            game_id=board_id,
+            data=data or {},
+        )
+        return jsonify(response), status_code
 
-    is_finished, winner = player.check_game_status(
+    # GET only reads, so it can be served from replica and polled in parallel;
+    # polling client with current ETag gets 304 after a check of row versions
+    if request.if_none_match and (
+        cached := not_modified(
+            player.game_etag(
+                session_id=session_id, user_id=current_user_id, game_id=board_id
+            )
+        )
+    ):
+        return cached
+    response, status_code, etag = player.game_status(
         session_id=session_id, user_id=current_user_id, game_id=board_id
     )
-    if is_finished:
-        return jsonify(winner), status.HTTP_200_OK
+    return with_etag(jsonify(response), etag), status_code
 
-    if request.method == "POST" and data:
-        response, status_code = player.lets_play_POST(
-            session_id=session_id, user_id=current_user_id, data=data, game_id=board_id
-        )
-        # if status_code != status.HTTP_200_OK:
-        #     return jsonify(response), status_code
-        # response, status_code = player.random_move(
-        # session_id=session_id, user_id=current_user_id
-        # )
-        # is_finished, winner = player.check_game_status(
-        # session_id=session_id, user_id=current_user_id
-        # )
-        # # if is_finished:
-        # #     return jsonify({'winner': winner}), status.HTTP_200_OK
-        return jsonify(response), status_code
 
-    if request.method == "GET":
-        response, status_code = player.lets_play_GET(
-            session_id=session_id, user_id=current_user_id, game_id=board_id
-        )
+@app.route("/session/<int:session_id>/game/<int:board_id>/replay", methods=["GET"])
+@jwt_required()
+def replay(session_id: int, board_id: int) -> Response | Tuple[Response, int]:
+    """Streams game moves in order, one JSON object per line."""
+    current_user_id: int = get_jwt_identity()
+    response, status_code = player.replay(
+        session_id=session_id, user_id=current_user_id, game_id=board_id
+    )
+    if status_code != status.HTTP_200_OK:
         return jsonify(response), status_code
+    return Response(stream_with_context(response), mimetype="application/x-ndjson")
+
+
+@app.route("/internal/pool", methods=["GET"])
+def pool_stats() -> Tuple[Response, int]:
+    """
+    Live connection pool statistics of this worker. Meant for monitoring,
+    authorized by authorize_internal.
+    """
+    pool = db.engine.pool
+    if not isinstance(pool, InstrumentedPool):
+        return jsonify({"error": "Pool statistics are not collected"}), 404
+    return jsonify(pool.stats()), 200
 
 
 @app.route("/high_scores", methods=["GET"])
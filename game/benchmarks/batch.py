@@ -0,0 +1,63 @@
+"""
+Benchmark of the vectorized evaluator against GridManager called per board.
+
+Run from the ``game`` directory:
+
+    python -m benchmarks.batch [boards]
+"""
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from repos.batch import encode_boards, evaluate_boards
+from repos.managers import GridManager
+
+Board = List[List[Optional[str]]]
+
+
+def random_boards(count: int, size: int, seed: int = 0) -> List[Board]:
+    """Generate boards filled by random play up to random length."""
+    rnd: random.Random = random.Random(seed)
+    boards: List[Board] = []
+    for _ in range(count):
+        board: Board = GridManager.initialize_grid(size)
+        cells: List[int] = list(range(size * size))
+        rnd.shuffle(cells)
+        for ply, cell in enumerate(cells[: rnd.randint(0, len(cells))]):
+            board[cell // size][cell % size] = "XO"[ply % 2]
+        boards.append(board)
+    return boards
+
+
+def run(count: int = 100_000) -> Dict[int, Dict[str, float]]:
+    """Return boards per second for both approaches on 3x3 and 15x15 boards."""
+    results: Dict[int, Dict[str, float]] = {}
+    for size, number in ((3, count), (15, count // 10)):
+        boards: List[Board] = random_boards(number, size)
+        codes: np.ndarray = encode_boards(boards)
+
+        start: float = time.perf_counter()
+        for board in boards:
+            GridManager(board).check_game_state()
+        loop: float = time.perf_counter() - start
+
+        start = time.perf_counter()
+        evaluate_boards(codes)
+        batch: float = time.perf_counter() - start
+
+        results[size] = {"loop": number / loop, "batch": number / batch}
+    return results
+
+
+if __name__ == "__main__":
+    report: Dict[int, Dict[str, float]] = run(
+        int(sys.argv[1]) if sys.argv[1:] else 100_000
+    )
+    for size, row in report.items():
+        print(
+            f"{size:>2}x{size:<2}: loop {row['loop']:12,.0f} boards/s, "
+            f"batch {row['batch']:12,.0f} boards/s, "
+            f"speedup {row['batch'] / row['loop']:6.1f}x"
+        )
@@ -0,0 +1,61 @@
+"""
+Benchmark of packed board column against the nested JSON document it replaced.
+
+Run from the ``game`` directory:
+
+    python -m benchmarks.columns
+"""
+import json
+import timeit
+from typing import Callable, Dict, List
+
+from benchmarks.batch import Board, random_boards
+from entities.columns import BOARD_KEY, PackedBoard
+from sqlalchemy.dialects import postgresql
+from sqlalchemy_json import NestedMutable
+
+
+def _per_board(func: Callable[[], None], count: int) -> float:
+    """Return best microseconds per board of five runs."""
+    return min(timeit.repeat(func, number=1, repeat=5)) / count * 1e6
+
+
+def run(count: int = 2_000) -> Dict[int, Dict[str, float]]:
+    """Return stored bytes and microseconds per write and load for both columns."""
+    column: PackedBoard = PackedBoard()
+    dialect = postgresql.dialect()
+    results: Dict[int, Dict[str, float]] = {}
+    for size in (3, 15):
+        boards: List[Board] = random_boards(count, size)
+        documents: List[str] = [json.dumps({BOARD_KEY: board}) for board in boards]
+        packed: List[bytes] = [column.process_bind_param(b, dialect) for b in boards]
+        results[size] = {
+            "json_bytes": sum(map(len, documents)) / count,
+            "packed_bytes": sum(map(len, packed)) / count,
+            "json_write": _per_board(
+                lambda: [json.dumps({BOARD_KEY: board}) for board in boards], count
+            ),
+            "json_load": _per_board(
+                lambda: [NestedMutable.coerce(None, json.loads(d)) for d in documents],
+                count,
+            ),
+            "packed_write": _per_board(
+                lambda: [column.process_bind_param(b, dialect) for b in boards],
+                count,
+            ),
+            "packed_load": _per_board(
+                lambda: [column.process_result_value(v, dialect) for v in packed],
+                count,
+            ),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for size, row in run().items():
+        print(
+            f"{size:>2}x{size:<2}: json {row['json_bytes']:7.1f} B, "
+            f"write {row['json_write']:6.2f} us, load {row['json_load']:6.2f} us | "
+            f"packed {row['packed_bytes']:5.1f} B, "
+            f"write {row['packed_write']:6.2f} us, load {row['packed_load']:6.2f} us"
+        )
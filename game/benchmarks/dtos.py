@@ -0,0 +1,90 @@
+"""
+Benchmark of DTOs built from rows without validation against validating
+constructor used before.
+
+Run from the ``game`` directory:
+
+    python -m benchmarks.dtos
+"""
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from entities.columns import BOARD_KEY
+from entities.entites import GameListPydantic, UserSessionListPydantic
+from entities.models import Game, UserSession
+from repos.managers import GridManager
+
+
+def _sessions(count: int) -> List[UserSession]:
+    now: datetime = datetime.now()
+    return [
+        UserSession(
+            id=num,
+            score=random.randint(0, 10),
+            user_id=num,
+            status="finished",
+            created_at=now - timedelta(minutes=5),
+            ended_at=now,
+        )
+        for num in range(count)
+    ]
+
+
+def _games(count: int) -> List[Game]:
+    return [
+        Game(
+            id=num,
+            board={BOARD_KEY: GridManager.initialize_grid(3)},
+            user_id=num,
+            symbol="X",
+            winner=None,
+            session_id=num,
+            status="in_progress",
+            difficulty="easy",
+            size=3,
+            win_length=3,
+        )
+        for num in range(count)
+    ]
+
+
+def _per_row(func: Callable[[], object], count: int) -> float:
+    """Return best microseconds per row of five runs."""
+    return min(timeit.repeat(func, number=1, repeat=5)) / count * 1e6
+
+
+def run(count: int = 5_000) -> Dict[str, Dict[str, float]]:
+    """Return microseconds per row for validated and trusted construction."""
+    sessions: List[UserSession] = _sessions(count)
+    games: List[Game] = _games(count)
+    return {
+        "sessions": {
+            "validated": _per_row(
+                lambda: UserSessionListPydantic(
+                    __root__=[obj.__dict__ for obj in sessions]
+                ),
+                count,
+            ),
+            "from_rows": _per_row(
+                lambda: UserSessionListPydantic.from_rows(sessions), count
+            ),
+        },
+        "games": {
+            "validated": _per_row(
+                lambda: GameListPydantic(__root__=[obj.__dict__ for obj in games]),
+                count,
+            ),
+            "from_rows": _per_row(lambda: GameListPydantic.from_rows(games), count),
+        },
+    }
+
+
+if __name__ == "__main__":
+    for name, row in run().items():
+        print(
+            f"{name:>8}: validated {row['validated']:6.2f} us, "
+            f"from_rows {row['from_rows']:6.2f} us per row "
+            f"({row['validated'] / row['from_rows']:.1f}x)"
+        )
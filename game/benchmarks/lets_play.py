@@ -0,0 +1,147 @@
+"""
+Benchmark of move request, POST of app.play_start: play_move with UPDATE ...
+RETURNING against the select, setattr, commit and refresh update it replaced,
+with whole request in one unit of work and with identity map, as app.py
+runs it.
+
+Whole games are played against in-memory SQLite, user always takes the first
+free field. Statements are counted on the engine, ``--rtt`` adds milliseconds
+of network latency to every one of them. Run from the ``game`` directory:
+
+    python -m benchmarks.lets_play --games 200 --rtt 0.5
+"""
+import argparse
+import random
+import sys
+import time
+from contextlib import ExitStack
+from typing import Dict, List, Tuple, Type
+
+from entities.columns import BOARD_KEY
+from entities.entites import GamePydantic, UserPydantic, UserSessionPydantic
+from entities.models import Game, User, UserSession, db
+from entities.types import GameStatus
+from flask import Flask
+from repos.db_repo import GameDBRepo, UserDBRepo, UserSessionDBRepo
+from repos.identity_map import IdentityMap
+from repos.managers import GridManager
+from repos.unit_of_work import UnitOfWork
+from sqlalchemy import event
+from use_cases.use_case import UserUseCase
+
+
+def _legacy_update(repo, dto: Type, obj, **kwargs):
+    """Update as it was done before: select, setattr, commit and refresh."""
+    instance = repo.model.query.filter_by(id=obj.id).first()
+    if instance:
+        for key, val in kwargs.items():
+            setattr(instance, key, val)
+        db.session.commit()
+        db.session.refresh(instance)
+        return dto(**instance.__dict__)
+    return None
+
+
+class LegacyUserDBRepo(UserDBRepo):
+    def update_fields(self, obj, **kwargs):
+        return _legacy_update(self, UserPydantic, obj, **kwargs)
+
+
+class LegacyUserSessionDBRepo(UserSessionDBRepo):
+    def update_fields(self, obj, **kwargs):
+        return _legacy_update(self, UserSessionPydantic, obj, **kwargs)
+
+
+class LegacyGameDBRepo(GameDBRepo):
+    def update_fields(self, obj, **kwargs):
+        return _legacy_update(self, GamePydantic, obj, **kwargs)
+
+
+def make_app() -> Flask:
+    app: Flask = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    return app
+
+
+def play(
+    use_case: UserUseCase, games: int, rtt: float, request_scope: Tuple = ()
+) -> Dict[str, float]:
+    """Play games through move requests, return statements and ms per request."""
+    issued: List[int] = [0]
+
+    def on_statement(*_) -> None:
+        issued[0] += 1
+        if rtt:
+            time.sleep(rtt / 1000)
+
+    user = User.create(email="bench@example.com", password="bench", credits=10)
+    session = UserSession.create(user_id=user["id"])
+    requests: int = 0
+    seconds: float = 0.0
+    for _ in range(games):
+        User.update(user["id"], credits=10)
+        game_id: int = Game.create(
+            user_id=user["id"],
+            session_id=session["id"],
+            symbol="X",
+            status=GameStatus.IN_PROGRESS.value,
+            board={BOARD_KEY: GridManager.initialize_grid(3)},
+        )["id"]
+        while (
+            game := db.session.get(Game, game_id)
+        ).status != GameStatus.FINISHED.value:
+            row, col = GridManager(game.board[BOARD_KEY]).find_free_spots()[0]
+            data: dict = {"row": row + 1, "col": col + 1}
+            db.session.commit()  # end read transaction outside of measured request
+
+            event.listen(db.engine, "before_cursor_execute", on_statement)
+            event.listen(db.engine, "commit", on_statement)
+            start: float = time.perf_counter()
+            with ExitStack() as stack:
+                for scope in request_scope:
+                    stack.enter_context(scope())
+                use_case.play_move(session["id"], user["id"], game_id, data)
+            seconds += time.perf_counter() - start
+            event.remove(db.engine, "before_cursor_execute", on_statement)
+            event.remove(db.engine, "commit", on_statement)
+            requests += 1
+    return {
+        "requests": requests,
+        "statements": issued[0] / requests,
+        "ms": seconds / requests * 1000,
+    }
+
+
+def run(games: int = 200, rtt: float = 0.0) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    legacy: List[Type] = [LegacyUserDBRepo, LegacyUserSessionDBRepo, LegacyGameDBRepo]
+    current: List[Type] = [UserDBRepo, UserSessionDBRepo, GameDBRepo]
+    request_scope: Tuple = (UnitOfWork, IdentityMap)
+    variants: Dict[str, Tuple[List[Type], Tuple]] = {
+        "select+refresh": (legacy, ()),
+        "returning": (current, ()),
+        "unit of work": (current, (UnitOfWork,)),
+        "identity map": (current, request_scope),
+    }
+    app: Flask = make_app()
+    for name, (repos, scope) in variants.items():
+        random.seed(0)
+        with app.app_context():
+            db.create_all()
+            results[name] = play(UserUseCase(*repos), games, rtt, scope)
+            db.session.remove()
+            db.drop_all()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--rtt", type=float, default=0.0, help="ms per statement")
+    args = parser.parse_args(sys.argv[1:])
+    for name, row in run(args.games, args.rtt).items():
+        print(
+            f"{name:>14}: {row['statements']:5.1f} statements, "
+            f"{row['ms']:6.2f} ms per request ({row['requests']:.0f} requests)"
+        )
@@ -0,0 +1,97 @@
+"""
+Benchmark of GridManager against the list-of-lists board it replaced.
+
+Run from the ``game`` directory:
+
+    python -m benchmarks.managers
+"""
+import random
+import timeit
+from typing import Callable, Dict, List, Optional
+
+from repos.managers import GridManager
+
+Board = List[List[Optional[str]]]
+
+
+class LegacyGridManager:
+    """List-of-lists board, kept here only as a benchmark baseline."""
+
+    def __init__(self, fields: Board):
+        self._fields: Board = fields
+
+    def get_field(self, row: int, col: int) -> Optional[str]:
+        return self._fields[row][col]
+
+    def is_move_possible(self, row: int, col: int) -> bool:
+        return not self.get_field(row, col)
+
+    def find_free_spots(self) -> List[tuple[int, int]]:
+        free_spots: List = []
+        for row in range(3):
+            for col in range(3):
+                if not self.get_field(row, col):
+                    free_spots.append((row, col))
+        return free_spots
+
+    def check_game_state(self):
+        for element in range(3):
+            actual_row = [self.get_field(element, x_row) for x_row in range(3)]
+            if len(set(actual_row)) == 1 and actual_row[0]:
+                return True, actual_row[0]
+            actual_column = [self.get_field(x_col, element) for x_col in range(3)]
+            if len(set(actual_column)) == 1 and actual_column[0]:
+                return True, actual_column[0]
+        diagonal_1 = [self.get_field(num, num) for num in range(3)]
+        diagonal_2 = [self.get_field(num, 2 - num) for num in range(3)]
+        if len(set(diagonal_1)) == 1 and diagonal_1[0]:
+            return True, diagonal_1[0]
+        if len(set(diagonal_2)) == 1 and diagonal_2[0]:
+            return True, diagonal_2[0]
+        if not self.find_free_spots():
+            return True, None
+        return False, None
+
+
+def random_boards(count: int, seed: int = 0) -> List[Board]:
+    """Generate boards reached by random play, one per game length."""
+    rnd: random.Random = random.Random(seed)
+    boards: List[Board] = []
+    while len(boards) < count:
+        board: Board = [[None] * 3 for _ in range(3)]
+        cells: List[int] = list(range(9))
+        rnd.shuffle(cells)
+        for ply, cell in enumerate(cells[: rnd.randint(0, 9)]):
+            board[cell // 3][cell % 3] = "XO"[ply % 2]
+        boards.append(board)
+    return boards
+
+
+def play_request(manager_cls: Callable, board: Board) -> None:
+    """Mimic board work done by a single POST move request."""
+    manager = manager_cls(board)
+    manager.check_game_state()
+    manager.is_move_possible(1, 1)
+    manager.find_free_spots()
+    manager.check_game_state()
+    manager.check_game_state()
+
+
+def run(number: int = 20_000) -> Dict[str, float]:
+    """Return microseconds per simulated request for both implementations."""
+    boards: List[Board] = random_boards(256)
+    results: Dict[str, float] = {}
+    for name, manager_cls in (("legacy", LegacyGridManager), ("bitboard", GridManager)):
+        timer: timeit.Timer = timeit.Timer(
+            lambda: [play_request(manager_cls, board) for board in boards]
+        )
+        best: float = min(timer.repeat(repeat=5, number=max(1, number // 256)))
+        results[name] = best / (max(1, number // 256) * len(boards)) * 1e6
+    return results
+
+
+if __name__ == "__main__":
+    timings: Dict[str, float] = run()
+    for name, micro in timings.items():
+        print(f"{name:>10}: {micro:8.2f} us/request")
+    print(f"{'speedup':>10}: {timings['legacy'] / timings['bitboard']:8.2f}x")
@@ -0,0 +1,65 @@
+"""
+Self-play comparison of bot reply cache keyed by raw board against the one
+keyed by canonical board.
+
+Run from the ``game`` directory:
+
+    python -m benchmarks.symmetry [games]
+"""
+import random
+import sys
+import time
+from typing import Dict, Tuple
+
+from repos.managers import GridManager
+from repos.search import SearchEngine
+from repos.symmetry import Masks, SymmetricCache
+
+
+class PlainCache(SymmetricCache):
+    """Reply cache without canonicalization, kept here as a baseline."""
+
+    def key(self, masks: Masks, size: int, context: tuple) -> Tuple[tuple, int]:
+        return (size, context, masks), 0
+
+
+def self_play(engine: SearchEngine, games: int, seed: int = 0) -> None:
+    """Random player against the engine, both sides take turns starting."""
+    rnd: random.Random = random.Random(seed)
+    for game in range(games):
+        grid: GridManager = GridManager(GridManager.initialize_grid())
+        engine_symbol: str = "XO"[game % 2]
+        symbol: str = "X"
+        while not grid.check_game_state()[0]:
+            if symbol == engine_symbol:
+                move = engine.best_move(grid.get_board(), symbol)
+            else:
+                move = rnd.choice(grid.find_free_spots())
+            grid.make_move(*move, symbol)
+            symbol = "O" if symbol == "X" else "X"
+
+
+def run(games: int = 2000) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, cache_cls in (("plain", PlainCache), ("canonical", SymmetricCache)):
+        engine: SearchEngine = SearchEngine()
+        engine.replies = cache_cls()
+        start: float = time.perf_counter()
+        self_play(engine, games)
+        results[name] = {
+            "entries": len(engine.replies),
+            "hit_rate": engine.replies.hit_rate(),
+            "seconds": time.perf_counter() - start,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    report: Dict[str, Dict[str, float]] = run(
+        int(sys.argv[1]) if sys.argv[1:] else 2000
+    )
+    for name, row in report.items():
+        print(
+            f"{name:>10}: {row['entries']:6d} entries, "
+            f"hit rate {row['hit_rate']:6.1%}, {row['seconds']:6.2f} s"
+        )
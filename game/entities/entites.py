@@ -1,46 +1,100 @@
-from datetime import date
-from typing import Optional
+from collections.abc import Mapping
+from datetime import date, datetime
+from typing import Iterable, Optional, Type, TypeVar
 
+from entities.types import Difficulty
 from pydantic import BaseModel
 
+RowModelType = TypeVar("RowModelType", bound="RowModel")
+RowListModelType = TypeVar("RowListModelType", bound="RowListModel")
 
-class UserPydantic(BaseModel):
+
+class RowModel(BaseModel):
+    """
+    DTO of a database row. Columns already typed the values, so from_row
+    builds it without validation. Data from outside goes through constructor.
+    """
+
+    @classmethod
+    def from_row(cls: Type[RowModelType], row) -> RowModelType:
+        """Build from row mapping or ORM instance, taking only model fields."""
+        values: Mapping = row if isinstance(row, Mapping) else row.__dict__
+        fields: dict = {name: values[name] for name in cls.__fields__ if name in values}
+        if len(fields) < len(cls.__fields__):
+            # construct fills defaults of missing fields
+            return cls.construct(**fields)
+        dto: RowModelType = cls.__new__(cls)
+        object.__setattr__(dto, "__dict__", fields)
+        object.__setattr__(dto, "__fields_set__", set(fields))
+        dto._init_private_attributes()
+        return dto
+
+
+class RowListModel(BaseModel):
+    """List of RowModel DTOs built from rows without validation."""
+
+    @classmethod
+    def from_rows(cls: Type[RowListModelType], rows: Iterable) -> RowListModelType:
+        item: Type[RowModel] = cls.__fields__["__root__"].type_
+        return cls.construct(__root__=[item.from_row(row) for row in rows])
+
+
+class UserPydantic(RowModel):
     id: int
     password: str
     email: str
     credits: int
+    version: int = 1
 
 
-class UserListPydantic(BaseModel):
+class UserListPydantic(RowListModel):
     __root__: list[UserPydantic]
 
 
-class UserSessionPydantic(BaseModel):
+class UserSessionPydantic(RowModel):
     id: int
     score: Optional[int]
     user_id: int
     status: str
     ended_at: Optional[date] = None
+    # partition key, bounds updates to the partition of the row
+    created_at: Optional[datetime] = None
 
 
-class UserSessionListPydantic(BaseModel):
+class UserSessionListPydantic(RowListModel):
     __root__: list[UserSessionPydantic]
 
 
-class GamePydantic(BaseModel):
+class GamePydantic(RowModel):
     id: int
     board: dict
     user_id: int
     symbol: str
-    winner: Optional[int]
+    winner: Optional[bool]
     session_id: int
     status: str
+    difficulty: str = Difficulty.EASY.value
+    size: int = 3
+    win_length: int = 3
+    version: int = 1
+    # partition key, bounds updates to the partition of the row
+    created_at: Optional[datetime] = None
 
 
-class GameListPydantic(BaseModel):
+class GameListPydantic(RowListModel):
     __root__: list[GamePydantic]
 
 
+class GameMovePydantic(RowModel):
+    game_id: int
+    ply: int
+    cell: int
+
+
+class GameMoveListPydantic(RowListModel):
+    __root__: list[GameMovePydantic]
+
+
 class ScorePydantic(BaseModel):
     score: str
     user_name: str
@@ -1,32 +1,104 @@
 import random
 from datetime import datetime
+from typing import Optional
 
-from entities.types import GameStatus, SessionStatusStates
+from entities.columns import PackedBoard
+from entities.types import Difficulty, GameStatus, SessionStatusStates
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import CheckConstraint, Column, ForeignKey
-from sqlalchemy.dialects.postgresql import JSONB
+from repos.replicas import RoutingSession
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    ForeignKey,
+    Index,
+    RowMapping,
+    insert,
+    select,
+    update,
+)
 from sqlalchemy.orm import relationship
-from sqlalchemy_json import mutable_json_type
 
-db: SQLAlchemy = SQLAlchemy()
+db: SQLAlchemy = SQLAlchemy(session_options={"class_": RoutingSession})
+
+# session.info key with depth of open repos.unit_of_work.UnitOfWork blocks
+UNIT_OF_WORK: str = "unit_of_work"
 
 
 class BaseMixin:
     @classmethod
-    def create(cls, **kwargs) -> None:
-        """Save object to database"""
+    def create(cls, **kwargs) -> Optional[RowMapping]:
+        """
+        Save object to database. Saved row, with defaults filled by the
+        database, comes back from the same INSERT ... RETURNING statement.
+        """
         if kwargs:
-            instance = cls(**kwargs)  # noqa
-            db.session.add(instance)
-            db.session.commit()
+            row: RowMapping = (
+                db.session.execute(
+                    insert(cls.__table__)
+                    .values(**kwargs)
+                    .returning(*cls.__table__.columns)
+                )
+                .mappings()
+                .one()
+            )
+            cls.save()
+            return row
+        return None
+
+    @classmethod
+    def update(
+        cls,
+        id_: int,
+        expected_version: Optional[int] = None,
+        partition_key: Optional[datetime] = None,
+        **kwargs,
+    ) -> Optional[RowMapping]:
+        """
+        Update row by id with single UPDATE ... RETURNING and return saved row,
+        None if there is no such row. Names which are not columns are skipped,
+        same as setattr on loaded instance never reached the database.
+        Version column of the row, if it has one, is bumped. With
+        expected_version only row still at that version is updated, None is
+        returned as well when another transaction bumped it first.
+        partition_key is created_at of the row; table partitioned by it then
+        reads only the partition holding the row.
+        """
+        table = cls.__table__
+        values: dict = {key: val for key, val in kwargs.items() if key in table.c}
+        if values and "version" in table.c:
+            values["version"] = table.c.version + 1
+        where: list = [table.c.id == id_]
+        if expected_version is not None:
+            where.append(table.c.version == expected_version)
+        if partition_key is not None:
+            where.append(table.c.created_at == partition_key)
+        statement = (
+            update(table).where(*where).values(**values).returning(*table.c)
+            if values
+            else select(table).where(*where)
+        )
+        row: Optional[RowMapping] = (
+            db.session.execute(statement).mappings().one_or_none()
+        )
+        cls.save()
+        return row
 
     @classmethod
     def save(cls):
-        db.session.commit()
+        """
+        Commit changes, or only flush them when unit of work is open and
+        commits once at its end. Rows written with INSERT or UPDATE statements
+        don't refresh loaded instances, so they are expired as commit does.
+        """
+        if db.session.info.get(UNIT_OF_WORK):
+            db.session.flush()
+            db.session.expire_all()
+        else:
+            db.session.commit()
 
     @classmethod
-    def filter_by(cls, **kwargs):
-        return cls.query.filter_by(**kwargs)  # noqa
+    def filter_by(cls, *criteria, **kwargs):
+        return cls.query.filter_by(**kwargs).filter(*criteria)  # noqa
 
 
 class User(db.Model, BaseMixin):
@@ -35,6 +107,13 @@ class User(db.Model, BaseMixin):
     password = Column(db.String)
     email = Column(db.String, unique=True)
     credits = Column(db.Integer, default=10)
+    version = Column(
+        db.Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        doc="Bumped by every update, served as ETag.",
+    )
 
     __table_args__ = (CheckConstraint(credits >= 0, name="positive_credits_check"),)
 
@@ -52,17 +131,29 @@ class UserSession(db.Model, BaseMixin):
         default=SessionStatusStates.ACTIVE.value,
         doc="Session status. Active or Finished.",
     )
-    created_at = Column(db.DateTime, default=datetime.now)
+    created_at = Column(db.DateTime, nullable=False, default=datetime.now)
     ended_at = Column(db.DateTime, nullable=True)
 
+    # built by migrations.versions, listed here to keep metadata complete;
+    # manage.py partition-tables partitions it by month of created_at
+    __table_args__ = (
+        Index(
+            "session_user_active_idx",
+            user_id,
+            postgresql_where=status == SessionStatusStates.ACTIVE.value,
+        ),
+        Index("session_user_status_idx", user_id, status),
+        Index("session_ended_at_idx", ended_at.desc()),
+    )
+
 
 class Game(db.Model, BaseMixin):
     __tablename__ = "game"
     id = db.Column(db.Integer, primary_key=True)
     board = db.Column(
-        mutable_json_type(dbtype=JSONB, nested=True),
+        PackedBoard,
         nullable=True,
-        doc="Game board. Nested JSON with 3x3 matrix.",
+        doc="Game board, size x size matrix packed into symbol masks.",
     )
     user_id = db.Column(db.Integer, ForeignKey("users.id", ondelete="CASCADE"))
     symbol = db.Column(
@@ -84,8 +175,49 @@ class Game(db.Model, BaseMixin):
         default=GameStatus.NOT_STARTED.value,
         doc="Session status. Active or Finished.",
     )
+    difficulty = Column(
+        db.String,
+        default=Difficulty.EASY.value,
+        doc="Computer opponent. Easy plays random moves, hard searches the game tree.",
+    )
+    size = Column(db.SmallInteger, default=3, doc="Board is size x size fields.")
+    win_length = Column(
+        db.SmallInteger, default=3, doc="Symbols in a row needed to win."
+    )
+    created_at = Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.now,
+        doc="Partition key once table is partitioned by month of creation.",
+    )
+    version = Column(
+        db.Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        doc="Bumped by every update, served as ETag.",
+    )
     user = relationship("User")
     session = relationship("UserSession")
 
+    __table_args__ = (
+        Index("game_user_session_status_idx", user_id, session_id, status),
+    )
+
+
+class GameMove(db.Model, BaseMixin):
+    __tablename__ = "game_moves"
+    game_id = Column(
+        db.Integer, ForeignKey("game.id", ondelete="CASCADE"), primary_key=True
+    )
+    ply = Column(
+        db.SmallInteger,
+        primary_key=True,
+        doc="Move number from 0. User moves first, so makes even plies.",
+    )
+    cell = Column(
+        db.SmallInteger, nullable=False, doc="Field number, row * size + col."
+    )
+
 
-models_union = User | UserSession | Game
+models_union = User | UserSession | Game | GameMove
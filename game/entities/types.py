@@ -3,6 +3,8 @@ from enum import Enum
 
 Managers = namedtuple("Managers", ["UserManager", "UserSessionManager", "GridManager"])
 SessionStatus = namedtuple("SessionStatus", "active session_data status_code")
+# user, session and game DTOs of one move, game is None if session has no such game
+PlayState = namedtuple("PlayState", "user session game")
 
 
 class SessionStatusStates(Enum):
@@ -11,7 +13,20 @@ class SessionStatusStates(Enum):
     NEW = "new"
 
 
+class Difficulty(Enum):
+    EASY = "easy"
+    HARD = "hard"
+    UNBEATABLE = "unbeatable"
+
+
 class GameStatus(Enum):
     IN_PROGRESS = "in_progress"
     FINISHED = "finished"
     NOT_STARTED = "not_started"
+
+
+GameOptions = namedtuple(
+    "GameOptions",
+    "difficulty size win_length",
+    defaults=(Difficulty.EASY.value, 3, 3),
+)
@@ -1,7 +1,14 @@
 #!/bin/sh
 
-# Run manage.py to create database tables
+# Don't serve on a database left half migrated
+set -e
+
+# Run manage.py to apply pending database migrations and create partitions,
+# partitioning tables is a manual step, see README
 python manage.py
 
+# Solve 3x3 board for the unbeatable bot, workers map the file read-only
+python -m repos.policy
+
 # Start Flask using the flask run command
 flask run --host 0.0.0.0 --port 8001 --reload --debug
@@ -1,5 +1,59 @@
+"""
+Database maintenance.
+
+    python manage.py                        apply migrations, create partitions
+    python manage.py partition-tables       partition session and game tables
+    python manage.py partitions             create partitions of coming months
+    python manage.py detach --keep-months 6 detach older session and game months
+    python manage.py archive                move old finished sessions to archive
+"""
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+from typing import List
+
 from app import app
 from entities.models import db
+from migrations import migrate
+from migrations.partitions import detach_partitions, ensure_partitions
+from migrations.versions import MIGRATIONS
+from repos.archive import SessionArchive, archive_finished_sessions
+from settings import settings
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("migrate", "partition-tables", "partitions", "detach", "archive"),
+    )
+    parser.add_argument("--keep-months", type=int, default=12)
+    parser.add_argument(
+        "--older-than-days", type=int, default=settings.archive.older_than_days
+    )
+    args = parser.parse_args(argv)
+
+    with app.app_context():
+        if args.command in (None, "migrate", "partition-tables"):
+            migrate(db.engine, MIGRATIONS)
+        if args.command == "partition-tables":
+            migrate(db.engine, MIGRATIONS, manual=True)
+        if args.command in (None, "migrate", "partition-tables", "partitions"):
+            with db.engine.begin() as connection:
+                ensure_partitions(connection, date.today())
+        if args.command == "detach":
+            with db.engine.connect() as connection:
+                connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+                for name in detach_partitions(
+                    connection, date.today(), args.keep_months
+                ):
+                    print(f"detached {name}", flush=True)
+        if args.command == "archive":
+            cutoff: datetime = datetime.now() - timedelta(days=args.older_than_days)
+            archived: int = archive_finished_sessions(SessionArchive(), cutoff)
+            print(f"archived {archived} sessions", flush=True)
+
 
-with app.app_context():
-    db.create_all()
+if __name__ == "__main__":
+    main(sys.argv[1:])
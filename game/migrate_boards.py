@@ -0,0 +1,154 @@
+"""
+Move game.board from nested JSONB to packed bytea, see entities.columns.
+
+Run from the ``game`` directory, one step at a time:
+
+    python migrate_boards.py add         # add nullable board_packed column
+    python migrate_boards.py backfill    # pack existing rows in batches
+    python migrate_boards.py swap        # re-pack changed rows, swap columns
+
+Code reading JSON boards keeps working during add and backfill. Backfill
+commits every batch and can be stopped and started again. Games keep getting
+moves in the JSON column after their batch is packed, so swap locks the table,
+compares every packed board with its JSON one and re-packs rows added or
+changed meanwhile before the JSON column is dropped. It reads the whole table
+under the lock; run backfill right before it, so only few rows are re-packed.
+Swap must be followed by deploying code with PackedBoard column; migration 5
+of that code refuses to run while game rows still have JSON boards. Space of
+the old column is reclaimed by VACUUM FULL or pg_repack afterwards.
+"""
+import argparse
+import sys
+from typing import Dict, List, Optional, Sequence
+
+from app import app
+from entities.columns import pack_board
+from entities.models import db
+from sqlalchemy import text
+from sqlalchemy.engine import Row
+
+BATCH_SIZE: int = 10_000
+
+SELECT_BATCH = text(
+    "SELECT id, board FROM game "
+    "WHERE id > :last_id AND board IS NOT NULL AND board_packed IS NULL "
+    "ORDER BY id LIMIT :limit"
+)
+SELECT_PACKED = text(
+    "SELECT id, board, board_packed FROM game "
+    "WHERE id > :last_id AND board IS NOT NULL "
+    "ORDER BY id LIMIT :limit"
+)
+UPDATE_BATCH = text(
+    "UPDATE game SET board_packed = packed.board "
+    "FROM unnest(CAST(:ids AS integer[]), CAST(:boards AS bytea[])) "
+    "AS packed(id, board) "
+    "WHERE game.id = packed.id"
+)
+
+
+def _pack(board: dict | list) -> bytes:
+    if isinstance(board, dict):
+        board = next(iter(board.values()))
+    return pack_board(board)
+
+
+def packed_rows(rows: Sequence[Row]) -> Dict[str, List]:
+    """Pack JSON boards of selected rows into UPDATE_BATCH parameters."""
+    return {
+        "ids": [row.id for row in rows],
+        "boards": [_pack(row.board) for row in rows],
+    }
+
+
+def stale_rows(rows: Sequence[Row]) -> Dict[str, List]:
+    """
+    UPDATE_BATCH parameters of rows selected by SELECT_PACKED whose packed
+    board isn't their JSON board: never packed, or moved after packing.
+    """
+    ids: List[int] = []
+    boards: List[bytes] = []
+    for row in rows:
+        board: bytes = _pack(row.board)
+        if row.board_packed is None or bytes(row.board_packed) != board:
+            ids.append(row.id)
+            boards.append(board)
+    return {"ids": ids, "boards": boards}
+
+
+def add_column(session) -> None:
+    session.execute(
+        text("ALTER TABLE game ADD COLUMN IF NOT EXISTS board_packed bytea")
+    )
+    session.commit()
+
+
+def backfill(session, batch_size: int = BATCH_SIZE, commit: bool = True) -> int:
+    """Pack rows in id order, batch by batch. Return number of packed rows."""
+    last_id: int = 0
+    total: int = 0
+    while True:
+        rows: Sequence[Row] = session.execute(
+            SELECT_BATCH, {"last_id": last_id, "limit": batch_size}
+        ).all()
+        if not rows:
+            return total
+        session.execute(UPDATE_BATCH, packed_rows(rows))
+        if commit:
+            session.commit()
+        last_id = rows[-1].id
+        total += len(rows)
+        print(f"packed {total} rows, last id {last_id}", flush=True)
+
+
+def resync(session, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Re-pack rows whose packed board differs from JSON one, without commit.
+    Return number of re-packed rows.
+    """
+    last_id: int = 0
+    total: int = 0
+    while True:
+        rows: Sequence[Row] = session.execute(
+            SELECT_PACKED, {"last_id": last_id, "limit": batch_size}
+        ).all()
+        if not rows:
+            return total
+        params: Dict[str, List] = stale_rows(rows)
+        if params["ids"]:
+            session.execute(UPDATE_BATCH, params)
+        last_id = rows[-1].id
+        total += len(params["ids"])
+
+
+def swap_columns(session, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Bring every packed board up to date and replace JSON column, all in one
+    transaction. Return number of re-packed rows.
+    """
+    session.execute(text("LOCK TABLE game IN SHARE ROW EXCLUSIVE MODE"))
+    total: int = resync(session, batch_size)
+    print(f"re-packed {total} rows", flush=True)
+    session.execute(text("ALTER TABLE game DROP COLUMN board"))
+    session.execute(text("ALTER TABLE game RENAME COLUMN board_packed TO board"))
+    session.commit()
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("step", choices=("add", "backfill", "swap"))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    with app.app_context():
+        if args.step == "add":
+            add_column(db.session)
+        elif args.step == "backfill":
+            backfill(db.session, args.batch_size)
+        else:
+            swap_columns(db.session, args.batch_size)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,94 @@
+"""
+Versioned schema migrations.
+
+Migrations in migrations.versions are applied in version order, each one
+once; applied versions are kept in schema_migrations table. Startup reads that
+table and runs only what is pending instead of inspecting every table,
+see manage.py.
+
+Transactional migration runs with its version row in one transaction.
+Migration with ``transactional=False`` runs statement by statement in
+autocommit mode, which CREATE INDEX CONCURRENTLY needs, and is recorded after
+the last statement; its statements must be safe to run again after failure.
+Migration with ``manual=True`` is left out of startup migrate; it locks or
+rewrites tables and runs only when asked for, see manage.py partition-tables.
+Advisory lock keeps two starting containers from migrating at once.
+"""
+from collections import namedtuple
+from typing import Iterable, List, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+Migration = namedtuple(
+    "Migration",
+    "version name statements transactional manual",
+    defaults=(True, False),
+)
+
+# pg_advisory_lock key, any number other tools don't use
+LOCK_KEY: int = 7_300_017
+
+CREATE_VERSIONS_TABLE = text(
+    "CREATE TABLE IF NOT EXISTS schema_migrations ("
+    "version INTEGER PRIMARY KEY, "
+    "name VARCHAR NOT NULL, "
+    "applied_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now())"
+)
+SELECT_VERSIONS = text("SELECT version FROM schema_migrations")
+INSERT_VERSION = text(
+    "INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"
+)
+
+
+def pending(
+    migrations: Iterable[Migration], applied: Set[int], manual: bool = False
+) -> List[Migration]:
+    """
+    Return migrations not applied yet, in version order. Manual ones only
+    when manual is True.
+    """
+    return sorted(
+        (
+            migration
+            for migration in migrations
+            if migration.version not in applied and (manual or not migration.manual)
+        ),
+        key=lambda migration: migration.version,
+    )
+
+
+def apply(engine: Engine, connection: Connection, migration: Migration) -> None:
+    """Run migration statements and record its version."""
+    version: dict = {"version": migration.version, "name": migration.name}
+    if migration.transactional:
+        with engine.begin() as transaction:
+            for statement in migration.statements:
+                transaction.execute(text(statement))
+            transaction.execute(INSERT_VERSION, version)
+        return
+    for statement in migration.statements:
+        connection.execute(text(statement))
+    connection.execute(INSERT_VERSION, version)
+
+
+def migrate(
+    engine: Engine, migrations: Iterable[Migration], manual: bool = False
+) -> List[Migration]:
+    """Apply pending migrations, manual ones too if asked. Return the applied."""
+    applied: List[Migration] = []
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": LOCK_KEY})
+        try:
+            connection.execute(CREATE_VERSIONS_TABLE)
+            done: Set[int] = set(connection.execute(SELECT_VERSIONS).scalars())
+            for migration in pending(migrations, done, manual):
+                print(f"applying {migration.version:04d} {migration.name}", flush=True)
+                apply(engine, connection, migration)
+                applied.append(migration)
+        finally:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY}
+            )
+    return applied
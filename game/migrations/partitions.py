@@ -0,0 +1,159 @@
+"""
+Monthly range partitions of session and game tables.
+
+Both tables are partitioned by created_at once manual migration 3 ran with
+``python manage.py partition-tables``, one partition per calendar month
+named like session_p2026_10. ensure_partitions creates the current month
+and MONTHS_AHEAD months after it; manage.py runs it on every start and
+should be run monthly with ``python manage.py partitions`` as well. Rows of
+months without partition go to DEFAULT partition, like session_default, so
+inserts don't fail when that run is missed; the next run moves them into
+their month partitions. Tables not partitioned yet are skipped.
+
+detach_partitions takes months older than retention out of the tables. A
+detached partition stays as a plain table, to be archived or dropped, but
+queries, vacuum and indexes of the partitioned table no longer touch it.
+"""
+from datetime import date
+from typing import List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PARTITIONED_TABLES = ("session", "game")
+MONTHS_AHEAD: int = 3
+
+SELECT_PARTITIONS = text(
+    "SELECT child.relname FROM pg_inherits "
+    "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+    "WHERE parent.relname = :table"
+)
+SELECT_PARTITIONED = text(
+    "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+    "JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid "
+    "WHERE pg_class.relname = :table)"
+)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of month months after the month of given day."""
+    index: int = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Month of partition named by partition_name, None for other names."""
+    prefix: str = f"{table}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        year, month = name[len(prefix) :].split("_")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        return None
+
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+    return bool(connection.execute(SELECT_PARTITIONED, {"table": table}).scalar())
+
+
+def default_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def create_default_partition(table: str) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {default_name(table)} "
+        f"PARTITION OF {table} DEFAULT"
+    )
+
+
+def select_default_months(table: str) -> str:
+    return (
+        "SELECT DISTINCT date_trunc('month', created_at)::date "
+        f"FROM {default_name(table)}"
+    )
+
+
+def create_partition(table: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+    )
+
+
+def move_from_default(connection: Connection, table: str, month: date) -> None:
+    """
+    Create partition of month with rows DEFAULT partition holds for it.
+    Default partition is detached meanwhile: partition of its rows can't be
+    created next to it, and delete triggers cloned to it mustn't fire.
+    """
+    default: str = default_name(table)
+    rows: str = (
+        f"FROM {default} "
+        f"WHERE created_at >= '{month}' AND created_at < '{add_months(month, 1)}'"
+    )
+    connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    connection.execute(text(create_partition(table, month)))
+    connection.execute(text(f"INSERT INTO {table} SELECT * {rows}"))
+    connection.execute(text(f"DELETE {rows}"))
+    connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+
+
+def ensure_partitions(
+    connection: Connection, today: date, months_ahead: int = MONTHS_AHEAD
+) -> None:
+    """
+    Create DEFAULT partition, partitions of the current month and
+    months_ahead next ones, and of months rows in DEFAULT partition belong to.
+    """
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(connection, table):
+            continue
+        connection.execute(text(create_default_partition(table)))
+        names = connection.execute(SELECT_PARTITIONS, {"table": table}).scalars()
+        existing: Set[date] = {partition_month(table, name) for name in names}
+        caught: Set[date] = set(
+            connection.execute(text(select_default_months(table))).scalars()
+        )
+        coming: Set[date] = {
+            add_months(today, months) for months in range(months_ahead + 1)
+        }
+        for month in sorted((coming | caught) - existing):
+            if month in caught:
+                move_from_default(connection, table, month)
+            else:
+                connection.execute(text(create_partition(table, month)))
+
+
+def detach_partitions(
+    connection: Connection, today: date, keep_months: int
+) -> List[str]:
+    """
+    Detach partitions of months before the last keep_months ones. Return
+    names of detached tables. Connection must be in autocommit mode,
+    DETACH ... CONCURRENTLY doesn't run inside transaction.
+    """
+    if keep_months < 1:
+        raise ValueError("Current month partition is never detached")
+    first_kept: date = add_months(today, 1 - keep_months)
+    detached: List[str] = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(connection, table):
+            continue
+        names = connection.execute(SELECT_PARTITIONS, {"table": table}).scalars()
+        for name in sorted(names):
+            month: Optional[date] = partition_month(table, name)
+            if month is None or month >= first_kept:
+                continue
+            connection.execute(
+                text(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY")
+            )
+            detached.append(name)
+    return detached
@@ -0,0 +1,257 @@
+"""
+Schema history. Append new migrations with the next version number, never
+edit applied ones. Keep entities.models in step with what they create.
+"""
+from typing import Tuple
+
+from migrations import Migration
+
+# Tables as create_all made them before migrations existed, so databases
+# created that way take this version as already there.
+INITIAL_SCHEMA = Migration(
+    version=1,
+    name="initial schema",
+    statements=(
+        "CREATE TABLE IF NOT EXISTS users ("
+        "id SERIAL PRIMARY KEY, "
+        "password VARCHAR, "
+        "email VARCHAR UNIQUE, "
+        "credits INTEGER, "
+        "CONSTRAINT positive_credits_check CHECK (credits >= 0))",
+        "CREATE TABLE IF NOT EXISTS session ("
+        "id SERIAL PRIMARY KEY, "
+        "score INTEGER, "
+        "user_id INTEGER REFERENCES users (id) ON DELETE CASCADE, "
+        "status VARCHAR, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE, "
+        "ended_at TIMESTAMP WITHOUT TIME ZONE)",
+        "CREATE TABLE IF NOT EXISTS game ("
+        "id SERIAL PRIMARY KEY, "
+        "board JSONB, "
+        "user_id INTEGER REFERENCES users (id) ON DELETE CASCADE, "
+        "symbol VARCHAR(1) NOT NULL, "
+        "winner BOOLEAN, "
+        "session_id INTEGER REFERENCES session (id) ON DELETE SET NULL, "
+        "status VARCHAR)",
+    ),
+)
+
+# Indexes of hot path lookups, built without blocking writes. Index left
+# invalid by failed CONCURRENTLY build is dropped and built again on retry.
+HOT_PATH_INDEXES = Migration(
+    version=2,
+    name="hot path indexes",
+    statements=(
+        # active session of user, looked up by start_session and create_new_game
+        "DROP INDEX CONCURRENTLY IF EXISTS session_user_active_idx",
+        "CREATE INDEX CONCURRENTLY session_user_active_idx "
+        "ON session (user_id) WHERE status = 'active'",
+        "DROP INDEX CONCURRENTLY IF EXISTS session_user_status_idx",
+        "CREATE INDEX CONCURRENTLY session_user_status_idx "
+        "ON session (user_id, status)",
+        # high scores, newest finished sessions first
+        "DROP INDEX CONCURRENTLY IF EXISTS session_ended_at_idx",
+        "CREATE INDEX CONCURRENTLY session_ended_at_idx ON session (ended_at DESC)",
+        # games of session by status, e.g. game in progress
+        "DROP INDEX CONCURRENTLY IF EXISTS game_user_session_status_idx",
+        "CREATE INDEX CONCURRENTLY game_user_session_status_idx "
+        "ON game (user_id, session_id, status)",
+    ),
+    transactional=False,
+)
+
+# Deletes foreign keys to partitioned session and game can't cascade: moves
+# of a deleted game go, games of a deleted session lose session_id. Also when
+# they are deleted by cascade from users.
+CASCADE_TRIGGERS: Tuple[str, ...] = (
+    "CREATE OR REPLACE FUNCTION game_delete_moves() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ BEGIN "
+    "DELETE FROM game_moves WHERE game_id = OLD.id; "
+    "RETURN NULL; END $$",
+    "DROP TRIGGER IF EXISTS game_delete_moves ON game",
+    "CREATE TRIGGER game_delete_moves AFTER DELETE ON game "
+    "FOR EACH ROW EXECUTE FUNCTION game_delete_moves()",
+    # games start after their session, so created_at prunes partitions
+    "CREATE OR REPLACE FUNCTION session_detach_games() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ BEGIN "
+    "UPDATE game SET session_id = NULL "
+    "WHERE user_id = OLD.user_id AND session_id = OLD.id "
+    "AND created_at >= OLD.created_at; "
+    "RETURN NULL; END $$",
+    "DROP TRIGGER IF EXISTS session_detach_games ON session",
+    "CREATE TRIGGER session_detach_games AFTER DELETE ON session "
+    "FOR EACH ROW EXECUTE FUNCTION session_detach_games()",
+)
+
+# session and game become tables partitioned by month of created_at, see
+# migrations.partitions. Rows are copied into new partitioned tables which
+# then take the old names; id sequences are kept. Primary key of partitioned
+# table must contain created_at, so foreign keys to session.id and game.id
+# can't stay, CASCADE_TRIGGERS do their deletes. Both tables are locked for
+# the copy and its indexes, so it is manual: ``manage.py partition-tables``
+# runs it in maintenance window, after all other migrations.
+PARTITION_BY_CREATED_AT = Migration(
+    version=3,
+    name="partition session and game by created_at",
+    statements=(
+        "UPDATE session SET created_at = COALESCE(ended_at, now()) "
+        "WHERE created_at IS NULL",
+        "ALTER TABLE game ADD COLUMN IF NOT EXISTS "
+        "created_at TIMESTAMP WITHOUT TIME ZONE",
+        "UPDATE game SET created_at = session.created_at FROM session "
+        "WHERE game.session_id = session.id AND game.created_at IS NULL",
+        "UPDATE game SET created_at = now() WHERE created_at IS NULL",
+        "ALTER TABLE game_moves DROP CONSTRAINT IF EXISTS game_moves_game_id_fkey",
+        "ALTER TABLE game DROP CONSTRAINT IF EXISTS game_session_id_fkey",
+        "CREATE TABLE session_partitioned ("
+        "id INTEGER NOT NULL DEFAULT nextval('session_id_seq'), "
+        "score INTEGER, "
+        "user_id INTEGER, "
+        "status VARCHAR, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(), "
+        "ended_at TIMESTAMP WITHOUT TIME ZONE, "
+        "PRIMARY KEY (id, created_at), "
+        "CONSTRAINT session_user_id_fkey FOREIGN KEY (user_id) "
+        "REFERENCES users (id) ON DELETE CASCADE"
+        ") PARTITION BY RANGE (created_at)",
+        "CREATE TABLE game_partitioned ("
+        "id INTEGER NOT NULL DEFAULT nextval('game_id_seq'), "
+        "board BYTEA, "
+        "user_id INTEGER, "
+        "symbol VARCHAR(1) NOT NULL, "
+        "winner BOOLEAN, "
+        "session_id INTEGER, "
+        "status VARCHAR, "
+        "difficulty VARCHAR, "
+        "size SMALLINT, "
+        "win_length SMALLINT, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(), "
+        "version INTEGER NOT NULL DEFAULT 1, "
+        "PRIMARY KEY (id, created_at), "
+        "CONSTRAINT game_user_id_fkey FOREIGN KEY (user_id) "
+        "REFERENCES users (id) ON DELETE CASCADE"
+        ") PARTITION BY RANGE (created_at)",
+        # monthly partitions from the oldest row up to MONTHS_AHEAD from now,
+        # later months are added by migrations.partitions.ensure_partitions
+        "DO $$ DECLARE month date; BEGIN "
+        "FOR month IN SELECT generate_series(date_trunc('month', LEAST("
+        "(SELECT min(created_at) FROM session), "
+        "(SELECT min(created_at) FROM game), now())), "
+        "date_trunc('month', now()) + interval '3 months', interval '1 month') "
+        "LOOP "
+        "EXECUTE format('CREATE TABLE %I PARTITION OF session_partitioned "
+        "FOR VALUES FROM (%L) TO (%L)', "
+        "'session_p' || to_char(month, 'YYYY_MM'), month, "
+        "month + interval '1 month'); "
+        "EXECUTE format('CREATE TABLE %I PARTITION OF game_partitioned "
+        "FOR VALUES FROM (%L) TO (%L)', "
+        "'game_p' || to_char(month, 'YYYY_MM'), month, "
+        "month + interval '1 month'); "
+        "END LOOP; END $$",
+        "INSERT INTO session_partitioned "
+        "(id, score, user_id, status, created_at, ended_at) "
+        "SELECT id, score, user_id, status, created_at, ended_at FROM session",
+        "INSERT INTO game_partitioned "
+        "(id, board, user_id, symbol, winner, session_id, status, difficulty, "
+        "size, win_length, created_at, version) "
+        "SELECT id, board, user_id, symbol, winner, session_id, status, "
+        "difficulty, size, win_length, created_at, version FROM game",
+        "ALTER SEQUENCE session_id_seq OWNED BY NONE",
+        "ALTER SEQUENCE game_id_seq OWNED BY NONE",
+        "DROP TABLE game",
+        "DROP TABLE session",
+        "ALTER TABLE session_partitioned RENAME TO session",
+        "ALTER TABLE game_partitioned RENAME TO game",
+        "ALTER INDEX session_partitioned_pkey RENAME TO session_pkey",
+        "ALTER INDEX game_partitioned_pkey RENAME TO game_pkey",
+        "ALTER SEQUENCE session_id_seq OWNED BY session.id",
+        "ALTER SEQUENCE game_id_seq OWNED BY game.id",
+        # indexes of migration 2, now created on every partition
+        "CREATE INDEX session_user_active_idx "
+        "ON session (user_id) WHERE status = 'active'",
+        "CREATE INDEX session_user_status_idx ON session (user_id, status)",
+        "CREATE INDEX session_ended_at_idx ON session (ended_at DESC)",
+        "CREATE INDEX game_user_session_status_idx "
+        "ON game (user_id, session_id, status)",
+    )
+    + CASCADE_TRIGGERS,
+    manual=True,
+)
+
+# row versions served as ETag, constant default adds them without rewrite
+ROW_VERSIONS = Migration(
+    version=4,
+    name="row versions",
+    statements=(
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS "
+        "version INTEGER NOT NULL DEFAULT 1",
+        "ALTER TABLE game ADD COLUMN IF NOT EXISTS "
+        "version INTEGER NOT NULL DEFAULT 1",
+    ),
+)
+
+# Columns and tables models got while create_all still ran on start. It
+# never altered existing tables, so databases may have any part of them.
+# Constant defaults fill new columns without rewriting the table. JSON board
+# of existing games is packed by migrate_boards.py without locking the table;
+# migration stops here until its swap is done, empty table is just altered.
+GAME_OPTIONS_AND_MOVES = Migration(
+    version=5,
+    name="game options, packed boards and moves",
+    statements=(
+        "ALTER TABLE game ADD COLUMN IF NOT EXISTS difficulty VARCHAR "
+        "DEFAULT 'easy'",
+        "ALTER TABLE game ADD COLUMN IF NOT EXISTS size SMALLINT DEFAULT 3",
+        "ALTER TABLE game ADD COLUMN IF NOT EXISTS win_length SMALLINT DEFAULT 3",
+        "CREATE TABLE IF NOT EXISTS game_moves ("
+        "game_id INTEGER REFERENCES game (id) ON DELETE CASCADE, "
+        "ply SMALLINT, "
+        "cell SMALLINT NOT NULL, "
+        "PRIMARY KEY (game_id, ply))",
+        "DO $$ BEGIN "
+        "IF (SELECT data_type FROM information_schema.columns "
+        "WHERE table_name = 'game' AND column_name = 'board') = 'jsonb' THEN "
+        "IF EXISTS (SELECT 1 FROM game) THEN "
+        "RAISE EXCEPTION 'game.board is JSON, run migrate_boards.py add, "
+        "backfill and swap first'; "
+        "END IF; "
+        "ALTER TABLE game ALTER COLUMN board TYPE bytea USING NULL; "
+        "END IF; END $$",
+    ),
+)
+
+# Partitioned tables got CASCADE_TRIGGERS here before migration 3 was made
+# manual, which now adds them itself. Orphans left meanwhile are removed.
+PARTITIONED_DELETES = Migration(
+    version=6,
+    name="cascade deletes of partitioned tables",
+    statements=CASCADE_TRIGGERS
+    + (
+        "DELETE FROM game_moves WHERE NOT EXISTS "
+        "(SELECT 1 FROM game WHERE game.id = game_moves.game_id)",
+        "UPDATE game SET session_id = NULL WHERE session_id IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM session WHERE session.id = game.session_id)",
+    ),
+)
+
+# created_at of games on tables not partitioned yet, models write it on
+# insert. Default of now() is taken once, so no table rewrite; earlier games
+# get the time of migration, later than their sessions started.
+GAME_CREATED_AT = Migration(
+    version=7,
+    name="game created_at",
+    statements=(
+        "ALTER TABLE game ADD COLUMN IF NOT EXISTS "
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()",
+    ),
+)
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    INITIAL_SCHEMA,
+    HOT_PATH_INDEXES,
+    PARTITION_BY_CREATED_AT,
+    ROW_VERSIONS,
+    GAME_OPTIONS_AND_MOVES,
+    PARTITIONED_DELETES,
+    GAME_CREATED_AT,
+)
@@ -0,0 +1,277 @@
+"""
+Cold storage of finished sessions.
+
+archive_finished_sessions moves sessions finished before cutoff, with their
+games and moves, out of the database in batches: a batch is written to disk
+first and deleted from the tables after that, in one transaction. Archive is
+one gzip file of NDJSON records per user, so everything of a user is found
+in a single file; every batch appends a new gzip member to it. Record is
+one session:
+
+    {"session": {...}, "games": [{..., "moves": [[ply, cell], ...]}]}
+
+Every member gets a line in index file of the user, written after the
+member is synced: its offset and ids of its sessions. Lookup of a session
+reads the index and decompresses only the member holding it; files archived
+before indexes existed are scanned, and indexed on their next append.
+
+Batch interrupted between writing and deleting is archived again by the
+next run, readers take the first copy of a session.
+
+Rows are deleted only once they are on disk, so archive directory must be
+persistent: archive_finished_sessions refuses to run unless ARCHIVE__PATH is
+set to an existing directory. SessionArchive reads records back, UserUseCase
+falls back to it when a session or game isn't in the database any more.
+"""
+import gzip
+import json
+import os
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from entities.models import Game, GameMove, UserSession, db
+from entities.types import SessionStatusStates
+from repos.unit_of_work import UnitOfWork
+from settings import settings
+from sqlalchemy import delete, select
+from utils.exceptions import ImproperlyConfigured
+
+DATETIME_FIELDS = ("created_at", "ended_at")
+# gzip header and trailer for zlib.decompressobj
+GZIP_WBITS: int = zlib.MAX_WBITS | 16
+CHUNK_SIZE: int = 64 * 1024
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    for name in DATETIME_FIELDS:
+        if isinstance(row.get(name), str):
+            row[name] = datetime.fromisoformat(row[name])
+    return row
+
+
+def _decode_record(line: str | bytes) -> dict:
+    record: dict = json.loads(line)
+    _decode_row(record["session"])
+    for game in record["games"]:
+        _decode_row(game)
+    return record
+
+
+def _member_lines(file: IO[bytes]) -> Iterator[bytes]:
+    """Lines of gzip member starting at file position, stop at its end."""
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    rest: bytes = b""
+    while not decompressor.eof and (chunk := file.read(CHUNK_SIZE)):
+        *lines, rest = (rest + decompressor.decompress(chunk)).split(b"\n")
+        yield from lines
+
+
+def _members(file: IO[bytes]) -> Iterator[Tuple[int, List[bytes]]]:
+    """Offset and lines of every gzip member of file."""
+    offset: int = 0
+    while file.seek(offset) < os.fstat(file.fileno()).st_size:
+        decompressor = zlib.decompressobj(GZIP_WBITS)
+        data: bytes = b""
+        while not decompressor.eof and (chunk := file.read(CHUNK_SIZE)):
+            data += decompressor.decompress(chunk)
+        yield offset, data.splitlines()
+        offset = file.tell() - len(decompressor.unused_data)
+
+
+class SessionArchive:
+    """
+    Archived sessions on local disk, gzip NDJSON file per user. Without
+    path nothing is archived and nothing is found.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path: Optional[str] = path or settings.archive.path
+
+    def user_file(self, user_id: int) -> str:
+        # spread over subdirectories, one directory per thousand users
+        user_id = int(user_id)
+        return os.path.join(self.path, f"{user_id // 1000:06d}", f"{user_id}.ndjson.gz")
+
+    def index_file(self, user_id: int) -> str:
+        return self.user_file(user_id).replace(".ndjson.gz", ".idx")
+
+    def append(self, records: Iterable[dict]) -> None:
+        """
+        Append records to files of their users, one gzip member per user,
+        and index the members. Synced to disk on return.
+        """
+        by_user: Dict[int, List[dict]] = defaultdict(list)
+        for record in records:
+            by_user[record["session"]["user_id"]].append(record)
+        for user_id, user_records in by_user.items():
+            path: str = self.user_file(user_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path) and not os.path.exists(self.index_file(user_id)):
+                self.reindex(user_id)
+            with open(path, "ab") as file:
+                offset: int = file.seek(0, os.SEEK_END)
+                with gzip.GzipFile(fileobj=file, mode="wb") as member:
+                    for record in user_records:
+                        line: str = json.dumps(record, default=_encode) + "\n"
+                        member.write(line.encode())
+                file.flush()
+                os.fsync(file.fileno())
+            session_ids: List[int] = [
+                record["session"]["id"] for record in user_records
+            ]
+            self._write_index(user_id, [(offset, session_ids)], "a")
+
+    def reindex(self, user_id: int) -> None:
+        """Write index of user file again from its members."""
+        entries: List[Tuple[int, List[int]]] = []
+        with open(self.user_file(user_id), "rb") as file:
+            for offset, lines in _members(file):
+                ids: List[int] = [json.loads(line)["session"]["id"] for line in lines]
+                entries.append((offset, ids))
+        self._write_index(user_id, entries, "w")
+
+    def _write_index(
+        self, user_id: int, entries: List[Tuple[int, List[int]]], mode: str
+    ) -> None:
+        with open(self.index_file(user_id), mode) as index:
+            for offset, session_ids in entries:
+                index.write(f"{offset} {','.join(map(str, session_ids))}\n")
+            index.flush()
+            os.fsync(index.fileno())
+
+    def _member_offset(self, user_id: int, session_id: int) -> Optional[int]:
+        """Offset of the first member holding session, None if none does."""
+        with open(self.index_file(user_id)) as index:
+            for line in index:
+                offset, session_ids = line.split()
+                if str(session_id) in session_ids.split(","):
+                    return int(offset)
+        return None
+
+    def records(self, user_id: int) -> Iterator[dict]:
+        """Yield archived records of user, oldest batch first."""
+        if self.path is None or not os.path.exists(self.user_file(user_id)):
+            return
+        with gzip.open(self.user_file(user_id), "rt") as file:
+            for line in file:
+                yield _decode_record(line)
+
+    def find_session(self, user_id: int, session_id: int) -> Optional[dict]:
+        """Return archived record of session, None if it isn't archived."""
+        if self.path is None or not os.path.exists(self.user_file(user_id)):
+            return None
+        if not os.path.exists(self.index_file(user_id)):
+            return next(
+                (
+                    record
+                    for record in self.records(user_id)
+                    if record["session"]["id"] == session_id
+                ),
+                None,
+            )
+        offset: Optional[int] = self._member_offset(user_id, session_id)
+        if offset is None:
+            return None
+        with open(self.user_file(user_id), "rb") as file:
+            file.seek(offset)
+            for line in _member_lines(file):
+                record: dict = _decode_record(line)
+                if record["session"]["id"] == session_id:
+                    return record
+        return None
+
+    def find_game(self, user_id: int, session_id: int, game_id: int) -> Optional[dict]:
+        """Return archived game with its moves, None if it isn't archived."""
+        record: Optional[dict] = self.find_session(user_id, session_id)
+        if record is None:
+            return None
+        return next((game for game in record["games"] if game["id"] == game_id), None)
+
+
+def _load_batch(cutoff: datetime, after_id: int, batch_size: int) -> List[dict]:
+    """Records of the next batch of sessions finished before cutoff."""
+    session_table, game_table = UserSession.__table__, Game.__table__
+    sessions = (
+        db.session.execute(
+            select(session_table)
+            .where(
+                session_table.c.status == SessionStatusStates.FINISHED.value,
+                session_table.c.user_id.is_not(None),
+                session_table.c.created_at < cutoff,
+                session_table.c.ended_at < cutoff,
+                session_table.c.id > after_id,
+            )
+            .order_by(session_table.c.id)
+            .limit(batch_size)
+        )
+        .mappings()
+        .all()
+    )
+    if not sessions:
+        return []
+    games = (
+        db.session.execute(
+            select(game_table).where(
+                # games are never created after their session ended
+                game_table.c.created_at < cutoff,
+                game_table.c.session_id.in_([row["id"] for row in sessions]),
+            )
+        )
+        .mappings()
+        .all()
+    )
+    moves: Dict[int, List[List[int]]] = defaultdict(list)
+    for game_id, ply, cell in db.session.execute(
+        select(GameMove.game_id, GameMove.ply, GameMove.cell)
+        .where(GameMove.game_id.in_([row["id"] for row in games]))
+        .order_by(GameMove.game_id, GameMove.ply)
+    ):
+        moves[game_id].append([ply, cell])
+    games_of: Dict[int, List[dict]] = defaultdict(list)
+    for game in games:
+        games_of[game["session_id"]].append({**game, "moves": moves[game["id"]]})
+    return [
+        {"session": dict(session), "games": games_of[session["id"]]}
+        for session in sessions
+    ]
+
+
+def _delete_batch(records: List[dict]) -> None:
+    session_ids: List[int] = [record["session"]["id"] for record in records]
+    game_ids: List[int] = [game["id"] for record in records for game in record["games"]]
+    with UnitOfWork():
+        db.session.execute(delete(GameMove).where(GameMove.game_id.in_(game_ids)))
+        db.session.execute(delete(Game).where(Game.id.in_(game_ids)))
+        db.session.execute(delete(UserSession).where(UserSession.id.in_(session_ids)))
+
+
+def archive_finished_sessions(
+    archive: SessionArchive, cutoff: datetime, batch_size: Optional[int] = None
+) -> int:
+    """
+    Move sessions finished before cutoff into archive. Return their number.
+    Raise ImproperlyConfigured unless archive has an existing directory,
+    rows are never deleted into storage which may not persist.
+    """
+    if archive.path is None or not os.path.isdir(archive.path):
+        raise ImproperlyConfigured(
+            "Set ARCHIVE__PATH to an existing directory on persistent storage "
+            "before archiving, archived sessions are deleted from the database"
+        )
+    batch_size = batch_size or settings.archive.batch_size
+    archived: int = 0
+    after_id: int = 0
+    while records := _load_batch(cutoff, after_id, batch_size):
+        archive.append(records)
+        _delete_batch(records)
+        archived += len(records)
+        after_id = records[-1]["session"]["id"]
+    return archived
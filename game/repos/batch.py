@@ -0,0 +1,105 @@
+"""
+Vectorized game state evaluation for many boards at once.
+
+Boards are stacked into an (M, N, N) array of symbol codes: 0 for a free
+field, 1 for X and 2 for O. Rules are the same as in
+PlayMixin.check_game_state: 3x3 boards are looked up in the precomputed
+outcome table, bigger boards are scanned for k in a row with X checked first.
+"""
+from typing import Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from repos.geometry import DIRECTIONS
+from repos.managers import default_win_length
+from repos.outcomes import (
+    BOARD_SIZE,
+    CELLS,
+    FINISHED_FLAG,
+    FREE_COUNT_MASK,
+    OUTCOMES,
+    SYMBOLS,
+    TERNARY,
+    WINNER_SHIFT,
+)
+
+FREE, X_CODE, O_CODE = 0, 1, 2
+
+_OUTCOMES: np.ndarray = np.frombuffer(OUTCOMES, dtype=np.uint8)
+_TERNARY: np.ndarray = np.array(TERNARY, dtype=np.int32)
+_CELL_BITS: np.ndarray = 1 << np.arange(CELLS, dtype=np.int32)
+
+Board = List[List[Optional[str]]]
+
+
+class BatchOutcome(NamedTuple):
+    """
+    Per board results. Winner holds symbol codes, SYMBOLS[code - 1] is the
+    winning symbol, 0 means no winner.
+    """
+
+    finished: np.ndarray
+    winner: np.ndarray
+    free: np.ndarray
+
+
+def encode_boards(boards: Iterable[Board]) -> np.ndarray:
+    """Convert stored boards (lists of None/"X"/"O") into array of codes."""
+    codes = {None: FREE, SYMBOLS[0]: X_CODE, SYMBOLS[1]: O_CODE}
+    return np.array(
+        [[[codes[value] for value in line] for line in board] for board in boards],
+        dtype=np.int8,
+    )
+
+
+def evaluate_boards(
+    boards: np.ndarray, win_length: Optional[int] = None
+) -> BatchOutcome:
+    """Return game state of every board in (M, N, N) array of codes."""
+    if boards.ndim != 3 or boards.shape[1] != boards.shape[2]:
+        raise ValueError(f"Expected (M, N, N) array of boards, got {boards.shape}")
+    size: int = boards.shape[1]
+    win_length = win_length or default_win_length(size)
+    if size == BOARD_SIZE and win_length == BOARD_SIZE:
+        return _evaluate_classic(boards)
+    return _evaluate_scan(boards, win_length)
+
+
+def _evaluate_classic(boards: np.ndarray) -> BatchOutcome:
+    """Look every 3x3 board up in the outcome table."""
+    flat: np.ndarray = boards.reshape(len(boards), CELLS)
+    x_mask: np.ndarray = (flat == X_CODE).astype(np.int32) @ _CELL_BITS
+    o_mask: np.ndarray = (flat == O_CODE).astype(np.int32) @ _CELL_BITS
+    values: np.ndarray = _OUTCOMES[_TERNARY[x_mask] + 2 * _TERNARY[o_mask]]
+    return BatchOutcome(
+        finished=(values & FINISHED_FLAG).astype(bool),
+        winner=(values >> WINNER_SHIFT & 0x03).astype(np.int8),
+        free=(values & FREE_COUNT_MASK).astype(np.int32),
+    )
+
+
+def _has_line(taken: np.ndarray, win_length: int) -> np.ndarray:
+    """Check every board for k taken fields in a row, in four directions."""
+    size: int = taken.shape[1]
+    span: int = size - win_length + 1
+    found: np.ndarray = np.zeros(len(taken), dtype=bool)
+    for d_row, d_col in DIRECTIONS:
+        rows: int = span if d_row else size
+        cols: int = span if d_col else size
+        line: np.ndarray = np.ones((len(taken), rows, cols), dtype=bool)
+        for step in range(win_length):
+            row: int = d_row * step
+            col: int = d_col * step if d_col >= 0 else win_length - 1 - step
+            line &= taken[:, row : row + rows, col : col + cols]
+        found |= line.any(axis=(1, 2))
+    return found
+
+
+def _evaluate_scan(boards: np.ndarray, win_length: int) -> BatchOutcome:
+    """Scan N x N boards for lines, X wins when both symbols have one."""
+    x_wins: np.ndarray = _has_line(boards == X_CODE, win_length)
+    o_wins: np.ndarray = _has_line(boards == O_CODE, win_length)
+    winner: np.ndarray = np.where(
+        x_wins, X_CODE, np.where(o_wins, O_CODE, FREE)
+    ).astype(np.int8)
+    free: np.ndarray = (boards == FREE).sum(axis=(1, 2)).astype(np.int32)
+    return BatchOutcome(finished=(winner > 0) | (free == 0), winner=winner, free=free)
@@ -1,21 +1,29 @@
 import abc
-from typing import Iterable, Optional, Type, Union
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple, Type, Union
 
 from entities.entites import (
     GameListPydantic,
+    GameMoveListPydantic,
     GamePydantic,
     UserListPydantic,
     UserPydantic,
     UserSessionListPydantic,
     UserSessionPydantic,
 )
-from entities.models import Game, User, UserSession, db
-from entities.types import SessionStatusStates
+from entities.models import Game, GameMove, User, UserSession, db
+from entities.types import PlayState
+from repos.identity_map import memoized
+from sqlalchemy import RowMapping, and_, insert, select, update
+from utils.exceptions import StaleGameException
 
-ModelType = Union[User, UserSession, Game]
+ModelType = Union[User, UserSession, Game, GameMove]
+STREAM_BATCH_SIZE: int = 1000
 
 
-class BaseRepo(abc.ABC):
+class AppendOnlyRepo(abc.ABC):
+    """Repo of rows which are written once and never updated."""
+
     model: Type[ModelType]
 
     @abc.abstractmethod
@@ -32,48 +40,75 @@ class BaseRepo(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def update_fields(self, obj, **kwargs) -> None:
+    def all(self):
+        """Get all model instances from DB"""
         raise NotImplementedError
 
+
+class BaseRepo(AppendOnlyRepo):
     @abc.abstractmethod
-    def all(self):
-        """Get all model instances from DB"""
+    def update_fields(self, obj, **kwargs) -> None:
         raise NotImplementedError
 
 
 class UserDBRepo(BaseRepo):
     model = User
 
+    @memoized
     def filter(self, **kwargs) -> Optional[UserListPydantic]:
         filter_res: Iterable | None = self.model.filter_by(**kwargs)
         if filter_res:
-            new_res: UserListPydantic = UserListPydantic(
-                __root__=[obj.__dict__ for obj in filter_res if obj]
+            new_res: UserListPydantic = UserListPydantic.from_rows(
+                obj for obj in filter_res if obj
             )
             return new_res
         return None
 
     def create(self, **kwargs) -> UserPydantic:
         """Create new user in DB"""
-        self.model.create(**kwargs)
-        user: Optional[UserListPydantic] = self.filter(**kwargs)
-        return UserPydantic(**user.__root__[0].__dict__)
+        return UserPydantic.from_row(self.model.create(**kwargs))
 
     def save(self, obj):
         obj.save()
 
     def update_fields(self, obj: UserPydantic, **kwargs) -> UserPydantic | None:
-        instance: User | None = self.model.query.filter_by(id=obj.id).first()
-        if instance:
-            for key, val in kwargs.items():
-                try:
-                    setattr(instance, key, val)
-                except AttributeError as error:
-                    raise error
-            db.session.commit()
-            db.session.refresh(instance)
-            return UserPydantic(**instance.__dict__)
-        return None
+        """Update fields with one UPDATE ... RETURNING, None if row is gone."""
+        row: RowMapping | None = self.model.update(obj.id, **kwargs)
+        return UserPydantic.from_row(row) if row else None
+
+    def version(self, user_id: int) -> Optional[int]:
+        """Return version of user row only, None if there is no such user."""
+        return db.session.execute(
+            select(self.model.version).where(self.model.id == user_id)
+        ).scalar_one_or_none()
+
+    def debit_credits(self, user_id: int, amount: int) -> Optional[int]:
+        """
+        Take amount off user credits in one statement. Return credits left,
+        None when user has fewer credits than amount.
+        """
+        credits = self.model.__table__.c.credits
+        return self._change_credits(user_id, credits - amount, credits >= amount)
+
+    def add_credits(self, user_id: int, amount: int) -> Optional[int]:
+        """Add amount to user credits in one statement. Return new balance."""
+        credits = self.model.__table__.c.credits
+        return self._change_credits(user_id, credits + amount)
+
+    def _change_credits(self, user_id: int, value, *criteria) -> Optional[int]:
+        """
+        Compute credits in the database, so concurrent requests of one user
+        never overwrite each other and no row lock is held between statements.
+        """
+        table = self.model.__table__
+        credits: Optional[int] = db.session.execute(
+            update(table)
+            .where(table.c.id == user_id, *criteria)
+            .values(credits=value, version=table.c.version + 1)
+            .returning(table.c.credits)
+        ).scalar_one_or_none()
+        self.model.save()
+        return credits
 
     def all(self):
         ...
@@ -82,21 +117,23 @@ class UserDBRepo(BaseRepo):
 class UserSessionDBRepo(BaseRepo):
     model = UserSession
 
+    @memoized
     def filter(self, **kwargs) -> Optional[UserSessionListPydantic]:
-        filter_res: Iterable | None = self.model.filter_by(**kwargs)
+        bounds: list = [
+            getattr(self.model, key.split("__")[0]) >= kwargs.pop(key)
+            for key in list(kwargs)
+            if "__gte" in key
+        ]
+        filter_res: Iterable | None = self.model.filter_by(*bounds, **kwargs)
         if filter_res:
-            new_res: UserSessionListPydantic = UserSessionListPydantic(
-                __root__=[obj.__dict__ for obj in filter_res]
+            new_res: UserSessionListPydantic = UserSessionListPydantic.from_rows(
+                filter_res
             )
             return new_res
         return None
 
     def create(self, **kwargs) -> UserSessionPydantic:
-        self.model.create(**kwargs)
-        if not kwargs.get("status"):
-            kwargs["status"] = SessionStatusStates.ACTIVE.value
-        user_session: Optional[UserSessionListPydantic] = self.filter(**kwargs)
-        return UserSessionPydantic(**user_session.__root__[0].__dict__)
+        return UserSessionPydantic.from_row(self.model.create(**kwargs))
 
     def save(self, obj) -> None:
         obj.save()
@@ -104,17 +141,11 @@ class UserSessionDBRepo(BaseRepo):
     def update_fields(
         self, obj: UserSessionPydantic, **kwargs
     ) -> UserSessionPydantic | None:
-        instance: UserSession | None = self.model.query.filter_by(id=obj.id).first()
-        if instance:
-            for key, val in kwargs.items():
-                try:
-                    setattr(instance, key, val)
-                except AttributeError as error:
-                    raise error
-            db.session.commit()
-            db.session.refresh(instance)
-            return UserSessionPydantic(**instance.__dict__)
-        return None
+        """Update fields with one UPDATE ... RETURNING, None if row is gone."""
+        row: RowMapping | None = self.model.update(
+            obj.id, partition_key=obj.created_at, **kwargs
+        )
+        return UserSessionPydantic.from_row(row) if row else None
 
     def all(self, desc=False) -> Iterable:
         if desc:
@@ -125,10 +156,26 @@ class UserSessionDBRepo(BaseRepo):
             filter_res: Iterable = self.model.query.all()
         return filter_res
 
+    def ended_since(self, ended_after: datetime, started_after: datetime) -> Iterable:
+        """
+        Sessions ended after ended_after, last ended first. started_after
+        is the earliest start of such session, partitions of created_at
+        before it are skipped.
+        """
+        return (
+            self.model.query.filter(
+                self.model.ended_at >= ended_after,
+                self.model.created_at >= started_after,
+            )
+            .order_by(self.model.ended_at.desc())
+            .all()
+        )
+
 
 class GameDBRepo(BaseRepo):
     model = Game
 
+    @memoized
     def filter(self, **kwargs) -> Optional[GameListPydantic]:
         query = self.model.query
         for key, val in kwargs.items():
@@ -140,33 +187,151 @@ class GameDBRepo(BaseRepo):
 
         filter_res: list = query.all()
         if filter_res:
-            new_res: GameListPydantic = GameListPydantic(
-                __root__=[obj.__dict__ for obj in filter_res]
-            )
+            new_res: GameListPydantic = GameListPydantic.from_rows(filter_res)
             return new_res
         return None
 
     def create(self, **kwargs) -> GamePydantic:
-        self.model.create(**kwargs)
-        game: Optional[GameListPydantic] = self.filter(**kwargs)
-        return GamePydantic(**game.__root__[0].__dict__)
+        return GamePydantic.from_row(self.model.create(**kwargs))
 
     def save(self, obj):
         obj.save()
 
-    def update_fields(self, obj: GamePydantic, **kwargs) -> GamePydantic | None:
-        instance: Game | None = self.model.query.filter_by(id=obj.id).first()
-
-        if instance:
-            for key, val in kwargs.items():
-                try:
-                    setattr(instance, key, val)
-                except AttributeError as error:
-                    raise error
-            db.session.commit()
-            db.session.refresh(instance)
-            return GamePydantic(**instance.__dict__)
+    def update_fields(self, obj: GamePydantic, **kwargs) -> GamePydantic:
+        """
+        Update fields with one UPDATE ... RETURNING, only if the row is still
+        at version of obj. Version of obj is moved to the saved one, so the
+        same DTO can be updated again. Raise StaleGameException when the game
+        was updated or removed since obj was read.
+        """
+        row: RowMapping | None = self.model.update(
+            obj.id,
+            expected_version=obj.version,
+            partition_key=obj.created_at,
+            **kwargs,
+        )
+        if row is None:
+            raise StaleGameException
+        obj.version = row["version"]
+        return GamePydantic.from_row(row)
+
+    def play_versions(
+        self, session_id: int, user_id: int, game_id: int, started_after: datetime
+    ) -> Optional[Tuple[int, int, str]]:
+        """
+        Return game version, user version and session status of what
+        load_play would load, None if there's no such game in user session.
+        """
+        row = db.session.execute(
+            select(self.model.version, User.version, UserSession.status)
+            .join(
+                UserSession,
+                and_(
+                    UserSession.id == self.model.session_id,
+                    self.model.created_at >= UserSession.created_at,
+                ),
+            )
+            .join(User, User.id == UserSession.user_id)
+            .where(
+                self.model.id == game_id,
+                self.model.session_id == session_id,
+                self.model.user_id == user_id,
+                UserSession.user_id == user_id,
+                # games start after their session: older partitions skipped
+                UserSession.created_at >= started_after,
+                self.model.created_at >= started_after,
+            )
+        ).one_or_none()
+        return tuple(row) if row is not None else None
+
+    def load_play(
+        self, session_id: int, user_id: int, game_id: int, started_after: datetime
+    ) -> Optional[PlayState]:
+        """
+        Load user, session and game of a move with one joined SELECT. None if
+        user has no such session started after started_after, game of the
+        state is None if session has no such game. Only partitions of
+        created_at from started_after on are read.
+        """
+        row = db.session.execute(
+            select(User, UserSession, self.model)
+            .join(User, User.id == UserSession.user_id)
+            .outerjoin(
+                self.model,
+                and_(
+                    self.model.id == game_id,
+                    self.model.session_id == UserSession.id,
+                    self.model.user_id == user_id,
+                    # games start after their session: older partitions skipped
+                    self.model.created_at >= started_after,
+                    self.model.created_at >= UserSession.created_at,
+                ),
+            )
+            .where(
+                UserSession.id == session_id,
+                UserSession.user_id == user_id,
+                UserSession.created_at >= started_after,
+            )
+        ).one_or_none()
+        if row is None:
+            return None
+        user, session, game = row
+        return PlayState(
+            user=UserPydantic.from_row(user),
+            session=UserSessionPydantic.from_row(session),
+            game=GamePydantic.from_row(game) if game is not None else None,
+        )
+
+    def all(self):
+        ...
+
+
+class GameMoveDBRepo(AppendOnlyRepo):
+    """Append-only log of moves, board of a game is its moves replayed."""
+
+    model = GameMove
+
+    def filter(self, **kwargs) -> Optional[GameMoveListPydantic]:
+        filter_res: list = self.model.filter_by(**kwargs).order_by(self.model.ply).all()
+        if filter_res:
+            return GameMoveListPydantic.from_rows(filter_res)
         return None
 
+    def create(self, **kwargs) -> None:
+        """Append move with a plain INSERT, nothing is read back."""
+        db.session.execute(insert(self.model).values(**kwargs))
+        self.model.save()
+
+    def create_many(self, game_id: int, first_ply: int, cells: List[int]) -> None:
+        """Append moves made one after another with one multi-row INSERT."""
+        db.session.execute(
+            insert(self.model).values(
+                [
+                    {"game_id": game_id, "ply": ply, "cell": cell}
+                    for ply, cell in enumerate(cells, start=first_ply)
+                ]
+            )
+        )
+        self.model.save()
+
+    def save(self, obj):
+        obj.save()
+
     def all(self):
         ...
+
+    def stream(
+        self, game_id: int, batch_size: int = STREAM_BATCH_SIZE
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (ply, cell) of game moves in order. Rows are fetched from
+        server side cursor batch by batch, so long games are never loaded whole.
+        """
+        result = db.session.execute(
+            select(self.model.ply, self.model.cell)
+            .where(self.model.game_id == game_id)
+            .order_by(self.model.ply)
+            .execution_options(yield_per=batch_size)
+        )
+        for ply, cell in result:
+            yield ply, cell
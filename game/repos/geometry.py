@@ -0,0 +1,108 @@
+"""
+Precomputed geometry of N x N boards with k-in-a-row rule.
+
+Fields are numbered ``row * size + col`` and sets of fields are kept as
+integer bitmasks, so lines, neighbourhoods and whole boards are checked with a
+few integer operations.
+"""
+import random
+from functools import lru_cache
+from typing import List, Tuple
+
+from repos.outcomes import SYMBOLS
+
+NEIGHBOURHOOD: int = 2
+DIRECTIONS: Tuple[Tuple[int, int], ...] = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class Geometry:
+    """Precomputed masks and Zobrist keys for one board size and line length."""
+
+    def __init__(self, size: int, win_length: int):
+        self.size: int = size
+        self.win_length: int = win_length
+        self.cells: int = size * size
+        self.full_mask: int = (1 << self.cells) - 1
+        self.windows: Tuple[int, ...] = self._build_windows()
+        self.windows_through: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(window for window in self.windows if window >> cell & 1)
+            for cell in range(self.cells)
+        )
+        self.near: Tuple[int, ...] = tuple(
+            self._near_mask(cell) for cell in range(self.cells)
+        )
+        # central fields belong to more lines, so they are tried first
+        self.order: Tuple[int, ...] = tuple(
+            sorted(range(self.cells), key=lambda cell: -len(self.windows_through[cell]))
+        )
+        rnd: random.Random = random.Random(size * 1000 + win_length)
+        self.zobrist: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(rnd.getrandbits(64) for _ in range(self.cells)) for _ in SYMBOLS
+        )
+        self.base_key: int = rnd.getrandbits(64)
+        self.side_key: int = rnd.getrandbits(64)
+        self.line_starts: Tuple[Tuple[int, int], ...] = self._build_line_starts()
+
+    def _build_windows(self) -> Tuple[int, ...]:
+        """Build masks of every k-long segment in four directions."""
+        windows: List[int] = []
+        for row in range(self.size):
+            for col in range(self.size):
+                for d_row, d_col in DIRECTIONS:
+                    end_row: int = row + d_row * (self.win_length - 1)
+                    end_col: int = col + d_col * (self.win_length - 1)
+                    if not (0 <= end_row < self.size and 0 <= end_col < self.size):
+                        continue
+                    mask: int = 0
+                    for step in range(self.win_length):
+                        cell: int = (
+                            (row + d_row * step) * self.size + col + d_col * step
+                        )
+                        mask |= 1 << cell
+                    windows.append(mask)
+        return tuple(windows)
+
+    def _build_line_starts(self) -> Tuple[Tuple[int, int], ...]:
+        """
+        For every direction return its bit shift and mask of fields a whole
+        k-long line in that direction can start from.
+        """
+        reach: int = self.win_length - 1
+        result: List[Tuple[int, int]] = []
+        for d_row, d_col in DIRECTIONS:
+            starts: int = 0
+            for row in range(self.size - d_row * reach):
+                for col in range(self.size):
+                    if 0 <= col + d_col * reach < self.size:
+                        starts |= 1 << (row * self.size + col)
+            result.append((d_row * self.size + d_col, starts))
+        return tuple(result)
+
+    def has_line(self, mask: int) -> bool:
+        """
+        Check whole board for k fields in a row with O(k) shifts per direction,
+        independent of the board size.
+        """
+        for shift, starts in self.line_starts:
+            line: int = starts & mask
+            for step in range(1, self.win_length):
+                line &= mask >> step * shift
+            if line:
+                return True
+        return False
+
+    def _near_mask(self, cell: int) -> int:
+        """Return mask of fields close to given field (excluding the field)."""
+        row, col = divmod(cell, self.size)
+        mask: int = 0
+        for near_row in range(row - NEIGHBOURHOOD, row + NEIGHBOURHOOD + 1):
+            for near_col in range(col - NEIGHBOURHOOD, col + NEIGHBOURHOOD + 1):
+                if 0 <= near_row < self.size and 0 <= near_col < self.size:
+                    mask |= 1 << (near_row * self.size + near_col)
+        return mask & ~(1 << cell)
+
+
+@lru_cache(maxsize=32)
+def get_geometry(size: int, win_length: int) -> Geometry:
+    """Return cached geometry for given board."""
+    return Geometry(size, win_length)
@@ -0,0 +1,113 @@
+"""
+Request-scoped identity map of repository reads.
+
+Within one request the same user, session and game are asked for several
+times, e.g. get_user(id=...) runs up to four times in a play request. While an
+IdentityMap is open, filter methods decorated with ``memoized`` keep their
+results per table and filter arguments and serve repeated calls from memory.
+Every INSERT, UPDATE or DELETE sent through the session drops entries of its
+table, rollback drops all of them, so reads after a write see the new row.
+Callers get copies, changing returned DTOs never changes the map.
+"""
+from contextvars import ContextVar, Token
+from functools import wraps
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+_current: ContextVar[Optional["IdentityMap"]] = ContextVar("identity_map", default=None)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, set)):
+        return tuple(value)
+    return value
+
+
+class IdentityMap:
+    """Memo of filter results, open for the time of one request."""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Tuple, Any]] = {}
+        self._token: Optional[Token] = None
+        self.queries_saved: int = 0
+
+    def open(self) -> "IdentityMap":
+        self._token = _current.set(self)
+        return self
+
+    def close(self) -> None:
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+
+    def __enter__(self) -> "IdentityMap":
+        return self.open()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, table: str, kwargs: dict, load: Callable[[], Any]) -> Any:
+        """Return copy of memoized result, call load on first use."""
+        key: Tuple = tuple(sorted((name, _freeze(v)) for name, v in kwargs.items()))
+        entries: Dict[Tuple, Any] = self._entries.setdefault(table, {})
+        if key in entries:
+            self.queries_saved += 1
+        else:
+            entries[key] = load()
+        result: Any = entries[key]
+        return result.copy(deep=True) if result is not None else None
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Drop entries of table, all of them without one."""
+        if table is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(table, None)
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    return _current.get()
+
+
+def memoized(method: Callable) -> Callable:
+    """Serve repository filter from open identity map, keyed by model table."""
+
+    @wraps(method)
+    def wrapper(repo, **kwargs):
+        identity_map: Optional[IdentityMap] = _current.get()
+        if identity_map is None:
+            return method(repo, **kwargs)
+        return identity_map.get(
+            repo.model.__tablename__, kwargs, lambda: method(repo, **kwargs)
+        )
+
+    return wrapper
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_write(state: ORMExecuteState) -> None:
+    identity_map: Optional[IdentityMap] = _current.get()
+    if identity_map is None:
+        return
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        identity_map.invalidate(getattr(table, "name", None))
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_flush(session: Session, flush_context) -> None:
+    identity_map: Optional[IdentityMap] = _current.get()
+    if identity_map is None:
+        return
+    for obj in chain(session.new, session.dirty, session.deleted):
+        identity_map.invalidate(obj.__table__.name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _invalidate_on_rollback(session: Session) -> None:
+    identity_map: Optional[IdentityMap] = _current.get()
+    if identity_map is not None:
+        identity_map.invalidate()
@@ -1,8 +1,39 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from repos.geometry import Geometry, get_geometry
+from repos.outcomes import (
+    BOARD_SIZE,
+    FREE_SPOTS,
+    FULL_MASK,
+    SYMBOLS,
+    board_index,
+    outcome,
+)
+from repos.symmetry import canonical_form
+
+MIN_BOARD_SIZE: int = 3
+MAX_BOARD_SIZE: int = 19
+MAX_DEFAULT_WIN_LENGTH: int = 5
+
+
+def default_win_length(size: int) -> int:
+    """Line length used when game doesn't set one: 3 on 3x3, five on big boards."""
+    return min(size, MAX_DEFAULT_WIN_LENGTH)
 
 
 class PlayMixin:
-    """Mixin for playing the game."""
+    """
+    Mixin for playing the game. Board is kept as one bitmask per symbol,
+    bit number ``row * size + col`` is set when the field is taken.
+    Classic 3x3 board is answered from precomputed tables, bigger boards
+    check only lines through the last move.
+    """
+
+    size: int
+    win_length: int
+    geometry: Geometry
+    _masks: Dict[str, int]
+    _last_move: Optional[int]
 
     def set_field(self, row: int, col: int, symbol: str) -> None:
         raise NotImplementedError
@@ -10,90 +41,156 @@ class PlayMixin:
     def get_field(self, row: int, col: int) -> Optional[str]:
         raise NotImplementedError
 
-    def make_move(self, col: int, row: int, symbol: str) -> None:
+    def make_move(self, row: int, col: int, symbol: str) -> None:
         """Make a move on the game board."""
         self.set_field(row, col, symbol)
 
+    def is_classic(self) -> bool:
+        """Check if board is 3x3 with 3 in a row, which has lookup tables."""
+        return self.size == BOARD_SIZE and self.win_length == BOARD_SIZE
+
+    def occupied(self) -> int:
+        """Return mask of all taken fields."""
+        taken: int = 0
+        for mask in self._masks.values():
+            taken |= mask
+        return taken
+
+    def symbol_masks(self) -> Tuple[int, int]:
+        """Return (X, O) masks of the board."""
+        return self._masks["X"], self._masks["O"]
+
+    def board_index(self) -> int:
+        """Return ternary index of 3x3 board, see repos.outcomes."""
+        return board_index(*self.symbol_masks())
+
+    def canonical_form(self) -> Tuple[Tuple[int, int], int]:
+        """
+        Return canonical (X, O) masks of the board and the transform leading
+        to them, see repos.symmetry.
+        """
+        return canonical_form(self.symbol_masks(), self.size)
+
     def find_free_spots(self) -> List[tuple[int, int]]:
         """Find all free spots on the board."""
-        free_spots: List = []
-        for row in range(3):
-            for col in range(3):
-                if not self.get_field(row, col):
-                    free_spots.append((row, col))
-        return free_spots
+        if self.is_classic():
+            return list(FREE_SPOTS[FULL_MASK & ~self.occupied()])
+        free: int = self.geometry.full_mask & ~self.occupied()
+        return [
+            divmod(cell, self.size)
+            for cell in range(self.geometry.cells)
+            if free >> cell & 1
+        ]
 
     def is_full(self) -> bool:
         """Check if the board is full."""
-        if len(self.find_free_spots()) == 0:
-            return True
-        return False
+        if self.is_classic():
+            return outcome(self.board_index())[2] == 0
+        return not self.geometry.full_mask & ~self.occupied()
 
     def check_game_state(self):
         """
         Check if the game has ended in a draw. Returns True if the game has ended, and
         the winner if there is one.
         """
-        for element in range(3):
-            # Checking rows
-            actual_row: List[str | None] = [
-                self.get_field(element, x_row) for x_row in range(3)
-            ]
-
-            if len(set(actual_row)) == 1 and actual_row[0]:
-                return True, actual_row[0]
-
-            # checking columns
-            actual_column: List[str | None] = [
-                self.get_field(x_col, element) for x_col in range(3)
-            ]
-
-            if len(set(actual_column)) == 1 and actual_column[0]:
-                return True, actual_column[0]
-        # checking diagonals
-        diagonal_1: List[str | None] = [self.get_field(num, num) for num in range(3)]
-        diagonal_2: List[str | None] = [
-            self.get_field(num, 2 - num) for num in range(3)
-        ]
+        if self.is_classic():
+            is_finished, winner, _ = outcome(self.board_index())
+            return is_finished, winner
 
-        if len(set(diagonal_1)) == 1 and diagonal_1[0]:
-            return True, diagonal_1[0]
-        if len(set(diagonal_2)) == 1 and diagonal_2[0]:
-            return True, diagonal_2[0]
+        winner: Optional[str] = self._find_winner()
+        if winner:
+            return True, winner
 
         # checking if there is a free spot
-        if not self.find_free_spots():
+        if self.is_full():
             return True, None
 
         return False, None
 
+    def _find_winner(self) -> Optional[str]:
+        """
+        After a move only lines through that move can become complete, so only
+        those are checked. Board loaded without moves is checked as a whole.
+        """
+        if self._last_move is not None:
+            for symbol, mask in self._masks.items():
+                if mask >> self._last_move & 1:
+                    for window in self.geometry.windows_through[self._last_move]:
+                        if mask & window == window:
+                            return symbol
+                    return None
+        for symbol, mask in self._masks.items():
+            if self.geometry.has_line(mask):
+                return symbol
+        return None
+
 
 class GridManager(PlayMixin):
     """Class for managing the game board."""
 
-    def __init__(self, fields: List[List[None]]):
-        self._fields: List[List[None]] = fields
+    def __init__(self, fields: List[List[None]], win_length: Optional[int] = None):
+        self.size: int = len(fields) or BOARD_SIZE
+        self.win_length: int = win_length or default_win_length(self.size)
+        self.geometry: Geometry = get_geometry(self.size, self.win_length)
+        self._masks: Dict[str, int] = {symbol: 0 for symbol in SYMBOLS}
+        self._last_move: Optional[int] = None
+        for row, line in enumerate(fields):
+            for col, value in enumerate(line):
+                if value:
+                    self._masks[value] |= self._bit(row, col)
 
     def get_board(self) -> List[List[Optional[str]]]:
         """Return the game board."""
-        return self._fields
+        return [
+            [self.get_field(row, col) for col in range(self.size)]
+            for row in range(self.size)
+        ]
 
     @staticmethod
-    def initialize_grid() -> List[List[None]]:
+    def initialize_grid(size: int = BOARD_SIZE) -> List[List[None]]:
         """Initialize the game board."""
-        return [[None, None, None] for _ in range(3)]
+        return [[None] * size for _ in range(size)]
+
+    @classmethod
+    def from_moves(
+        cls,
+        moves: Iterable[int],
+        first_symbol: str,
+        size: int = BOARD_SIZE,
+        win_length: Optional[int] = None,
+    ) -> "GridManager":
+        """Replay field numbers in order, players take turns from first symbol."""
+        grid: GridManager = cls(cls.initialize_grid(size), win_length)
+        symbols: Tuple[str, str] = (first_symbol, "O" if first_symbol == "X" else "X")
+        for ply, cell in enumerate(moves):
+            grid.make_move(*divmod(cell, size), symbols[ply % 2])
+        return grid
+
+    def _bit(self, row: int, col: int) -> int:
+        """Return bit of the field. Raise IndexError if field is out of board."""
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            raise IndexError(f"Field ({row}, {col}) is out of the board")
+        return 1 << (row * self.size + col)
 
     def is_move_possible(self, row: int, col: int) -> bool:
         """Check if a move is possible on the game board."""
-        field: str | None = self.get_field(row, col)
-        if field:
-            return False
-        return True
+        return not self.occupied() & self._bit(row, col)
 
     def set_field(self, row, col, value):
         """Set a field on the game board."""
-        self._fields[row][col] = value
+        bit: int = self._bit(row, col)
+        for symbol in self._masks:
+            self._masks[symbol] &= ~bit
+        if value:
+            self._masks[value] |= bit
+            self._last_move = row * self.size + col
+        else:
+            self._last_move = None
 
     def get_field(self, row, col) -> str | None:
         """Get a field from the game board."""
-        return self._fields[row][col]
+        bit: int = self._bit(row, col)
+        for symbol, mask in self._masks.items():
+            if mask & bit:
+                return symbol
+        return None
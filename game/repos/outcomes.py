@@ -0,0 +1,118 @@
+"""
+Precomputed tables for the 3x3 board.
+
+Board is encoded as a ternary number: field ``row * 3 + col`` is a digit,
+0 for a free field, 1 for X and 2 for O. All 3^9 encodings are evaluated once
+at import time, so checking the game state is a single table lookup.
+"""
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+BOARD_SIZE: int = 3
+CELLS: int = BOARD_SIZE * BOARD_SIZE
+FULL_MASK: int = (1 << CELLS) - 1
+STATES: int = 3**CELLS
+SYMBOLS: Tuple[str, str] = ("X", "O")
+
+FINISHED_FLAG: int = 0x80
+WINNER_SHIFT: int = 4
+FREE_COUNT_MASK: int = 0x0F
+
+
+def _line_mask(cells: Iterable[Tuple[int, int]]) -> int:
+    """Build bitmask for given (row, col) cells."""
+    mask: int = 0
+    for row, col in cells:
+        mask |= 1 << (row * BOARD_SIZE + col)
+    return mask
+
+
+def _build_win_masks() -> Tuple[int, ...]:
+    """
+    Build winning line masks. Lines are kept in the order the board used to be
+    scanned: rows and columns interleaved, then both diagonals.
+    """
+    masks: List[int] = []
+    for element in range(BOARD_SIZE):
+        masks.append(_line_mask((element, col) for col in range(BOARD_SIZE)))
+        masks.append(_line_mask((row, element) for row in range(BOARD_SIZE)))
+    masks.append(_line_mask((num, num) for num in range(BOARD_SIZE)))
+    masks.append(_line_mask((num, BOARD_SIZE - 1 - num) for num in range(BOARD_SIZE)))
+    return tuple(masks)
+
+
+def _build_free_spots() -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+    """Map every possible free fields mask to its (row, col) pairs."""
+    return tuple(
+        tuple(divmod(cell, BOARD_SIZE) for cell in range(CELLS) if mask >> cell & 1)
+        for mask in range(FULL_MASK + 1)
+    )
+
+
+def _build_ternary() -> Tuple[int, ...]:
+    """Map every fields mask to the sum of ternary digit weights of its fields."""
+    return tuple(
+        sum(3**cell for cell in range(CELLS) if mask >> cell & 1)
+        for mask in range(FULL_MASK + 1)
+    )
+
+
+def _build_first_line() -> Tuple[int, ...]:
+    """Map every fields mask to the number of its first complete line."""
+    no_line: int = len(WIN_MASKS)
+    return tuple(
+        next(
+            (num for num, line in enumerate(WIN_MASKS) if mask & line == line),
+            no_line,
+        )
+        for mask in range(FULL_MASK + 1)
+    )
+
+
+def _build_outcomes() -> array:
+    """
+    Evaluate every board encoding. One byte per board: highest bit tells if the
+    game is finished, bits 4-5 keep winner code and low nibble free fields count.
+    Unreachable encodings (overlapping masks) do not exist in this layout.
+    """
+    table: array = array("B", bytes(STATES))
+    for x_mask in range(FULL_MASK + 1):
+        free: int = FULL_MASK & ~x_mask
+        o_mask: int = free
+        while True:
+            x_line: int = FIRST_LINE[x_mask]
+            o_line: int = FIRST_LINE[o_mask]
+            free_count: int = CELLS - bin(x_mask | o_mask).count("1")
+            winner: int = 0
+            if x_line < o_line:
+                winner = 1
+            elif o_line < x_line:
+                winner = 2
+            value: int = free_count | winner << WINNER_SHIFT
+            if winner or not free_count:
+                value |= FINISHED_FLAG
+            table[TERNARY[x_mask] + 2 * TERNARY[o_mask]] = value
+            if not o_mask:
+                break
+            o_mask = (o_mask - 1) & free
+    return table
+
+
+WIN_MASKS: Tuple[int, ...] = _build_win_masks()
+FREE_SPOTS: Tuple[Tuple[Tuple[int, int], ...], ...] = _build_free_spots()
+TERNARY: Tuple[int, ...] = _build_ternary()
+FIRST_LINE: Tuple[int, ...] = _build_first_line()
+OUTCOMES: array = _build_outcomes()
+
+
+def board_index(x_mask: int, o_mask: int) -> int:
+    """Return ternary index of the board described by both symbol masks."""
+    return TERNARY[x_mask] + 2 * TERNARY[o_mask]
+
+
+def outcome(index: int) -> Tuple[bool, Optional[str], int]:
+    """Return (is_finished, winner, free fields count) for given board index."""
+    value: int = OUTCOMES[index]
+    winner_code: int = value >> WINNER_SHIFT & 0x03
+    winner: Optional[str] = SYMBOLS[winner_code - 1] if winner_code else None
+    return bool(value & FINISHED_FLAG), winner, value & FREE_COUNT_MASK
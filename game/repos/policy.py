@@ -0,0 +1,150 @@
+"""
+Perfect-play policy for the 3x3 board.
+
+Every position reachable with either player moving first is solved offline
+and written to a small binary file: a header followed by one byte per
+(side to move, ternary board index), see repos.outcomes. Workers map the file
+read-only, so they share one copy of its pages and a bot move is a single
+byte read. Generate the file with:
+
+    python -m repos.policy [path]
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Dict, Optional, Tuple
+
+from repos.geometry import get_geometry
+from repos.outcomes import BOARD_SIZE, CELLS, STATES, SYMBOLS, board_index, outcome
+from settings import settings
+from utils.exceptions import ImproperlyConfigured
+
+MAGIC: bytes = b"TTTPOL"
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct("<6sH")
+ENTRIES: int = 2 * STATES
+FILE_SIZE: int = HEADER.size + ENTRIES
+
+# entry byte: highest bit marks a solved position, bits 4-5 keep the value for
+# side to move and low nibble the best field (NO_MOVE on finished boards)
+SOLVED: int = 0x80
+VALUE_SHIFT: int = 4
+MOVE_MASK: int = 0x0F
+NO_MOVE: int = 0x0F
+VALUES: Tuple[int, int, int] = (0, 1, -1)  # draw, win, loss
+
+Masks = Tuple[int, int]
+
+
+def _entry_offset(masks: Masks, side: int) -> int:
+    return HEADER.size + side * STATES + board_index(*masks)
+
+
+class _Solver:
+    """Negamax over all positions, preferring quick wins and slow losses."""
+
+    def __init__(self):
+        self.order: Tuple[int, ...] = get_geometry(BOARD_SIZE, BOARD_SIZE).order
+        self.solved: Dict[Tuple[int, int, int], Tuple[int, int]] = {}
+
+    def solve(self, x_mask: int, o_mask: int, side: int) -> Tuple[int, int]:
+        """Return (score, best field) for side to move."""
+        key: Tuple[int, int, int] = (x_mask, o_mask, side)
+        if key in self.solved:
+            return self.solved[key]
+
+        is_finished, winner, free = outcome(board_index(x_mask, o_mask))
+        result: Tuple[int, int] = (0, NO_MOVE)
+        if winner:
+            # previous player has just won, sooner loss scores lower
+            result = (-(free + 1), NO_MOVE)
+        elif not is_finished:
+            masks = [x_mask, o_mask]
+            result = (-CELLS - 2, NO_MOVE)
+            for cell in self.order:
+                if (x_mask | o_mask) >> cell & 1:
+                    continue
+                masks[side] ^= 1 << cell
+                score: int = -self.solve(masks[0], masks[1], side ^ 1)[0]
+                masks[side] ^= 1 << cell
+                if score > result[0]:
+                    result = (score, cell)
+        self.solved[key] = result
+        return result
+
+
+def build_policy() -> bytes:
+    """Solve every reachable position and return the policy file contents."""
+    solver: _Solver = _Solver()
+    for side in range(len(SYMBOLS)):
+        solver.solve(0, 0, side)
+
+    entries: bytearray = bytearray(ENTRIES)
+    for (x_mask, o_mask, side), (score, move) in solver.solved.items():
+        value: int = (score > 0) - (score < 0)
+        entries[_entry_offset((x_mask, o_mask), side) - HEADER.size] = (
+            SOLVED | VALUES.index(value) << VALUE_SHIFT | move
+        )
+    return HEADER.pack(MAGIC, VERSION) + bytes(entries)
+
+
+def write_policy(path: str) -> None:
+    """Write policy file atomically, so running workers never map half of it."""
+    directory: str = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory)
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(build_policy())
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, path)
+
+
+class PerfectPlayPolicy:
+    """Read-only view of the policy file."""
+
+    def __init__(self, path: str):
+        try:
+            with open(path, "rb") as file:
+                self._map: mmap.mmap = mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        except (FileNotFoundError, ValueError) as error:
+            raise ImproperlyConfigured(
+                f"Policy file {path} is missing or empty. "
+                "Generate it with: python -m repos.policy"
+            ) from error
+        if len(self._map) != FILE_SIZE or HEADER.unpack_from(self._map) != (
+            MAGIC,
+            VERSION,
+        ):
+            self._map.close()
+            raise ImproperlyConfigured(f"Policy file {path} has wrong format")
+
+    def _entry(self, masks: Masks, symbol: str) -> Optional[int]:
+        entry: int = self._map[_entry_offset(masks, SYMBOLS.index(symbol))]
+        return entry if entry & SOLVED else None
+
+    def best_move(self, masks: Masks, symbol: str) -> Optional[Tuple[int, int]]:
+        """Return (row, col) of the best move, None on finished boards."""
+        entry: Optional[int] = self._entry(masks, symbol)
+        if entry is None or entry & MOVE_MASK == NO_MOVE:
+            return None
+        return divmod(entry & MOVE_MASK, BOARD_SIZE)
+
+    def value(self, masks: Masks, symbol: str) -> Optional[int]:
+        """Return 1, 0 or -1 when symbol to move wins, draws or loses."""
+        entry: Optional[int] = self._entry(masks, symbol)
+        if entry is None:
+            return None
+        return VALUES[entry >> VALUE_SHIFT & 0x03]
+
+    def close(self) -> None:
+        self._map.close()
+
+
+if __name__ == "__main__":
+    target: str = sys.argv[1] if sys.argv[1:] else settings.bot.policy_path
+    write_policy(target)
+    print(f"Policy written to {target}")
@@ -0,0 +1,93 @@
+"""
+Routing of read-only queries to read replicas.
+
+Replicas are Flask-SQLAlchemy binds made from DB__REPLICA_URLS, see
+settings.get_replica_binds. RoutingSession sends SELECT statements to the
+replica chosen by open ReadScope, everything else goes to the primary. The
+first INSERT, UPDATE, DELETE or flush inside a scope switches its remaining
+reads to the primary too, so request reads its own writes. Requests that
+wrote are answered with READ_PRIMARY_COOKIE, see app.py, and client sending
+it back reads from the primary until the cookie expires, which covers
+replication lag after its write.
+
+Without open scope, or with scope without replica, every query goes to the
+primary as before.
+"""
+import random
+from contextvars import ContextVar, Token
+from typing import Optional, Sequence
+
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+READ_PRIMARY_COOKIE: str = "read_primary"
+
+_current: ContextVar[Optional["ReadScope"]] = ContextVar("read_scope", default=None)
+
+
+def choose_replica(bind_keys: Sequence[str]) -> Optional[str]:
+    """Return random replica bind key, None without replicas."""
+    return random.choice(bind_keys) if bind_keys else None
+
+
+class ReadScope:
+    """Replica reads of one request, until its first write."""
+
+    def __init__(self, replica: Optional[str] = None):
+        self.replica: Optional[str] = replica
+        self.wrote: bool = False
+        self._token: Optional[Token] = None
+
+    @property
+    def read_bind(self) -> Optional[str]:
+        """Bind key reads go to, None for the primary."""
+        return None if self.wrote else self.replica
+
+    def open(self) -> "ReadScope":
+        self._token = _current.set(self)
+        return self
+
+    def close(self) -> None:
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+
+    def __enter__(self) -> "ReadScope":
+        return self.open()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def current_read_scope() -> Optional[ReadScope]:
+    return _current.get()
+
+
+class RoutingSession(FlaskSession):
+    """Session reading from replica of open ReadScope."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        scope: Optional[ReadScope] = _current.get()
+        if (
+            bind is None
+            and scope is not None
+            and scope.read_bind is not None
+            and getattr(clause, "is_select", False)
+        ):
+            return self._db.engines[scope.read_bind]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _read_primary_after_write(state: ORMExecuteState) -> None:
+    scope: Optional[ReadScope] = _current.get()
+    if scope is not None and (state.is_insert or state.is_update or state.is_delete):
+        scope.wrote = True
+
+
+@event.listens_for(Session, "after_flush")
+def _read_primary_after_flush(session: Session, flush_context) -> None:
+    scope: Optional[ReadScope] = _current.get()
+    if scope is not None and (session.new or session.dirty or session.deleted):
+        scope.wrote = True
@@ -0,0 +1,306 @@
+"""
+Game tree search for the computer opponent.
+
+Negamax with alpha-beta pruning and iterative deepening over any N x N board
+with k-in-a-row rule. Positions are keyed by an incrementally updated Zobrist
+hash in a bounded transposition table, which lives as long as the engine, so
+one engine per worker reuses its table across requests.
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from repos.geometry import Geometry, get_geometry
+from repos.outcomes import SYMBOLS
+from repos.symmetry import SymmetricCache
+
+WIN_SCORE: int = 1_000_000
+MAX_PLY: int = 1_000
+INFINITY: int = WIN_SCORE + 1
+EVAL_LIMIT: int = WIN_SCORE - MAX_PLY - 1
+TIME_CHECK_NODES: int = 512
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+Board = List[List[Optional[str]]]
+TableEntry = Tuple[int, int, int, Optional[int]]
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when time budget is spent."""
+
+
+class Position:
+    """Mutable search position: symbol masks, side to move and Zobrist hash."""
+
+    __slots__ = ("geometry", "masks", "side", "key")
+
+    def __init__(self, geometry: Geometry, board: Board, symbol: str):
+        self.geometry: Geometry = geometry
+        self.masks: List[int] = [0, 0]
+        self.side: int = SYMBOLS.index(symbol)
+        self.key: int = geometry.base_key
+        for row, line in enumerate(board):
+            for col, value in enumerate(line):
+                if value:
+                    self._toggle(row * geometry.size + col, SYMBOLS.index(value))
+        if self.side:
+            self.key ^= geometry.side_key
+
+    def _toggle(self, cell: int, side: int) -> None:
+        self.masks[side] ^= 1 << cell
+        self.key ^= self.geometry.zobrist[side][cell]
+
+    def play(self, cell: int) -> None:
+        """Put stone of side to move and pass the turn."""
+        self._toggle(cell, self.side)
+        self.side ^= 1
+        self.key ^= self.geometry.side_key
+
+    def undo(self, cell: int) -> None:
+        """Take back move made with play."""
+        self.side ^= 1
+        self.key ^= self.geometry.side_key
+        self._toggle(cell, self.side)
+
+    def is_win(self, cell: int, side: int) -> bool:
+        """Check only lines through the last move."""
+        mask: int = self.masks[side]
+        for window in self.geometry.windows_through[cell]:
+            if mask & window == window:
+                return True
+        return False
+
+    def free(self) -> int:
+        return self.geometry.full_mask & ~(self.masks[0] | self.masks[1])
+
+    def candidates(self) -> int:
+        """Free fields close to any stone, or all free fields on empty board."""
+        occupied: int = self.masks[0] | self.masks[1]
+        if not occupied:
+            return self.geometry.full_mask
+        if self.geometry.size <= 4:
+            return self.free()
+        near: int = 0
+        remaining: int = occupied
+        while remaining:
+            low: int = remaining & -remaining
+            near |= self.geometry.near[low.bit_length() - 1]
+            remaining ^= low
+        return near & ~occupied
+
+    def evaluate(self) -> int:
+        """Static score for side to move, based on open segments."""
+        own: int = self.masks[self.side]
+        other: int = self.masks[self.side ^ 1]
+        score: int = 0
+        for window in self.geometry.windows:
+            mine: int = own & window
+            theirs: int = other & window
+            if mine and not theirs:
+                score += 10 ** mine.bit_count()
+            elif theirs and not mine:
+                score -= 10 ** theirs.bit_count()
+        return max(-EVAL_LIMIT, min(EVAL_LIMIT, score))
+
+
+class TranspositionTable:
+    """Bounded position table, oldest entries are dropped first."""
+
+    def __init__(self, size: int):
+        self.size: int = size
+        self._entries: "OrderedDict[int, TableEntry]" = OrderedDict()
+        self.hits: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: int) -> Optional[TableEntry]:
+        entry: Optional[TableEntry] = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def store(self, key: int, entry: TableEntry) -> None:
+        if key not in self._entries and len(self._entries) >= self.size:
+            self._entries.popitem(last=False)
+        self._entries[key] = entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+
+
+class SearchEngine:
+    """Alpha-beta engine choosing moves within a time budget."""
+
+    def __init__(self, table_size: int = 1 << 18, time_budget: float = 0.25):
+        self.table: TranspositionTable = TranspositionTable(table_size)
+        # solved positions, shared by all boards symmetric to them
+        self.replies: SymmetricCache[int] = SymmetricCache(table_size)
+        self.time_budget: float = time_budget
+        self.nodes: int = 0
+        self._deadline: float = 0.0
+
+    def best_move(
+        self,
+        board: Board,
+        symbol: str,
+        win_length: int = 3,
+        time_budget: Optional[float] = None,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Return (row, col) of the best move for symbol, or None if board is full.
+        Deepens the search until it is solved or time budget is spent.
+        """
+        geometry: Geometry = get_geometry(len(board), win_length)
+        position: Position = Position(geometry, board, symbol)
+        masks: Tuple[int, int] = (position.masks[0], position.masks[1])
+        context: Tuple[int, int] = (win_length, position.side)
+        cached: Optional[Tuple[int, int, int]] = self.replies.get(
+            masks, geometry.size, context
+        )
+        if cached:
+            return cached[0], cached[1]
+
+        budget: float = self.time_budget if time_budget is None else time_budget
+        self._deadline = time.perf_counter() + budget
+        self.nodes = 0
+
+        moves: List[int] = self._ordered_moves(position, None)
+        if not moves:
+            return None
+        best, value, solved = self._deepen(position, moves[0])
+        move: Tuple[int, int] = divmod(best, geometry.size)
+        if solved:
+            self.replies.store(masks, geometry.size, move, value, context)
+        return move
+
+    def _deepen(self, position: Position, best: int) -> Tuple[int, int, bool]:
+        """
+        Search one ply deeper each iteration. Return best move, its value and
+        whether the position got solved before time budget was spent.
+        """
+        value: int = 0
+        for depth in range(1, bin(position.free()).count("1") + 1):
+            try:
+                value, move = self._search_root(position, depth)
+            except SearchTimeout:
+                return best, value, False
+            if move is not None:
+                best = move
+            if abs(value) >= WIN_SCORE - MAX_PLY:
+                break
+        return best, value, True
+
+    def _search_root(self, position: Position, depth: int) -> Tuple[int, Optional[int]]:
+        """Search all root moves, best one is also kept in the table."""
+        entry: Optional[TableEntry] = self.table.get(position.key)
+        moves: List[int] = self._ordered_moves(position, entry[3] if entry else None)
+        alpha: int = -INFINITY
+        best_move: Optional[int] = None
+        for move in moves:
+            value: int = self._child_value(position, move, depth, -INFINITY, -alpha, 0)
+            if value > alpha:
+                alpha, best_move = value, move
+        self.table.store(position.key, (depth, alpha, EXACT, best_move))
+        return alpha, best_move
+
+    def _child_value(
+        self, position: Position, move: int, depth: int, alpha: int, beta: int, ply: int
+    ) -> int:
+        """Play move and return its value for the side that made it."""
+        side: int = position.side
+        position.play(move)
+        try:
+            if position.is_win(move, side):
+                return WIN_SCORE - ply
+            if not position.free():
+                return 0
+            return -self._negamax(position, depth - 1, alpha, beta, ply + 1)
+        finally:
+            position.undo(move)
+
+    def _negamax(
+        self, position: Position, depth: int, alpha: int, beta: int, ply: int
+    ) -> int:
+        self.nodes += 1
+        if not self.nodes % TIME_CHECK_NODES and time.perf_counter() > self._deadline:
+            raise SearchTimeout
+        if depth <= 0:
+            return position.evaluate()
+
+        original_alpha: int = alpha
+        entry: Optional[TableEntry] = self.table.get(position.key)
+        if entry and entry[0] >= depth:
+            value: int = self._from_table(entry[1], ply)
+            alpha, beta = self._narrow_window(entry[2], value, alpha, beta)
+            if alpha >= beta:
+                return value
+
+        best: int = -INFINITY
+        best_move: Optional[int] = None
+        for move in self._ordered_moves(position, entry[3] if entry else None):
+            value = self._child_value(position, move, depth, -beta, -alpha, ply)
+            if value > best:
+                best, best_move = value, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        flag: int = EXACT
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        self.table.store(
+            position.key, (depth, self._to_table(best, ply), flag, best_move)
+        )
+        return best
+
+    @staticmethod
+    def _narrow_window(flag: int, value: int, alpha: int, beta: int) -> Tuple[int, int]:
+        """Use table bound to narrow the window, exact value closes it."""
+        if flag == EXACT:
+            return value, value
+        if flag == LOWER:
+            return max(alpha, value), beta
+        return alpha, min(beta, value)
+
+    @staticmethod
+    def _to_table(value: int, ply: int) -> int:
+        """Store mate scores relative to the position, not to the root."""
+        if value >= WIN_SCORE - MAX_PLY:
+            return value + ply
+        if value <= -WIN_SCORE + MAX_PLY:
+            return value - ply
+        return value
+
+    @staticmethod
+    def _from_table(value: int, ply: int) -> int:
+        if value >= WIN_SCORE - MAX_PLY:
+            return value - ply
+        if value <= -WIN_SCORE + MAX_PLY:
+            return value + ply
+        return value
+
+    @staticmethod
+    def _ordered_moves(position: Position, first: Optional[int]) -> List[int]:
+        """Table move first, then fields lying on the most lines."""
+        candidates: int = position.candidates()
+        moves: List[int] = [
+            cell for cell in position.geometry.order if candidates >> cell & 1
+        ]
+        if first is not None and candidates >> first & 1:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters of the last search and table usage."""
+        return {
+            "nodes": self.nodes,
+            "table_size": len(self.table),
+            "replies_size": len(self.replies),
+            "replies_hits": self.replies.hits,
+        }
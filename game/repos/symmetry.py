@@ -0,0 +1,157 @@
+"""
+Dihedral symmetries of square boards.
+
+Square board has 8 symmetries (4 rotations, each optionally mirrored), so any
+cache keyed by board keeps up to 8 copies of what is one position. Boards are
+mapped to canonical form (smallest pair of symbol masks among all transforms)
+together with the transform used, and moves are mapped back with its inverse.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Generic, Optional, Tuple, TypeVar
+
+TRANSFORMS: int = 8
+MASK_TABLE_MAX_SIZE: int = 3
+
+Masks = Tuple[int, int]
+Value = TypeVar("Value")
+
+
+def _transform_field(row: int, col: int, transform: int, size: int) -> Tuple[int, int]:
+    """Apply transform to field: transforms 0-3 rotate, 4-7 rotate and mirror."""
+    last: int = size - 1
+    if transform >= 4:
+        col = last - col
+    for _ in range(transform % 4):
+        row, col = col, last - row
+    return row, col
+
+
+@lru_cache(maxsize=32)
+def permutations(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """Return field permutation (field -> transformed field) for every transform."""
+    return tuple(
+        tuple(
+            row * size + col
+            for row, col in (
+                _transform_field(cell // size, cell % size, transform, size)
+                for cell in range(size * size)
+            )
+        )
+        for transform in range(TRANSFORMS)
+    )
+
+
+@lru_cache(maxsize=32)
+def inverse_permutations(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """Return permutations undoing those from permutations()."""
+    result = []
+    for permutation in permutations(size):
+        inverse = [0] * len(permutation)
+        for cell, target in enumerate(permutation):
+            inverse[target] = cell
+        result.append(tuple(inverse))
+    return tuple(result)
+
+
+@lru_cache(maxsize=4)
+def _mask_tables(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """Transformed value of every possible mask, for small boards only."""
+    return tuple(
+        tuple(_permute_mask(mask, permutation) for mask in range(1 << size * size))
+        for permutation in permutations(size)
+    )
+
+
+def _permute_mask(mask: int, permutation: Tuple[int, ...]) -> int:
+    result: int = 0
+    while mask:
+        low: int = mask & -mask
+        result |= 1 << permutation[low.bit_length() - 1]
+        mask ^= low
+    return result
+
+
+def transform_masks(masks: Masks, transform: int, size: int) -> Masks:
+    """Apply transform to both symbol masks."""
+    if size <= MASK_TABLE_MAX_SIZE:
+        table: Tuple[int, ...] = _mask_tables(size)[transform]
+        return table[masks[0]], table[masks[1]]
+    permutation: Tuple[int, ...] = permutations(size)[transform]
+    return _permute_mask(masks[0], permutation), _permute_mask(masks[1], permutation)
+
+
+def canonical_form(masks: Masks, size: int) -> Tuple[Masks, int]:
+    """Return canonical masks of the board and the transform leading to them."""
+    best: Masks = masks
+    best_transform: int = 0
+    for transform in range(1, TRANSFORMS):
+        candidate: Masks = transform_masks(masks, transform, size)
+        if candidate < best:
+            best, best_transform = candidate, transform
+    return best, best_transform
+
+
+def to_canonical_move(row: int, col: int, transform: int, size: int) -> Tuple[int, int]:
+    """Map move on original board to the canonical board."""
+    return divmod(permutations(size)[transform][row * size + col], size)
+
+
+def from_canonical_move(
+    row: int, col: int, transform: int, size: int
+) -> Tuple[int, int]:
+    """Map move on canonical board back to the original board."""
+    return divmod(inverse_permutations(size)[transform][row * size + col], size)
+
+
+class SymmetricCache(Generic[Value]):
+    """
+    Bounded cache of per-position moves shared by all symmetric positions.
+    Moves are stored in canonical coordinates and mapped back on read.
+    """
+
+    def __init__(self, max_size: int = 1 << 16):
+        self.max_size: int = max_size
+        self._entries: "OrderedDict[tuple, Tuple[int, int, Value]]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, masks: Masks, size: int, context: tuple) -> Tuple[tuple, int]:
+        """Return cache key and transform for given board."""
+        canonical, transform = canonical_form(masks, size)
+        return (size, context, canonical), transform
+
+    def get(
+        self, masks: Masks, size: int, context: tuple = ()
+    ) -> Optional[Tuple[int, int, Value]]:
+        """Return cached (row, col, value) mapped onto given board."""
+        key, transform = self.key(masks, size, context)
+        entry: Optional[Tuple[int, int, Value]] = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        row, col = from_canonical_move(entry[0], entry[1], transform, size)
+        return row, col, entry[2]
+
+    def store(
+        self,
+        masks: Masks,
+        size: int,
+        move: Tuple[int, int],
+        value: Value,
+        context: tuple = (),
+    ) -> None:
+        """Store move made on given board."""
+        key, transform = self.key(masks, size, context)
+        if key not in self._entries and len(self._entries) >= self.max_size:
+            self._entries.popitem(last=False)
+        row, col = to_canonical_move(move[0], move[1], transform, size)
+        self._entries[key] = (row, col, value)
+
+    def hit_rate(self) -> float:
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
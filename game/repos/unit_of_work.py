@@ -0,0 +1,48 @@
+"""
+Unit of work: repository writes made inside one block share a transaction.
+
+While the block is open BaseMixin.save only flushes, so every statement still
+reaches the database and RETURNING values come back at once, but the
+transaction is committed a single time when the outermost block ends and
+rolled back when it raises. Use it as a context manager or as a decorator:
+
+    @UnitOfWork()
+    def play_start(...):
+        ...
+"""
+from contextlib import ContextDecorator
+from typing import Optional
+
+from entities.models import UNIT_OF_WORK, db
+
+
+class UnitOfWork(ContextDecorator):
+    """Commit once on exit of the outermost block, roll back on error."""
+
+    def __init__(self, session=None):
+        self._session = session
+
+    @property
+    def session(self):
+        return self._session if self._session is not None else db.session
+
+    def __enter__(self) -> "UnitOfWork":
+        info: dict = self.session.info
+        info[UNIT_OF_WORK] = info.get(UNIT_OF_WORK, 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> Optional[bool]:
+        info: dict = self.session.info
+        info[UNIT_OF_WORK] -= 1
+        if info[UNIT_OF_WORK]:
+            return None
+        del info[UNIT_OF_WORK]
+        if exc_type is None:
+            try:
+                self.session.commit()
+                return None
+            except Exception:
+                self.session.rollback()
+                raise
+        self.session.rollback()
+        return None
@@ -1,7 +1,8 @@
 import os
 import secrets
+from datetime import timedelta
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic import BaseSettings, SecretStr
 
@@ -21,11 +22,44 @@ class DatabaseSettings(BaseSettings):
     username: str = "postgres"
     password: SecretStr = SecretStr("postgres")
     name: str = "postgres"
+    # connection pool of every worker process
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_pre_ping: bool = True
+    pool_recycle: int = 1800
+    # checkouts waiting longer than this many seconds are logged
+    pool_slow_checkout: float = 0.1
+    # comma separated URLs of read replicas, empty to read from the primary only
+    replica_urls: str = ""
+    # seconds client reads from the primary after its write, see repos.replicas
+    replica_lag: int = 5
+
+
+class BotSettings(BaseSettings):
+    """Computer opponent settings"""
+
+    time_budget: float = 0.25
+    table_size: int = 1 << 18
+    policy_path: str = os.path.join(ROOT_PATH, "data", "policy.bin")
+
+
+class ArchiveSettings(BaseSettings):
+    """Cold storage of finished sessions, see repos.archive"""
+
+    # directory on persistent storage, archiving refuses to run without it
+    path: Optional[str] = None
+    older_than_days: int = 90
+    batch_size: int = 500
 
 
 class Settings(BaseSettings):
     db: DatabaseSettings
+    bot: BotSettings = BotSettings()
+    archive: ArchiveSettings = ArchiveSettings()
     jwt: Optional[str]
+    # Bearer token of /internal/ endpoints, they answer 403 without one set
+    internal_token: Optional[str] = None
 
     class Config:
         env_file = os.path.join(ROOT_PATH, "../.env")
@@ -52,8 +86,34 @@ def get_db_url() -> str:
     return url
 
 
+def get_engine_options() -> dict:
+    """Pool options for SQLALCHEMY_ENGINE_OPTIONS."""
+    return {
+        "pool_size": settings.db.pool_size,
+        "max_overflow": settings.db.max_overflow,
+        "pool_timeout": settings.db.pool_timeout,
+        "pool_pre_ping": settings.db.pool_pre_ping,
+        "pool_recycle": settings.db.pool_recycle,
+    }
+
+
+def get_replica_binds() -> Dict[str, dict]:
+    """SQLALCHEMY_BINDS of read replicas, keyed replica_0, replica_1 and so on."""
+    urls = [url.strip() for url in settings.db.replica_urls.split(",") if url.strip()]
+    return {
+        f"replica_{number}": {"url": url, **get_engine_options()}
+        for number, url in enumerate(urls)
+    }
+
+
 class PlayCredits(Enum):
     """Play credits enum"""
 
     WIN = 4
     PLAY = 3
+
+
+# Session is finished this long after it started, whatever its status says.
+# Lookups of open sessions, their games and high scores are bounded by it, so
+# they read only the newest partitions of created_at.
+MAX_SESSION_LENGTH: timedelta = timedelta(hours=24)
@@ -0,0 +1,184 @@
+"""
+Self-play simulator. Plays whole sessions without the database: the user side
+and the bot side both pick moves with UserUseCase.choose_bot_field on a real
+GridManager, the user moves first as in play_move, and credits follow
+PlayCredits like start_session, create_new_game and play_move do.
+
+Run from the ``game`` directory:
+
+    python simulate.py --sessions 100000 --player easy --bot hard --workers 8
+"""
+import argparse
+import random
+import sys
+import time
+from collections import Counter, namedtuple
+from itertools import cycle
+from multiprocessing import Pool
+from typing import Iterator, List, Optional, Tuple
+
+from entities.types import Difficulty, GameOptions
+from repos.db_repo import GameDBRepo, UserDBRepo, UserSessionDBRepo
+from repos.managers import GridManager, default_win_length
+from repos.outcomes import SYMBOLS
+from settings import PlayCredits
+from use_cases.use_case import UserUseCase
+
+CHUNK_SESSIONS: int = 250
+
+SimulationOptions = namedtuple(
+    "SimulationOptions",
+    "player game sessions start_credits max_games workers seed time_budget",
+    defaults=(Difficulty.EASY.value, GameOptions(), 10_000, 10, 100, 1, 0, None),
+)
+
+_use_case: Optional[UserUseCase] = None
+
+
+def play_game(use_case: UserUseCase, options: SimulationOptions, symbol: str) -> str:
+    """Play one game, user with given symbol moves first. Return winner or "draw"."""
+    grid: GridManager = GridManager(
+        GridManager.initialize_grid(options.game.size), options.game.win_length
+    )
+    bot_symbol: str = "O" if symbol == "X" else "X"
+    turns: Iterator[Tuple[str, str]] = cycle(
+        [(symbol, options.player), (bot_symbol, options.game.difficulty)]
+    )
+    for mover, difficulty in turns:
+        row, col = use_case.choose_bot_field(grid, mover, difficulty)
+        grid.make_move(row - 1, col - 1, mover)
+        is_finished, winner = grid.check_game_state()
+        if is_finished:
+            break
+    return winner or "draw"
+
+
+def play_session(use_case: UserUseCase, options: SimulationOptions) -> Counter:
+    """
+    Play games until user can't pay for the next one or game limit is hit.
+    Return counters of games, results and credits of the session.
+    """
+    stats: Counter = Counter(sessions=1)
+    credits: int = options.start_credits - PlayCredits.PLAY.value
+    stats["credits_spent"] += PlayCredits.PLAY.value
+    for games in range(1, options.max_games + 1):
+        symbol: str = random.choice(SYMBOLS)
+        winner: str = play_game(use_case, options, symbol)
+        stats["games"] += 1
+        stats[f"winner_{winner}"] += 1
+        if winner == symbol:
+            stats["user_wins"] += 1
+            credits += PlayCredits.WIN.value
+            stats["credits_won"] += PlayCredits.WIN.value
+        elif winner != "draw":
+            stats["bot_wins"] += 1
+        if credits < PlayCredits.PLAY.value:
+            break
+        if games < options.max_games:
+            credits -= PlayCredits.PLAY.value
+            stats["credits_spent"] += PlayCredits.PLAY.value
+    else:
+        stats["capped_sessions"] += 1
+    stats["credits_left"] += credits
+    return stats
+
+
+def _init_worker(time_budget: Optional[float]) -> None:
+    """Every worker owns its use case, so search engine tables stay warm."""
+    global _use_case
+    _use_case = UserUseCase(UserDBRepo, UserSessionDBRepo, GameDBRepo)
+    if time_budget is not None:
+        _use_case.search_engine.time_budget = time_budget
+
+
+def _run_chunk(task: Tuple[SimulationOptions, int, int]) -> Counter:
+    options, seed, sessions = task
+    random.seed(seed)
+    stats: Counter = Counter()
+    for _ in range(sessions):
+        stats.update(play_session(_use_case, options))
+    return stats
+
+
+def run(options: SimulationOptions) -> Tuple[Counter, float]:
+    """Spread sessions over worker processes. Return summed stats and seconds."""
+    tasks: List[Tuple[SimulationOptions, int, int]] = [
+        (options, options.seed * 1_000_003 + num, min(CHUNK_SESSIONS, left))
+        for num, left in enumerate(range(options.sessions, 0, -CHUNK_SESSIONS))
+    ]
+    stats: Counter = Counter()
+    start: float = time.perf_counter()
+    with Pool(
+        options.workers, initializer=_init_worker, initargs=(options.time_budget,)
+    ) as pool:
+        for chunk in pool.imap_unordered(_run_chunk, tasks):
+            stats.update(chunk)
+    return stats, time.perf_counter() - start
+
+
+def report(stats: Counter, seconds: float) -> List[str]:
+    """Format simulation stats as report lines."""
+    games: int = stats["games"] or 1
+    sessions: int = stats["sessions"] or 1
+    spent: int = stats["credits_spent"]
+    house_edge: float = (spent - stats["credits_won"]) / spent if spent else 0.0
+    lines: List[str] = [
+        f"games:            {stats['games']:,} in {seconds:.2f} s "
+        f"({stats['games'] / seconds:,.0f} games/s)",
+        f"user won:         {stats['user_wins'] / games:7.2%}",
+        f"bot won:          {stats['bot_wins'] / games:7.2%}",
+    ]
+    for result in (*SYMBOLS, "draw"):
+        label: str = f"{result} won:" if result != "draw" else "draw:"
+        lines.append(f"{label:<18}{stats[f'winner_{result}'] / games:7.2%}")
+    lines += [
+        f"sessions:         {stats['sessions']:,} "
+        f"({stats['capped_sessions'] / sessions:.2%} hit the game limit)",
+        f"games/session:    {stats['games'] / sessions:7.2f}",
+        f"score/session:    {stats['user_wins'] / sessions:7.2f}",
+        f"spent/session:    {spent / sessions:7.2f} credits",
+        f"won/session:      {stats['credits_won'] / sessions:7.2f} credits",
+        f"left/session:     {stats['credits_left'] / sessions:7.2f} credits",
+        f"house edge:       {house_edge:7.2%}",
+    ]
+    return lines
+
+
+def parse_args(argv: List[str]) -> SimulationOptions:
+    difficulties: List[str] = [level.value for level in Difficulty]
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--player", choices=difficulties, default="easy")
+    parser.add_argument("--bot", choices=difficulties, default="easy")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int)
+    parser.add_argument("--credits", type=int, default=10)
+    parser.add_argument("--max-games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--time-budget", type=float, help="seconds per hard move, BOT__TIME_BUDGET"
+    )
+    args = parser.parse_args(argv)
+
+    game: GameOptions = GameOptions(
+        difficulty=args.bot,
+        size=args.size,
+        win_length=args.win_length or default_win_length(args.size),
+    )
+    if error := UserUseCase.validate_game_options(game):
+        parser.error(error)
+    return SimulationOptions(
+        player=args.player,
+        game=game,
+        sessions=args.sessions,
+        start_credits=args.credits,
+        max_games=args.max_games,
+        workers=args.workers,
+        seed=args.seed,
+        time_budget=args.time_budget,
+    )
+
+
+if __name__ == "__main__":
+    print("\n".join(report(*run(parse_args(sys.argv[1:])))))
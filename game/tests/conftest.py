@@ -2,9 +2,11 @@ import pytest
 from app import app as flask_app
 from entities.entites import GameListPydantic, UserPydantic, UserSessionListPydantic
 from entities.types import SessionStatus
-from flask import Response
+from entities.models import db
+from flask import Flask, Response
 from flask.testing import FlaskClient
 from pytest_mock import MockFixture
+from repos.archive import SessionArchive
 from repos.db_repo import GameDBRepo, UserDBRepo, UserSessionDBRepo
 from tests.factories import GameFactory, UserFactory, UserSessionFactory
 from tests.utils import game2pydantic_list, user2pydantic, user_session2pydantic_list
@@ -19,6 +21,18 @@ def client():
             yield client
 
 
+@pytest.fixture
+def sqlite_app(tmp_path) -> Flask:
+    """SQLite database standing in for Postgres"""
+
+    app: Flask = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'game.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
 @pytest.fixture
 def jwt_token_headers(client: FlaskClient, mocker: "MockFixture"):
     user: UserFactory = UserFactory.create()
@@ -41,11 +55,14 @@ def mock_session_status_response(mocker: "MockFixture"):
 
 
 @pytest.fixture
-def use_case():
+def use_case(tmp_path):
     """Return UserUseCase instance"""
 
     return UserUseCase(
-        db_repo=UserDBRepo, user_session_repo=UserSessionDBRepo, game_db_repo=GameDBRepo
+        db_repo=UserDBRepo,
+        user_session_repo=UserSessionDBRepo,
+        game_db_repo=GameDBRepo,
+        archive=SessionArchive(str(tmp_path / "archive")),
     )
 
 
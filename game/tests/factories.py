@@ -43,9 +43,9 @@ class GameFactory(factory.Factory):
     symbol: str = "X"
     status: str = "not_started"
     session_id: int = 1
-    board: Dict[str, List[List[str | None]]] = {
-        "board": [[None, None, None] for _ in range(3)]
-    }
+    board: Dict[str, List[List[str | None]]] = factory.LazyFunction(
+        lambda: {"board": [[None, None, None] for _ in range(3)]}
+    )
     user: User = factory.SubFactory(UserFactory)
     session: UserSession = factory.SubFactory(UserSessionFactory)
 
@@ -0,0 +1,205 @@
+import os
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from flask import Flask
+
+from entities.models import Game, GameMove, User, UserSession, db
+from entities.types import GameStatus, SessionStatusStates
+from repos import archive as archive_module
+from repos.archive import SessionArchive, archive_finished_sessions
+from use_cases.use_case import UserUseCase
+from utils.exceptions import ImproperlyConfigured
+
+NOW: datetime = datetime(2026, 10, 17, 12, 0)
+
+
+def _record(session_id: int, user_id: int = 1) -> dict:
+    return {
+        "session": {
+            "id": session_id,
+            "score": 2,
+            "user_id": user_id,
+            "status": SessionStatusStates.FINISHED.value,
+            "created_at": NOW - timedelta(hours=1),
+            "ended_at": NOW,
+        },
+        "games": [
+            {
+                "id": session_id * 10,
+                "board": {"new_board": [["X", None], [None, "O"]]},
+                "user_id": user_id,
+                "symbol": "X",
+                "winner": None,
+                "session_id": session_id,
+                "status": GameStatus.FINISHED.value,
+                "difficulty": "easy",
+                "size": 2,
+                "win_length": 2,
+                "created_at": NOW - timedelta(hours=1),
+                "moves": [[0, 0], [1, 3]],
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def archive(tmp_path) -> SessionArchive:
+    (tmp_path / "archive").mkdir()
+    return SessionArchive(str(tmp_path / "archive"))
+
+
+def test_archive_round_trip(archive: SessionArchive) -> None:
+    """Test SessionArchive. Expect records of every batch read back as written"""
+
+    archive.append([_record(1), _record(2, user_id=2)])
+    archive.append([_record(3)])
+
+    assert [record["session"]["id"] for record in archive.records(1)] == [1, 3]
+    assert archive.find_session(2, 2) == _record(2, user_id=2)
+    assert archive.find_game(1, 3, 30)["moves"] == [[0, 0], [1, 3]]
+    assert archive.find_game(1, 3, 31) is None
+    assert archive.find_session(1, 2) is None
+    assert archive.find_session(5, 1) is None
+
+
+def test_archive_index(archive: SessionArchive, mocker) -> None:
+    """
+    Test SessionArchive.find_session. Expect session read from its own gzip
+    member found by index, other members and missing sessions never read
+    """
+
+    archive.append([_record(1), _record(2)])
+    archive.append([_record(3)])
+    with open(archive.index_file(1)) as index:
+        offsets: List[int] = [int(line.split()[0]) for line in index]
+    records = mocker.spy(archive, "records")
+    member_lines = mocker.spy(archive_module, "_member_lines")
+
+    assert archive.find_session(1, 3) == _record(3)
+    assert archive.find_session(1, 4) is None
+
+    assert offsets[0] == 0 and offsets[1] > 0
+    assert member_lines.call_count == 1
+    records.assert_not_called()
+
+
+def test_archive_indexes_old_file(archive: SessionArchive) -> None:
+    """
+    Test SessionArchive. Expect file without index scanned, then indexed with
+    all its members on the next append
+    """
+
+    archive.append([_record(1)])
+    archive.append([_record(2)])
+    os.remove(archive.index_file(1))
+
+    assert archive.find_session(1, 2) == _record(2)
+
+    archive.append([_record(3)])
+
+    with open(archive.index_file(1)) as index:
+        assert [line.split()[1] for line in index] == ["1", "2", "3"]
+    assert [archive.find_session(1, session_id) for session_id in (1, 2, 3)] == [
+        _record(1),
+        _record(2),
+        _record(3),
+    ]
+
+
+def test_archive_without_path(tmp_path, mocker) -> None:
+    """
+    Test archive_finished_sessions. Expect refusal without an existing
+    archive directory, nothing loaded or deleted, reads finding nothing
+    """
+
+    load_batch = mocker.patch("repos.archive._load_batch")
+    mocker.patch("settings.settings.archive.path", None)
+
+    for archive in (SessionArchive(), SessionArchive(str(tmp_path / "missing"))):
+        with pytest.raises(ImproperlyConfigured):
+            archive_finished_sessions(archive, NOW)
+    assert SessionArchive().find_session(1, 1) is None
+    assert list(SessionArchive().records(1)) == []
+    load_batch.assert_not_called()
+
+
+def test_archive_finished_sessions(sqlite_app: Flask, archive: SessionArchive) -> None:
+    """
+    Test archive_finished_sessions.
+    Expect old finished sessions moved to archive in batches, the rest kept
+    """
+
+    old: datetime = NOW - timedelta(days=100)
+    db.session.add(User(id=1, email="a@a.pl", password="a", credits=10))
+    for session_id, status, ended_at in (
+        (1, SessionStatusStates.FINISHED.value, old),
+        (2, SessionStatusStates.FINISHED.value, old),
+        (3, SessionStatusStates.FINISHED.value, NOW),
+        (4, SessionStatusStates.ACTIVE.value, None),
+    ):
+        db.session.add(
+            UserSession(
+                id=session_id,
+                user_id=1,
+                status=status,
+                created_at=old - timedelta(hours=1),
+                ended_at=ended_at,
+            )
+        )
+        db.session.add(
+            Game(
+                id=session_id,
+                board=[[None] * 3 for _ in range(3)],
+                user_id=1,
+                symbol="X",
+                session_id=session_id,
+                created_at=old - timedelta(hours=1),
+            )
+        )
+        db.session.add(GameMove(game_id=session_id, ply=0, cell=4))
+    db.session.commit()
+
+    archived: int = archive_finished_sessions(
+        archive, NOW - timedelta(days=90), batch_size=1
+    )
+
+    assert archived == 2
+    assert [record["session"]["id"] for record in archive.records(1)] == [1, 2]
+    assert archive.find_game(1, 1, 1)["moves"] == [[0, 4]]
+    remaining: List[int] = sorted(db.session.scalars(db.select(UserSession.id)))
+    assert remaining == [3, 4]
+    assert sorted(db.session.scalars(db.select(Game.id))) == [3, 4]
+    assert sorted(db.session.scalars(db.select(GameMove.game_id))) == [3, 4]
+
+
+def test_get_session_object_from_archive(use_case: UserUseCase, mocker) -> None:
+    """
+    Test use_case.get_session_object method.
+    Expect archived session returned when it isn't in the database
+    """
+
+    mocker.patch("repos.db_repo.UserSessionDBRepo.filter", return_value=None)
+    use_case.archive.append([_record(7)])
+
+    session = use_case.get_session_object(session_id=7, user_id=1)
+
+    assert session.__root__[0].id == 7
+    assert session.__root__[0].status == SessionStatusStates.FINISHED.value
+    assert use_case.get_session_object(session_id=8, user_id=1) is None
+
+
+def test_replay_from_archive(use_case: UserUseCase, mocker) -> None:
+    """Test use_case.replay method. Expect archived game replayed from archive"""
+
+    mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=None)
+    use_case.archive.append([_record(7)])
+
+    lines, status_code = use_case.replay(session_id=7, user_id=1, game_id=70)
+
+    assert status_code == 200
+    assert list(lines) == [
+        '{"ply": 0, "row": 1, "col": 1, "symbol": "X"}\n',
+        '{"ply": 1, "row": 2, "col": 2, "symbol": "O"}\n',
+    ]
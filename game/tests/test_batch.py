@@ -0,0 +1,96 @@
+import random
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pytest
+from repos.batch import BatchOutcome, encode_boards, evaluate_boards
+from repos.managers import GridManager
+from repos.outcomes import SYMBOLS
+
+Board = List[List[Optional[str]]]
+
+
+def expected_state(board: Board, win_length: Optional[int]) -> Tuple[bool, int, int]:
+    """Game state from GridManager, winner as symbol code."""
+    grid: GridManager = GridManager(board, win_length)
+    is_finished, winner = grid.check_game_state()
+    code: int = SYMBOLS.index(winner) + 1 if winner else 0
+    return is_finished, code, len(grid.find_free_spots())
+
+
+def random_board(rnd: random.Random, size: int, fill: float) -> Board:
+    return [
+        [rnd.choice(SYMBOLS) if rnd.random() < fill else None for _ in range(size)]
+        for _ in range(size)
+    ]
+
+
+def assert_parity(boards: List[Board], win_length: Optional[int] = None) -> None:
+    result: BatchOutcome = evaluate_boards(encode_boards(boards), win_length)
+    for num, board in enumerate(boards):
+        assert (
+            bool(result.finished[num]),
+            int(result.winner[num]),
+            int(result.free[num]),
+        ) == expected_state(board, win_length)
+
+
+def test_evaluate_boards_every_classic_board() -> None:
+    """Test all 3^9 fillings of 3x3 board, also unreachable ones, against GridManager."""
+    codes: np.ndarray = np.array(
+        [[(index // 3**cell) % 3 for cell in range(9)] for index in range(3**9)],
+        dtype=np.int8,
+    ).reshape(-1, 3, 3)
+    result: BatchOutcome = evaluate_boards(codes)
+
+    for num, board_codes in enumerate(codes):
+        board: Board = [
+            [SYMBOLS[code - 1] if code else None for code in line]
+            for line in board_codes
+        ]
+        assert (
+            bool(result.finished[num]),
+            int(result.winner[num]),
+            int(result.free[num]),
+        ) == expected_state(board, None)
+
+
+@pytest.mark.parametrize(
+    "size, win_length", [(3, None), (5, 3), (5, 4), (7, 4), (15, None), (19, 5)]
+)
+def test_evaluate_boards_random_boards(size: int, win_length: Optional[int]) -> None:
+    """Test random boards with different fill ratios against GridManager."""
+    rnd: random.Random = random.Random(size)
+    boards: List[Board] = [
+        random_board(rnd, size, fill) for fill in (0.0, 0.2, 0.4, 0.6, 1.0) * 40
+    ]
+
+    assert_parity(boards, win_length)
+
+
+def test_evaluate_boards_lines_at_edges() -> None:
+    """Test lines touching every edge and corner of the board."""
+    boards: List[Board] = []
+    for row, col, d_row, d_col in (
+        (14, 0, 0, 1),
+        (10, 14, 1, 0),
+        (10, 10, 1, 1),
+        (10, 4, 1, -1),
+        (0, 14, 1, -1),
+    ):
+        board: Board = GridManager.initialize_grid(15)
+        for step in range(5):
+            board[row + d_row * step][col + d_col * step] = "O"
+        boards.append(board)
+
+    result: BatchOutcome = evaluate_boards(encode_boards(boards))
+
+    assert result.winner.tolist() == [2] * len(boards)
+    assert result.finished.all()
+    assert_parity(boards)
+
+
+def test_evaluate_boards_wrong_shape() -> None:
+    """Test if boards that are not square are rejected."""
+    with pytest.raises(ValueError):
+        evaluate_boards(np.zeros((2, 3, 4), dtype=np.int8))
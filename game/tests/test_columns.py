@@ -0,0 +1,91 @@
+import random
+from collections import namedtuple
+from typing import List, Optional
+from unittest.mock import MagicMock
+
+import pytest
+from entities.columns import BOARD_KEY, PackedBoard, pack_board, unpack_board
+from migrate_boards import UPDATE_BATCH, packed_rows, stale_rows, swap_columns
+
+Board = List[List[Optional[str]]]
+
+
+def random_board(size: int, seed: int) -> Board:
+    rnd: random.Random = random.Random(seed)
+    return [[rnd.choice(["X", "O", None]) for _ in range(size)] for _ in range(size)]
+
+
+@pytest.mark.parametrize("size", [3, 4, 7, 15, 19])
+def test_pack_board_round_trip(size: int) -> None:
+    """Test if every board size is decoded back to the same nested list."""
+    for seed in range(20):
+        board: Board = random_board(size, seed)
+
+        assert unpack_board(pack_board(board)) == board
+
+
+def test_pack_board_classic_size() -> None:
+    """Test if 3x3 board takes 5 bytes: size and two 2-byte masks."""
+    board: Board = [["X", None, None], [None, "O", None], [None, None, "X"]]
+
+    assert pack_board(board) == bytes((3, 0b0001, 0b1, 0b10000, 0))
+
+
+def test_pack_board_unknown_symbol() -> None:
+    """Test if symbol other than X or O is rejected."""
+    with pytest.raises(ValueError):
+        pack_board([["Y", None, None], [None] * 3, [None] * 3])
+
+
+def test_packed_board_column_keeps_board_shape() -> None:
+    """Test if column accepts board dict or list and returns board dict."""
+    column: PackedBoard = PackedBoard()
+    board: Board = random_board(3, 1)
+
+    packed: bytes = column.process_bind_param({BOARD_KEY: board}, None)
+
+    assert packed == column.process_bind_param(board, None)
+    assert column.process_result_value(memoryview(packed), None) == {BOARD_KEY: board}
+    assert column.process_bind_param(None, None) is None
+    assert column.process_result_value(None, None) is None
+
+
+def test_migration_packed_rows() -> None:
+    """Test if JSON boards selected by migration are packed for batch update."""
+    row = namedtuple("Row", "id board")
+    board: Board = random_board(3, 2)
+
+    params: dict = packed_rows([row(1, {BOARD_KEY: board}), row(5, board)])
+
+    assert params == {"ids": [1, 5], "boards": [pack_board(board)] * 2}
+
+
+def test_swap_repacks_games_moved_after_backfill() -> None:
+    """
+    Test if swap re-packs board of game moved after its batch was packed,
+    so the board which survives the swap is the current one.
+    """
+    row = namedtuple("Row", "id board board_packed")
+    before: Board = [[None] * 3 for _ in range(3)]
+    after: Board = [["X", None, None], [None, "O", None], [None] * 3]
+    rows: list = [
+        row(1, {BOARD_KEY: after}, pack_board(before)),
+        row(2, {BOARD_KEY: before}, memoryview(pack_board(before))),
+        row(3, after, None),
+    ]
+    session: MagicMock = MagicMock()
+    session.execute.return_value.all.side_effect = [rows, []]
+
+    total: int = swap_columns(session)
+
+    assert stale_rows(rows) == {"ids": [1, 3], "boards": [pack_board(after)] * 2}
+    assert total == 2
+    update = session.execute.call_args_list[2]
+    assert update.args == (UPDATE_BATCH, stale_rows(rows))
+    statements: List[str] = [
+        str(call.args[0]) for call in session.execute.call_args_list
+    ]
+    assert statements[-2:] == [
+        "ALTER TABLE game DROP COLUMN board",
+        "ALTER TABLE game RENAME COLUMN board_packed TO board",
+    ]
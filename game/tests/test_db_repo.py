@@ -1,7 +1,9 @@
-from copy import deepcopy
+from datetime import datetime, timedelta
 from typing import Iterable, Optional
 from unittest.mock import patch
 
+import pytest
+
 from entities.entites import (
     GameListPydantic,
     GamePydantic,
@@ -10,12 +12,21 @@ from entities.entites import (
     UserSessionListPydantic,
     UserSessionPydantic,
 )
-from entities.models import Game, User, UserSession
-from entities.types import SessionStatusStates
+from entities.models import Game, User, UserSession, db
+from entities.types import PlayState, SessionStatusStates
 from pytest_mock import MockerFixture
-from repos.db_repo import GameDBRepo, UserDBRepo, UserSessionDBRepo
+from repos.db_repo import (
+    AppendOnlyRepo,
+    BaseRepo,
+    GameDBRepo,
+    GameMoveDBRepo,
+    UserDBRepo,
+    UserSessionDBRepo,
+)
+from repos.unit_of_work import UnitOfWork
 from tests.factories import GameFactory, UserFactory, UserSessionFactory
 from tests.utils import game2pydantic_list, user2pydantic, user_session2pydantic_list
+from utils.exceptions import StaleGameException
 
 
 def test_user_db_repo_filter(mocker: "MockerFixture"):
@@ -50,10 +61,11 @@ def test_user_db_repo_create(mocker: "MockerFixture"):
 
     user: UserFactory = UserFactory.create()
     repo: UserDBRepo = UserDBRepo()
-    mocker.patch("entities.models.User.create", return_value=user)
-    mocker.patch("entities.models.User.filter_by", return_value=[user])
+    mocker.patch("entities.models.User.create", return_value=user2pydantic(user).dict())
+    filter_by = mocker.patch("entities.models.User.filter_by")
 
     res: UserPydantic = repo.create(**user.__dict__)
+    filter_by.assert_not_called()
     assert isinstance(res, UserPydantic)
     assert res.email == user.email
     assert res.password == user.password
@@ -70,69 +82,35 @@ def test_user_db_repo_save() -> None:
         mock_method.assert_called_once()
 
 
-@patch("flask_sqlalchemy.model._QueryProperty.__get__")
-def test_user_db_repo_update_fields(mocked_method):
-    """Test UserDBRepo.update_fields method. Expect to change instance attributes"""
+def test_user_db_repo_update_fields(mocker: "MockerFixture"):
+    """Test UserDBRepo.update_fields method. Expect DTO built from returned row"""
 
     user: UserFactory = UserFactory.create()
-    deep_copy_user = deepcopy(user)
-    params_to_update = {
-        "password": "new_password",
-        "email": "new_email",
-    }
-
-    class MockRefresh:
-        def __call__(self, instance):
-            """Update instance attributes"""
-            instance.password = params_to_update["password"]
-            instance.email = params_to_update["email"]
+    user_pydantic: UserPydantic = user2pydantic(user)
+    params_to_update = {"password": "new_password", "email": "new_email"}
+    update_mock = mocker.patch(
+        "entities.models.User.update",
+        return_value={**user_pydantic.dict(), **params_to_update},
+    )
 
-    with patch("repos.db_repo.db.session.refresh", side_effect=MockRefresh()), patch(
-        "repos.db_repo.db.session.commit"
-    ):
-        repo: UserDBRepo = UserDBRepo()
-        filter_by_mock = mocked_method.return_value.filter_by
-        filter_by_mock.return_value.first.return_value = user
-        user_pydantic: UserPydantic = user2pydantic(user)
-        res = repo.update_fields(
-            user_pydantic,
-            password=params_to_update["password"],
-            email=params_to_update["email"],
-        )
+    res = UserDBRepo().update_fields(user_pydantic, **params_to_update)
 
-        assert isinstance(res, UserPydantic)
-        assert res.password == params_to_update["password"]
-        assert res.email == params_to_update["email"]
-        assert res.email != deep_copy_user.email
-        assert res.password != deep_copy_user.password
+    update_mock.assert_called_once_with(user.id, **params_to_update)
+    assert isinstance(res, UserPydantic)
+    assert res.password == params_to_update["password"]
+    assert res.email == params_to_update["email"]
+    assert res.credits == user.credits
 
 
-@patch("flask_sqlalchemy.model._QueryProperty.__get__")
-def test_user_db_repo_update_fields_no_return(mocked_method):
+def test_user_db_repo_update_fields_no_return(mocker: "MockerFixture"):
     """Test UserDBRepo.update_fields method. Expect to return None"""
 
     user: UserFactory = UserFactory.create()
-    params_to_update = {
-        "password": "new_password",
-        "email": "new_email",
-    }
+    mocker.patch("entities.models.User.update", return_value=None)
 
-    class MockRefresh:
-        def __call__(self, instance):
-            """Update instance attributes"""
-            instance.password = params_to_update["password"]
-            instance.email = params_to_update["email"]
+    res = UserDBRepo().update_fields(user2pydantic(user), password="new_password")
 
-    with patch("repos.db_repo.db.session.refresh", side_effect=MockRefresh()), patch(
-        "repos.db_repo.db.session.commit"
-    ):
-        repo: UserDBRepo = UserDBRepo()
-        filter_by_mock = mocked_method.return_value.filter_by
-        filter_by_mock.return_value.first.return_value = None
-        user_pydantic: UserPydantic = user2pydantic(user)
-        res = repo.update_fields(user_pydantic, password=params_to_update["password"])
-
-        assert not res
+    assert not res
 
 
 def test_user_session_db_repo_filter(mocker: "MockerFixture"):
@@ -178,12 +156,14 @@ def test_user_session_db_repo_create(mocker: "MockerFixture"):
         user_session
     )
 
-    mocker.patch("entities.models.UserSession.create", return_value=None)
     mocker.patch(
-        "repos.db_repo.UserSessionDBRepo.filter", return_value=user_session_pydantic
+        "entities.models.UserSession.create",
+        return_value=user_session_pydantic.__root__[0].dict(),
     )
+    filter_mock = mocker.patch("repos.db_repo.UserSessionDBRepo.filter")
 
     res: UserSessionPydantic = repo.create(**user_session.__dict__)
+    filter_mock.assert_not_called()
     assert isinstance(res, UserSessionPydantic)
     assert res.user_id == user_session.id
 
@@ -199,88 +179,44 @@ def test_user_session_db_repo_save() -> None:
         mock_method.assert_called_once()
 
 
-@patch("flask_sqlalchemy.model._QueryProperty.__get__")
-def test_user_session_db_repo_update_fields(mocked_method):
+def test_user_session_db_repo_update_fields(mocker: "MockerFixture"):
     """
     Test UserSessionDBRepo.update_fields method.
     Expect to return UserSessionPydantic
     """
-    user: UserFactory = UserFactory.create()
-    user_session: UserSessionFactory = UserSessionFactory.create(user=user)
-
-    new_user_dict: dict = {
-        key: val
-        for key, val in user_session.__dict__.items()
-        if not key.startswith("_")
-    }
-    new_user_dict.pop("user")
-    deep_copy_user = UserSessionFactory.create(**new_user_dict, user=user)
-
-    params_to_update = {
-        "status": SessionStatusStates.FINISHED.value,
-        "score": 100,
-    }
-
-    class MockRefresh:
-        def __call__(self, instance):
-            """Update instance attributes"""
-            instance.score = params_to_update["score"]
-            instance.status = params_to_update["status"]
+    user_session: UserSessionFactory = UserSessionFactory.create()
+    user_session_pydantic: UserSessionPydantic = user_session2pydantic_list(
+        user_session
+    ).__root__[0]
+    params_to_update = {"status": SessionStatusStates.FINISHED.value, "score": 100}
+    update_mock = mocker.patch(
+        "entities.models.UserSession.update",
+        return_value={**user_session_pydantic.dict(), **params_to_update},
+    )
 
-    with patch("repos.db_repo.db.session.refresh", side_effect=MockRefresh()), patch(
-        "repos.db_repo.db.session.commit"
-    ):
-        repo: UserSessionDBRepo = UserSessionDBRepo()
-        filter_by_mock = mocked_method.return_value.filter_by
-        filter_by_mock.return_value.first.return_value = user_session
-        user_session_pydantic: UserSessionPydantic = user_session2pydantic_list(
-            user_session
-        ).__root__[0]
-        res = repo.update_fields(
-            user_session_pydantic,
-            score=params_to_update["score"],
-            status=params_to_update["status"],
-        )
+    res = UserSessionDBRepo().update_fields(user_session_pydantic, **params_to_update)
 
-        assert isinstance(res, UserSessionPydantic)
-        assert res.score == params_to_update["score"]
-        assert res.status == params_to_update["status"]
-        assert res.score != deep_copy_user.score
-        assert res.status != deep_copy_user.status
+    update_mock.assert_called_once_with(
+        user_session.id,
+        partition_key=user_session_pydantic.created_at,
+        **params_to_update,
+    )
+    assert isinstance(res, UserSessionPydantic)
+    assert res.score == params_to_update["score"]
+    assert res.status == params_to_update["status"]
 
 
-@patch("flask_sqlalchemy.model._QueryProperty.__get__")
-def test_user_session_db_repo_update_fields_no_return(mocked_method):
+def test_user_session_db_repo_update_fields_no_return(mocker: "MockerFixture"):
     """Test UserSessionDBRepo.update_fields method. Expect to return None"""
 
     user_session: UserSessionFactory = UserSessionFactory.create()
-    params_to_update = {
-        "status": SessionStatusStates.FINISHED.value,
-        "score": 100,
-    }
+    mocker.patch("entities.models.UserSession.update", return_value=None)
 
-    class MockRefresh:
-        def __call__(self, instance):
-            """Update instance attributes"""
-            instance.score = params_to_update["score"]
-            instance.status = params_to_update["status"]
-
-    with patch("repos.db_repo.db.session.refresh", side_effect=MockRefresh()), patch(
-        "repos.db_repo.db.session.commit"
-    ):
-        repo: UserSessionDBRepo = UserSessionDBRepo()
-        filter_by_mock = mocked_method.return_value.filter_by
-        filter_by_mock.return_value.first.return_value = None
-        user_session_pydantic: UserSessionPydantic = user_session2pydantic_list(
-            user_session
-        ).__root__[0]
-        res = repo.update_fields(
-            user_session_pydantic,
-            score=params_to_update["score"],
-            status=params_to_update["status"],
-        )
+    res = UserSessionDBRepo().update_fields(
+        user_session2pydantic_list(user_session).__root__[0], score=100
+    )
 
-        assert not res
+    assert not res
 
 
 @patch("flask_sqlalchemy.model._QueryProperty.__get__")
@@ -320,6 +256,52 @@ def test_user_session_db_repo_all_no_desc(mocked_method):
     assert isinstance(res[0], UserSession)
 
 
+def test_user_session_db_repo_filter_created_at_bound(sqlite_app) -> None:
+    """
+    Test UserSessionDBRepo.filter method.
+    Expect session started before created_at__gte bound left out
+    """
+    today: datetime = datetime(2026, 10, 17)
+    for session_id, created_at in ((1, today - timedelta(days=2)), (2, today)):
+        db.session.add(
+            UserSession(
+                id=session_id, user_id=1, status="active", created_at=created_at
+            )
+        )
+    db.session.commit()
+
+    res: UserSessionListPydantic = UserSessionDBRepo().filter(
+        user_id=1, status="active", created_at__gte=today - timedelta(days=1)
+    )
+
+    assert [session.id for session in res.__root__] == [2]
+
+
+def test_user_session_db_repo_ended_since(sqlite_app) -> None:
+    """
+    Test UserSessionDBRepo.ended_since method.
+    Expect sessions ended since given time and started since the other one
+    """
+    today: datetime = datetime(2026, 10, 17)
+    for session_id, created_at, ended_at in (
+        (1, today - timedelta(hours=20), today + timedelta(hours=2)),
+        (2, today, today + timedelta(hours=1)),
+        (3, today - timedelta(days=2), today - timedelta(days=1)),
+        (4, today, None),
+        (5, today - timedelta(days=30), today + timedelta(hours=3)),
+    ):
+        db.session.add(
+            UserSession(id=session_id, created_at=created_at, ended_at=ended_at)
+        )
+    db.session.commit()
+
+    res: Iterable = UserSessionDBRepo().ended_since(
+        ended_after=today, started_after=today - timedelta(days=1)
+    )
+
+    assert [session.id for session in res] == [1, 2]
+
+
 @patch("flask_sqlalchemy.model._QueryProperty.__get__")
 def test_game_db_repo_filter(mocked_method) -> None:
     """
@@ -358,11 +340,14 @@ def test_game_db_repo_create(mocker: "MockerFixture") -> None:
 
     game_pydantic: GameListPydantic = game2pydantic_list(game)
 
-    mocker.patch("entities.models.Game.create", return_value=None)
-    mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=game_pydantic)
+    mocker.patch(
+        "entities.models.Game.create", return_value=game_pydantic.__root__[0].dict()
+    )
+    filter_mock = mocker.patch("repos.db_repo.GameDBRepo.filter")
 
     res: GamePydantic = repo.create(**game.__dict__)
 
+    filter_mock.assert_not_called()
     assert isinstance(res, GamePydantic)
     assert res.board == game.board
     assert res.user_id == game.user_id
@@ -379,80 +364,288 @@ def test_game_db_repo_save() -> None:
         mock_method.assert_called_once()
 
 
-@patch("flask_sqlalchemy.model._QueryProperty.__get__")
-def test_game_db_repo_update_fields(mocked_method):
+def test_game_db_repo_update_fields(mocker: "MockerFixture"):
     """
     Test GameDBRepo.update_fields method.
-    Expect to return UserSessionPydantic
+    Expect to return GamePydantic
     """
-
-    user: UserFactory = UserFactory.create()
-    user_session: UserSessionFactory = UserSessionFactory.create(user=user)
-    game: GameFactory = GameFactory.create(user=user, session=user_session)
-
-    game_deep_copy_dict: dict = {
-        key: val for key, val in game.__dict__.items() if not key.startswith("_")
+    game: GameFactory = GameFactory.create()
+    game_pydantic: GamePydantic = game2pydantic_list(game).__root__[0]
+    params_to_update = {
+        "winner": game.user_id,
+        "symbol": "X" if game.symbol == "O" else "O",
     }
-    game_deep_copy_dict.pop("user")
-    game_deep_copy_dict.pop("session")
+    update_mock = mocker.patch(
+        "entities.models.Game.update",
+        return_value={**game_pydantic.dict(), **params_to_update},
+    )
+
+    res = GameDBRepo().update_fields(game_pydantic, **params_to_update)
 
-    deep_copy_user = GameFactory.create(
-        **game_deep_copy_dict, user=user, session=user_session
+    update_mock.assert_called_once_with(
+        game.id,
+        expected_version=game_pydantic.version,
+        partition_key=game_pydantic.created_at,
+        **params_to_update,
     )
+    assert isinstance(res, GamePydantic)
+    assert res.winner == params_to_update["winner"]
+    assert res.symbol == params_to_update["symbol"]
+    assert res.board == game.board
+
+
+def test_game_db_repo_update_fields_no_return(mocker: "MockerFixture"):
+    """Test GameDBRepo.update_fields method. Expect conflict when no row updated"""
+
+    game: GameFactory = GameFactory.create()
+    mocker.patch("entities.models.Game.update", return_value=None)
+
+    with pytest.raises(StaleGameException):
+        GameDBRepo().update_fields(game2pydantic_list(game).__root__[0], winner=1)
+
+
+def test_game_move_db_repo_create() -> None:
+    """Test GameMoveDBRepo.create method. Expect single INSERT without reading back"""
+
+    with patch("repos.db_repo.db.session.execute") as execute, patch(
+        "entities.models.GameMove.save"
+    ) as commit:
+        res = GameMoveDBRepo().create(game_id=1, ply=0, cell=4)
+
+    statement = execute.call_args.args[0]
+    assert res is None
+    assert statement.is_insert
+    assert statement.compile().params == {"game_id": 1, "ply": 0, "cell": 4}
+    commit.assert_called_once()
+
+
+def test_game_move_db_repo_stream() -> None:
+    """Test GameMoveDBRepo.stream method. Expect moves fetched in batches"""
+
+    with patch(
+        "repos.db_repo.db.session.execute", return_value=iter([(0, 4), (1, 0)])
+    ) as execute:
+        res = list(GameMoveDBRepo().stream(game_id=1, batch_size=2))
+
+    statement = execute.call_args.args[0]
+    assert res == [(0, 4), (1, 0)]
+    assert statement.get_execution_options()["yield_per"] == 2
+
+
+def test_game_move_db_repo_append_only() -> None:
+    """Test GameMoveDBRepo. Expect log to be append-only, with no update method"""
 
-    params_to_update = {"winner": True, "symbol": "X" if game.symbol == "O" else "O"}
+    assert issubclass(GameMoveDBRepo, AppendOnlyRepo)
+    assert not issubclass(GameMoveDBRepo, BaseRepo)
+    assert not hasattr(GameMoveDBRepo, "update_fields")
 
-    class MockRefresh:
-        def __call__(self, instance):
-            """Update instance attributes"""
-            instance.winner = params_to_update["winner"]
-            instance.symbol = params_to_update["symbol"]
 
-    with patch("repos.db_repo.db.session.refresh", side_effect=MockRefresh()), patch(
-        "repos.db_repo.db.session.commit"
+def test_base_mixin_create_returns_inserted_row() -> None:
+    """Test BaseMixin.create. Expect one INSERT ... RETURNING and its row back"""
+
+    row: dict = {"id": 7, "password": "123", "email": "a@b.c", "credits": 10}
+    with patch("entities.models.db.session.execute") as execute, patch(
+        "entities.models.User.save"
+    ) as commit:
+        execute.return_value.mappings.return_value.one.return_value = row
+        res = User.create(email="a@b.c", password="123")
+
+    statement = execute.call_args.args[0]
+    assert res == row
+    assert execute.call_count == 1
+    assert statement.is_insert
+    assert "RETURNING users.id" in str(statement)
+    commit.assert_called_once()
+
+
+def test_base_mixin_update_returns_updated_row() -> None:
+    """
+    Test BaseMixin.update.
+    Expect one UPDATE ... RETURNING by id bumping version, no SELECT
+    """
+
+    row: dict = {"id": 7, "password": "123", "email": "a@b.c", "credits": 3}
+    with patch("entities.models.db.session.execute") as execute, patch(
+        "entities.models.User.save"
+    ) as commit:
+        execute.return_value.mappings.return_value.one_or_none.return_value = row
+        res = User.update(7, credits=3, unknown="skipped")
+
+    statement = execute.call_args.args[0]
+    assert res == row
+    assert execute.call_count == 1
+    assert statement.is_update
+    assert "RETURNING users.id" in str(statement)
+    assert "version=(users.version + :version_1)" in str(statement)
+    assert statement.compile().params == {"credits": 3, "version_1": 1, "id_1": 7}
+    commit.assert_called_once()
+
+
+def test_base_mixin_update_without_columns() -> None:
+    """Test BaseMixin.update with no known columns. Expect current row selected"""
+
+    with patch("entities.models.db.session.execute") as execute, patch(
+        "entities.models.User.save"
     ):
-        repo: GameDBRepo = GameDBRepo()
-        filter_by_mock = mocked_method.return_value.filter_by
-        filter_by_mock.return_value.first.return_value = game
-        game_pydantic: GamePydantic = game2pydantic_list(game).__root__[0]
-        res = repo.update_fields(
-            game_pydantic,
-            winner=params_to_update["winner"],
-            symbol=params_to_update["symbol"],
-        )
-        assert isinstance(res, GamePydantic)
-        assert res.winner == params_to_update["winner"]
-        assert res.symbol == params_to_update["symbol"]
-        assert res.symbol != deep_copy_user.symbol
-        assert res.winner != deep_copy_user.winner
+        execute.return_value.mappings.return_value.one_or_none.return_value = None
+        res = User.update(7, unknown="skipped")
 
+    assert res is None
+    assert execute.call_args.args[0].is_select
 
-@patch("flask_sqlalchemy.model._QueryProperty.__get__")
-def test_game_db_repo_update_fields_no_return(mocked_method):
-    """Test GameDBRepo.update_fields method. Expect return None"""
 
-    user: UserFactory = UserFactory.create()
-    user_session: UserSessionFactory = UserSessionFactory.create(user=user)
-    game: GameFactory = GameFactory.create(user=user, session=user_session)
+def test_user_db_repo_debit_credits() -> None:
+    """Test UserDBRepo.debit_credits. Expect conditional UPDATE computed in SQL"""
+
+    with patch("repos.db_repo.db.session.execute") as execute, patch(
+        "entities.models.User.save"
+    ) as commit:
+        execute.return_value.scalar_one_or_none.return_value = 7
+        res = UserDBRepo().debit_credits(user_id=1, amount=3)
+
+    statement = str(execute.call_args.args[0])
+    assert res == 7
+    assert "SET credits=(users.credits - " in statement
+    assert "users.credits >= " in statement
+    assert "RETURNING users.credits" in statement
+    commit.assert_called_once()
+
 
-    params_to_update = {"winner": True, "symbol": "X" if game.symbol == "O" else "O"}
+def test_user_db_repo_debit_credits_not_enough() -> None:
+    """Test UserDBRepo.debit_credits. Expect None when no row was updated"""
+
+    with patch("repos.db_repo.db.session.execute") as execute, patch(
+        "entities.models.User.save"
+    ):
+        execute.return_value.scalar_one_or_none.return_value = None
+        res = UserDBRepo().debit_credits(user_id=1, amount=3)
+
+    assert res is None
 
-    class MockRefresh:
-        def __call__(self, instance):
-            """Update instance attributes"""
-            instance.winner = params_to_update["winner"]
-            instance.symbol = params_to_update["symbol"]
 
-    with patch("repos.db_repo.db.session.refresh", side_effect=MockRefresh()), patch(
-        "repos.db_repo.db.session.commit"
+def test_user_db_repo_add_credits() -> None:
+    """Test UserDBRepo.add_credits. Expect unconditional increment in SQL"""
+
+    with patch("repos.db_repo.db.session.execute") as execute, patch(
+        "entities.models.User.save"
     ):
-        repo: GameDBRepo = GameDBRepo()
-        filter_by_mock = mocked_method.return_value.filter_by
-        filter_by_mock.return_value.first.return_value = None
-        game_pydantic: GamePydantic = game2pydantic_list(game).__root__[0]
-        res = repo.update_fields(
-            game_pydantic,
-            winner=params_to_update["winner"],
-            symbol=params_to_update["symbol"],
+        execute.return_value.scalar_one_or_none.return_value = 14
+        res = UserDBRepo().add_credits(user_id=1, amount=4)
+
+    statement = str(execute.call_args.args[0])
+    assert res == 14
+    assert "SET credits=(users.credits + " in statement
+    assert ">=" not in statement
+
+
+def test_game_db_repo_load_play(sqlite_app) -> None:
+    """
+    Test GameDBRepo.load_play method. Expect user, session and game of the
+    move, game None for other game, nothing for session started before bound
+    """
+    db.session.add(User(id=1, email="a@a.pl", password="a", credits=7))
+    db.session.add(UserSession(id=1, user_id=1, status="active"))
+    db.session.add(
+        Game(id=1, user_id=1, session_id=1, symbol="O", board=[[None] * 3] * 3)
+    )
+    db.session.commit()
+    repo: GameDBRepo = GameDBRepo()
+
+    since: datetime = datetime.now() - timedelta(hours=1)
+    later: datetime = datetime.now() + timedelta(hours=1)
+
+    state: PlayState = repo.load_play(1, 1, 1, started_after=since)
+
+    assert state.user.credits == 7
+    assert state.session.status == "active"
+    assert state.game.symbol == "O"
+    assert repo.load_play(1, 1, 2, started_after=since).game is None
+    assert repo.load_play(1, 2, 1, started_after=since) is None
+    assert repo.load_play(1, 1, 1, started_after=later) is None
+    assert repo.play_versions(1, 1, 1, started_after=since) == (1, 1, "active")
+    assert repo.play_versions(1, 1, 2, started_after=since) is None
+    assert repo.play_versions(1, 1, 1, started_after=later) is None
+
+
+def test_versions_bumped_by_updates(sqlite_app) -> None:
+    """Test UserDBRepo and GameDBRepo updates. Expect row version bumped each time"""
+    db.session.add(User(id=1, email="a@a.pl", password="a", credits=7))
+    db.session.add(Game(id=1, user_id=1, symbol="O", board=[[None] * 3] * 3))
+    db.session.commit()
+    user_repo: UserDBRepo = UserDBRepo()
+
+    user_repo.add_credits(1, 4)
+    user_repo.debit_credits(1, 3)
+    user: UserPydantic = user_repo.update_fields(
+        UserPydantic.construct(id=1), email="b"
+    )
+    game: GamePydantic = GameDBRepo().update_fields(
+        GamePydantic.construct(id=1), status="in_progress"
+    )
+
+    assert user.version == user_repo.version(1) == 4
+    assert game.version == 2
+    assert user_repo.version(2) is None
+
+
+def test_game_db_repo_update_fields_stale_version(sqlite_app) -> None:
+    """
+    Test GameDBRepo.update_fields method.
+    Expect second of two updates from the same read rejected and rolled back
+    """
+    db.session.add(Game(id=1, user_id=1, symbol="O", board=[[None] * 3] * 3))
+    db.session.commit()
+    repo: GameDBRepo = GameDBRepo()
+    first: GamePydantic = repo.filter(id=1).__root__[0]
+    second: GamePydantic = first.copy()
+
+    repo.update_fields(first, board={"board": [["O", None, None]] + [[None] * 3] * 2})
+    repo.update_fields(first, status="in_progress")
+    with pytest.raises(StaleGameException):
+        with UnitOfWork():
+            GameMoveDBRepo().create_many(1, 0, [4])
+            repo.update_fields(second, board={"board": [[None] * 3] * 3})
+
+    game: GamePydantic = repo.filter(id=1).__root__[0]
+    assert first.version == game.version == 3
+    assert list(game.board.values())[0][0][0] == "O"
+    assert GameMoveDBRepo().filter(game_id=1) is None
+
+
+def test_updates_bounded_by_partition_key(sqlite_app) -> None:
+    """
+    Test GameDBRepo and UserSessionDBRepo updates.
+    Expect only row created at created_at of DTO updated
+    """
+    created_at: datetime = datetime(2026, 10, 17, 12, 0)
+    db.session.add(UserSession(id=1, user_id=1, created_at=created_at))
+    db.session.add(
+        Game(id=1, user_id=1, symbol="O", board=[[None] * 3] * 3, created_at=created_at)
+    )
+    db.session.commit()
+    game: GamePydantic = GameDBRepo().filter(id=1).__root__[0]
+    session: UserSessionPydantic = UserSessionDBRepo().filter(id=1).__root__[0]
+
+    assert GameDBRepo().update_fields(game, status="in_progress").status == (
+        "in_progress"
+    )
+    assert UserSessionDBRepo().update_fields(session, score=3).score == 3
+    with pytest.raises(StaleGameException):
+        GameDBRepo().update_fields(
+            game.copy(update={"created_at": created_at - timedelta(days=40)}),
+            status="finished",
         )
-        assert not res
+    session.created_at = created_at - timedelta(days=40)
+    assert UserSessionDBRepo().update_fields(session, score=5) is None
+
+
+def test_game_move_db_repo_create_many(sqlite_app) -> None:
+    """Test GameMoveDBRepo.create_many method. Expect consecutive plies saved"""
+    repo: GameMoveDBRepo = GameMoveDBRepo()
+
+    repo.create_many(1, 4, [2, 8])
+
+    assert [(move.ply, move.cell) for move in repo.filter(game_id=1).__root__] == [
+        (4, 2),
+        (5, 8),
+    ]
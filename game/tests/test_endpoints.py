@@ -1,15 +1,22 @@
+import json
 from copy import deepcopy
 from unittest.mock import patch
 
 from entities.entites import GameListPydantic, GamePydantic, UserSessionPydantic
-from entities.types import GameStatus, SessionStatus, SessionStatusStates
+from entities.types import GameStatus, PlayState, SessionStatus, SessionStatusStates
 from flask import Response
 from flask.testing import FlaskClient
 from pytest_mock import MockFixture
 from settings import PlayCredits
 from tests.factories import GameFactory, UserFactory, UserSessionFactory
-from tests.utils import user2pydantic
+from tests.utils import (
+    game2pydantic,
+    game2pydantic_list,
+    user2pydantic,
+    user_session2pydantic,
+)
 from use_cases.use_case import UserUseCase
+from utils.exceptions import StaleGameException
 
 
 def test_register_endpoint_not_allowed_methods(
@@ -109,6 +116,36 @@ def test_account_detail_endpoint(client: FlaskClient, jwt_token_headers: dict) -
     assert response.json == user2pydantic(user).dict(exclude={"password"})
 
 
+def test_account_detail_endpoint_etag(
+    client: FlaskClient, jwt_token_headers: dict, mocker: "MockFixture"
+) -> None:
+    """
+    Test account detail endpoint with If-None-Match.
+    Expected: 304 for current version without loading user, 200 for stale one
+    """
+
+    response: Response = client.get("/account", headers=jwt_token_headers)  # noqa
+    assert response.headers["ETag"] == '"1"'
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    mocker.patch("repos.db_repo.UserDBRepo.version", side_effect=[1, 2])
+    get_user = mocker.patch(
+        "use_cases.use_case.UserUseCase.get_user",
+        return_value=user2pydantic(UserFactory.create()),
+    )
+    headers: dict = {**jwt_token_headers, "If-None-Match": response.headers["ETag"]}
+
+    response = client.get("/account", headers=headers)  # noqa
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"1"'
+    assert not response.data
+    get_user.assert_not_called()
+
+    response = client.get("/account", headers=headers)  # noqa
+    assert response.status_code == 200
+    get_user.assert_called_once()
+
+
 def test_account_detail_endpoint_user_not_found(
     client: FlaskClient, jwt_token_headers: dict, mocker: "MockFixture"
 ) -> None:
@@ -268,11 +305,9 @@ def test_session_create(
     )
     mocker.patch("repos.db_repo.GameDBRepo.create", return_value=game_pydantic)
 
-    user_updated: UserFactory = deepcopy(user)
-    user_updated.credits -= PlayCredits.PLAY.value
-
     mocker.patch(
-        "repos.db_repo.UserDBRepo.update_fields", return_value=user2pydantic(user)
+        "repos.db_repo.UserDBRepo.debit_credits",
+        return_value=user.credits - PlayCredits.PLAY.value,
     )
 
     response: Response = client.get("/session", headers=jwt_token_headers)  # noqa
@@ -394,6 +429,7 @@ def test_new_game_endpoint_no_credits(
     mocker.patch(
         "use_cases.use_case.UserUseCase.update_session_status", return_value=[user]
     )
+    mocker.patch("repos.db_repo.UserDBRepo.debit_credits", return_value=None)
 
     response: Response = client.get(  # noqa
         "/session/1/game", headers=jwt_token_headers
@@ -425,7 +461,8 @@ def test_new_game_endpoint_valid_game(
     mocker.patch("entities.models.UserSession.filter_by", return_value=[user_session])
     mocker.patch("entities.models.User.filter_by", return_value=[user])
     mocker.patch(
-        "repos.db_repo.UserDBRepo.update_fields", return_value=user2pydantic(user)
+        "repos.db_repo.UserDBRepo.debit_credits",
+        return_value=user.credits - PlayCredits.PLAY.value,
     )
     mocker.patch("repos.db_repo.GameDBRepo.create", return_value=game_pydantic)
 
@@ -461,6 +498,7 @@ def test_play_start_endpoint_game_not_found2(
 ) -> None:
     """Test for play start endpoint. with session status not active"""
     session_status: SessionStatus = SessionStatus(False, {"test": "test"}, 200)
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=None)
     mocker.patch(
         "use_cases.use_case.UserUseCase.check_session_status",
         return_value=session_status,
@@ -476,7 +514,10 @@ def test_play_start_endpoint_game_not_found2(
 def test_play_start_endpoint_GET(
     client: FlaskClient, jwt_token_headers: dict, mocker: "MockFixture"
 ) -> None:
-    """Test for play start endpoint. GET method should return board details"""
+    """
+    Test for play start endpoint. GET method should return board details
+    read with one query, without writing anything
+    """
     user: UserFactory = UserFactory.create()
     user_session: UserSessionFactory = UserSessionFactory.create(
         status=SessionStatusStates.ACTIVE.value, user_id=user.id
@@ -484,30 +525,95 @@ def test_play_start_endpoint_GET(
     game: GameFactory = GameFactory.create(
         session_id=user_session.id, user_id=user.id, status=GameStatus.IN_PROGRESS.value
     )
-    session_status: SessionStatus = SessionStatus(True, {"test": "test"}, 200)
-    mocker.patch(
-        "use_cases.use_case.UserUseCase.check_session_status",
-        return_value=session_status,
-    )
     mocker.patch(
-        "use_cases.use_case.UserUseCase.check_game_status", return_value=(False, "test")
+        "repos.db_repo.GameDBRepo.load_play",
+        return_value=PlayState(
+            user=user2pydantic(user),
+            session=user_session2pydantic(user_session),
+            game=game2pydantic(game),
+        ),
     )
+    update_fields = mocker.patch("repos.db_repo.GameDBRepo.update_fields")
 
     expected_response: dict = {
-        "actual_board": game.board,
+        "actual_board": game.board["board"],
         "player_sign": game.symbol,
+        "game": game.id,
+        "session": game.session_id,
+        "credits": user.credits,
     }
 
+    response: Response = client.get(  # noqa
+        "/session/1/game/1", json={}, headers=jwt_token_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json == expected_response
+    assert response.headers["ETag"] == '"1.1"'
+    update_fields.assert_not_called()
+
+
+def test_play_start_endpoint_GET_not_modified(
+    client: FlaskClient, jwt_token_headers: dict, mocker: "MockFixture"
+) -> None:
+    """
+    Test for play start endpoint. GET with current ETag should return 304
+    after version check only
+    """
     mocker.patch(
-        "use_cases.use_case.UserUseCase.lets_play_GET",
-        return_value=(expected_response, 200),
+        "repos.db_repo.GameDBRepo.play_versions", return_value=(4, 2, "active")
     )
+    load_play = mocker.patch("repos.db_repo.GameDBRepo.load_play")
+
     response: Response = client.get(  # noqa
-        "/session/1/game/1", json={}, headers=jwt_token_headers
+        "/session/1/game/1", headers={**jwt_token_headers, "If-None-Match": '"4.2"'}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"4.2"'
+    load_play.assert_not_called()
+
+
+def test_play_start_endpoint_POST_move(
+    client: FlaskClient, jwt_token_headers: dict, mocker: "MockFixture"
+) -> None:
+    """Test for play start endpoint. POST method should make move with play_move"""
+    expected_response: dict = {"actual_board": [], "player_sign": "X", "credits": 7}
+    play_move = mocker.patch(
+        "use_cases.use_case.UserUseCase.play_move",
+        return_value=(expected_response, 200),
+    )
+    check_session_status = mocker.patch(
+        "use_cases.use_case.UserUseCase.check_session_status"
+    )
+
+    response: Response = client.post(  # noqa
+        "/session/1/game/2", json={"row": 1, "col": 3}, headers=jwt_token_headers
     )
 
     assert response.status_code == 200
     assert response.json == expected_response
+    play_move.assert_called_once_with(
+        session_id=1, user_id=1, game_id=2, data={"row": 1, "col": 3}
+    )
+    check_session_status.assert_not_called()
+
+
+def test_play_start_endpoint_POST_conflict(
+    client: FlaskClient, jwt_token_headers: dict, mocker: "MockFixture"
+) -> None:
+    """Test for play start endpoint. POST racing another move should return 409"""
+    mocker.patch(
+        "use_cases.use_case.UserUseCase.play_move",
+        side_effect=StaleGameException,
+    )
+
+    response: Response = client.post(  # noqa
+        "/session/1/game/2", json={"row": 1, "col": 3}, headers=jwt_token_headers
+    )
+
+    assert response.status_code == 409
+    assert response.json == {"error": StaleGameException.default_message}
 
 
 # def test_play_start_endpoint_POST(
@@ -547,3 +653,53 @@ def test_play_start_endpoint_GET(
 #
 #     assert response.status_code == 200
 #     assert response.json == expected_response
+
+
+def test_replay_endpoint_streams_moves(
+    client: FlaskClient, jwt_token_headers: dict, mocker: "MockFixture"
+) -> None:
+    """Test replay endpoint. Expected NDJSON line per move, in order"""
+    game: GameFactory = GameFactory.create(symbol="O")
+    mocker.patch(
+        "repos.db_repo.GameDBRepo.filter", return_value=game2pydantic_list(game)
+    )
+    stream = mocker.patch(
+        "repos.db_repo.GameMoveDBRepo.stream", return_value=iter([(0, 4), (1, 2)])
+    )
+
+    response: Response = client.get(  # noqa
+        "/session/1/game/1/replay", headers=jwt_token_headers
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line) for line in response.data.splitlines()] == [
+        {"ply": 0, "row": 2, "col": 2, "symbol": "O"},
+        {"ply": 1, "row": 1, "col": 3, "symbol": "X"},
+    ]
+    stream.assert_called_once_with(game.id)
+
+
+def test_replay_endpoint_game_not_found(
+    client: FlaskClient, jwt_token_headers: dict, mocker: "MockFixture"
+) -> None:
+    """Test replay endpoint for game of other user. Expected 404"""
+    mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=None)
+
+    response: Response = client.get(  # noqa
+        "/session/1/game/1/replay", headers=jwt_token_headers
+    )
+
+    assert response.status_code == 404
+    assert response.json == {"error": "Game not found"}
+
+
+def test_queries_saved_header(client: FlaskClient, jwt_token_headers: dict) -> None:
+    """Test identity map of request. Expect saved queries counted in header"""
+
+    user: UserFactory = UserFactory.create()
+    response: Response = client.get("/account", headers=jwt_token_headers)  # noqa
+
+    assert response.status_code == 200
+    assert response.json["email"] == user.email
+    assert response.headers["X-Queries-Saved"] == "0"
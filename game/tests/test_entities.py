@@ -0,0 +1,56 @@
+from entities.entites import GameListPydantic, GamePydantic, UserPydantic
+from tests.factories import GameFactory, UserFactory
+
+
+def test_from_row_orm_instance() -> None:
+    """Test RowModel.from_row. Expect same DTO as validated one, no ORM state"""
+
+    user: UserFactory = UserFactory.create()
+
+    res: UserPydantic = UserPydantic.from_row(user)
+
+    assert res == UserPydantic(**user.__dict__)
+    assert res.dict() == UserPydantic(**user.__dict__).dict()
+    assert "_sa_instance_state" not in res.__dict__
+
+
+def test_from_row_mapping_defaults() -> None:
+    """Test RowModel.from_row with partial mapping. Expect defaults filled"""
+
+    row: dict = {
+        "id": 1,
+        "board": {},
+        "user_id": 2,
+        "symbol": "X",
+        "winner": None,
+        "session_id": 3,
+        "status": "in_progress",
+    }
+
+    res: GamePydantic = GamePydantic.from_row(row)
+
+    assert res.size == 3
+    assert res.difficulty == "easy"
+    assert res.__fields_set__ == set(row)
+
+
+def test_from_row_skips_validation() -> None:
+    """Test RowModel.from_row. Expect values trusted as they come from database"""
+
+    res: UserPydantic = UserPydantic.from_row(
+        {"id": "1", "password": "123", "email": "a@b.c", "credits": 10}
+    )
+
+    assert res.id == "1"
+
+
+def test_from_rows() -> None:
+    """Test RowListModel.from_rows. Expect list of item DTOs"""
+
+    games: list = [GameFactory.create(), GameFactory.create()]
+
+    res: GameListPydantic = GameListPydantic.from_rows(games)
+
+    assert [game.id for game in res.__root__] == [game.id for game in games]
+    assert all(isinstance(game, GamePydantic) for game in res.__root__)
+    assert res.copy(deep=True) == res
@@ -0,0 +1,131 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from entities.entites import UserListPydantic
+from repos.db_repo import UserDBRepo
+from repos.identity_map import (
+    IdentityMap,
+    _invalidate_on_flush,
+    _invalidate_on_rollback,
+    _invalidate_on_write,
+    current_identity_map,
+)
+from tests.factories import UserFactory
+
+
+@pytest.fixture
+def identity_map() -> IdentityMap:
+    with IdentityMap() as identity_map:
+        yield identity_map
+
+
+def test_identity_map_scope() -> None:
+    """Test IdentityMap. Expect it to be current only inside the block"""
+
+    assert current_identity_map() is None
+    with IdentityMap() as identity_map:
+        assert current_identity_map() is identity_map
+    assert current_identity_map() is None
+
+
+def test_identity_map_serves_copies(identity_map: IdentityMap) -> None:
+    """Test IdentityMap.get. Expect one load and copies for every caller"""
+
+    load: MagicMock = MagicMock(return_value=UserListPydantic(__root__=[]))
+
+    first = identity_map.get("users", {"id": 1}, load)
+    first.__root__.append(None)
+    second = identity_map.get("users", {"id": 1}, load)
+
+    load.assert_called_once()
+    assert second.__root__ == []
+    assert identity_map.queries_saved == 1
+
+
+def test_identity_map_keys(identity_map: IdentityMap) -> None:
+    """Test IdentityMap.get. Expect separate entries per table and arguments"""
+
+    load: MagicMock = MagicMock(return_value=None)
+
+    identity_map.get("users", {"id": 1}, load)
+    identity_map.get("users", {"id": 2}, load)
+    identity_map.get("game", {"id": 1}, load)
+    identity_map.get("game", {"status__in": ["a", "b"], "id": 1}, load)
+    identity_map.get("game", {"id": 1, "status__in": ["a", "b"]}, load)
+
+    assert load.call_count == 4
+    assert identity_map.queries_saved == 1
+
+
+def test_identity_map_invalidated_on_write(identity_map: IdentityMap) -> None:
+    """Test write listener. Expect entries of written table dropped"""
+
+    load: MagicMock = MagicMock(return_value=None)
+    identity_map.get("users", {"id": 1}, load)
+    identity_map.get("game", {"id": 1}, load)
+
+    state: MagicMock = MagicMock(is_insert=False, is_update=True, is_delete=False)
+    state.statement.table.name = "users"
+    _invalidate_on_write(state)
+    identity_map.get("users", {"id": 1}, load)
+    identity_map.get("game", {"id": 1}, load)
+
+    assert load.call_count == 3
+
+
+def test_identity_map_kept_on_select(identity_map: IdentityMap) -> None:
+    """Test write listener. Expect SELECT to keep entries"""
+
+    load: MagicMock = MagicMock(return_value=None)
+    identity_map.get("users", {"id": 1}, load)
+
+    _invalidate_on_write(MagicMock(is_insert=False, is_update=False, is_delete=False))
+    identity_map.get("users", {"id": 1}, load)
+
+    load.assert_called_once()
+
+
+def test_identity_map_invalidated_on_flush_and_rollback(
+    identity_map: IdentityMap,
+) -> None:
+    """Test flush and rollback listeners. Expect entries dropped"""
+
+    load: MagicMock = MagicMock(return_value=None)
+    identity_map.get("users", {"id": 1}, load)
+    identity_map.get("game", {"id": 1}, load)
+
+    session: MagicMock = MagicMock(new=[UserFactory.build()], dirty=[], deleted=[])
+    _invalidate_on_flush(session, None)
+    identity_map.get("users", {"id": 1}, load)
+    identity_map.get("game", {"id": 1}, load)
+    assert load.call_count == 3
+
+    _invalidate_on_rollback(session)
+    identity_map.get("users", {"id": 1}, load)
+    identity_map.get("game", {"id": 1}, load)
+    assert load.call_count == 5
+
+
+def test_repo_filter_memoized(identity_map: IdentityMap) -> None:
+    """Test UserDBRepo.filter in identity map. Expect single query"""
+
+    user: UserFactory = UserFactory.create()
+    with patch("entities.models.User.filter_by", return_value=[user]) as filter_by:
+        first: UserListPydantic = UserDBRepo().filter(id=user.id)
+        second: UserListPydantic = UserDBRepo().filter(id=user.id)
+
+    filter_by.assert_called_once_with(id=user.id)
+    assert first == second
+    assert first is not second
+
+
+def test_repo_filter_without_identity_map() -> None:
+    """Test UserDBRepo.filter outside of identity map. Expect query every time"""
+
+    user: UserFactory = UserFactory.create()
+    with patch("entities.models.User.filter_by", return_value=[user]) as filter_by:
+        UserDBRepo().filter(id=user.id)
+        UserDBRepo().filter(id=user.id)
+
+    assert filter_by.call_count == 2
@@ -323,3 +323,77 @@ def test_grid_manager_check_game_state_no_winner() -> None:
     grid_manager: GridManager = GridManager(game_board)
     state: Tuple[bool, str] = grid_manager.check_game_state()
     assert state == (False, None)
+
+
+def test_grid_manager_check_game_state_draw() -> None:
+    """Test check_game_state method. Expected: game finished without winner."""
+    game_board: List[List[None | str]] = [
+        ["X", "O", "X"],
+        ["X", "O", "O"],
+        ["O", "X", "X"],
+    ]
+    grid_manager: GridManager = GridManager(game_board)
+    state: Tuple[bool, str] = grid_manager.check_game_state()
+    assert state == (True, None)
+    assert grid_manager.is_full() is True
+
+
+def test_grid_manager_get_board_after_moves() -> None:
+    """Test if get_board method returns nested list built from bitboard."""
+    grid_manager: GridManager = GridManager(GridManager.initialize_grid())
+    grid_manager.set_field(0, 2, "X")
+    grid_manager.set_field(2, 1, "O")
+    grid_manager.set_field(0, 2, "O")
+
+    assert grid_manager.get_board() == [
+        [None, None, "O"],
+        [None, None, None],
+        [None, "O", None],
+    ]
+    assert grid_manager.is_move_possible(0, 2) is False
+    assert grid_manager.is_full() is False
+
+
+def test_grid_get_field_method_negative_index() -> None:
+    """Test if get_field method raises IndexError for negative index."""
+    grid_manager: GridManager = GridManager(GridManager.initialize_grid())
+
+    with pytest.raises(IndexError):
+        grid_manager.get_field(-1, 0)
+
+
+def test_grid_manager_big_board_last_move_win() -> None:
+    """Test if five in a row on 15x15 board is found through the last move."""
+    grid_manager: GridManager = GridManager(GridManager.initialize_grid(15))
+    for col in range(6, 10):
+        grid_manager.make_move(7, col, "X")
+        grid_manager.make_move(0, col, "O")
+
+    assert grid_manager.check_game_state() == (False, None)
+
+    grid_manager.make_move(7, 10, "X")
+
+    assert grid_manager.win_length == 5
+    assert grid_manager.check_game_state() == (True, "X")
+
+
+def test_grid_manager_big_board_loaded_win() -> None:
+    """Test if line on loaded board is found by the full board scan."""
+    board: List[List[None]] = GridManager.initialize_grid(15)
+    for num in range(4):
+        board[10 + num][14 - num] = "O"
+    board[0][0] = "X"
+
+    assert GridManager(board).check_game_state() == (False, None)
+    assert GridManager(board, win_length=4).check_game_state() == (True, "O")
+
+
+def test_grid_manager_from_moves() -> None:
+    """Test if board replayed from field numbers alternates symbols."""
+    grid_manager: GridManager = GridManager.from_moves([4, 0, 8], first_symbol="O")
+
+    assert grid_manager.get_board() == [
+        ["X", None, None],
+        [None, "O", None],
+        [None, None, "O"],
+    ]
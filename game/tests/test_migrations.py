@@ -0,0 +1,268 @@
+import re
+from typing import Dict, List, Set
+from unittest.mock import MagicMock
+
+import pytest
+
+from entities.models import db
+from migrations import INSERT_VERSION, LOCK_KEY, Migration, migrate, pending
+from migrations.versions import (
+    GAME_OPTIONS_AND_MOVES,
+    HOT_PATH_INDEXES,
+    INITIAL_SCHEMA,
+    MIGRATIONS,
+    PARTITION_BY_CREATED_AT,
+    ROW_VERSIONS,
+)
+
+
+CREATE_TABLE = re.compile(
+    r"CREATE TABLE (IF NOT EXISTS )?(?P<table>\w+) \((?P<body>.*)\)$"
+)
+ADD_COLUMN = re.compile(
+    r"ALTER TABLE (?P<table>\w+) ADD COLUMN IF NOT EXISTS (?P<column>\w+)"
+)
+RENAME_TABLE = re.compile(r"ALTER TABLE (?P<table>\w+) RENAME TO (?P<name>\w+)$")
+DROP_TABLE = re.compile(r"DROP TABLE (?P<table>\w+)$")
+COPY_ROWS = re.compile(r"INSERT INTO .* SELECT (?P<columns>.*) FROM (?P<table>\w+)$")
+
+
+def _sql(call) -> str:
+    return str(call.args[0])
+
+
+def _apply_ddl(tables: Dict[str, Set[str]], sql: str) -> None:
+    """Track columns of tables through statements of migrations."""
+    sql = re.sub(r"\) PARTITION BY .*$", ")", sql)
+    if match := CREATE_TABLE.match(sql):
+        parts: List[str] = re.split(r",\s*(?![^()]*\))", match["body"])
+        tables.setdefault(
+            match["table"],
+            {
+                part.split()[0]
+                for part in parts
+                if part.split()[0] not in ("CONSTRAINT", "PRIMARY")
+            },
+        )
+    elif match := ADD_COLUMN.match(sql):
+        tables[match["table"]].add(match["column"])
+    elif match := RENAME_TABLE.match(sql):
+        tables[match["name"]] = tables.pop(match["table"])
+    elif match := DROP_TABLE.match(sql):
+        del tables[match["table"]]
+
+
+@pytest.fixture
+def engine() -> MagicMock:
+    engine: MagicMock = MagicMock()
+    connection: MagicMock = engine.connect.return_value.__enter__.return_value
+    connection.execution_options.return_value = connection
+    connection.execute.return_value.scalars.return_value = [1]
+    return engine
+
+
+def test_versions_ordered_and_unique() -> None:
+    """Test migration list. Expect versions to grow one by one from 1"""
+
+    assert [migration.version for migration in MIGRATIONS] == list(
+        range(1, len(MIGRATIONS) + 1)
+    )
+
+
+def test_released_versions_kept() -> None:
+    """Test migration list. Expect released versions unchanged, new ones after"""
+
+    assert [
+        migration.version
+        for migration in (
+            INITIAL_SCHEMA,
+            HOT_PATH_INDEXES,
+            PARTITION_BY_CREATED_AT,
+            ROW_VERSIONS,
+        )
+    ] == [1, 2, 3, 4]
+    assert GAME_OPTIONS_AND_MOVES.version > ROW_VERSIONS.version
+
+
+def test_board_conversion_gated() -> None:
+    """
+    Test legacy columns migration. Expect JSON board with rows refused, left
+    to migrate_boards.py, and only empty table altered
+    """
+
+    (gate,) = [sql for sql in GAME_OPTIONS_AND_MOVES.statements if "board TYPE" in sql]
+    assert gate.index("RAISE EXCEPTION") < gate.index("ALTER COLUMN board TYPE")
+    assert "migrate_boards.py" in gate
+    assert "IF EXISTS (SELECT 1 FROM game)" in gate
+    assert "board_packed" not in gate
+
+
+def test_migrations_cover_models() -> None:
+    """Test migrations. Expect every table and column of models created"""
+
+    for table in db.metadata.sorted_tables:
+        statement: str = next(
+            sql
+            for migration in MIGRATIONS
+            for sql in migration.statements
+            if sql.startswith(f"CREATE TABLE IF NOT EXISTS {table.name} (")
+        )
+        added: str = " ".join(
+            sql
+            for migration in MIGRATIONS[1:]
+            for sql in migration.statements
+            if f"TABLE {table.name} " in sql or f"TABLE {table.name}_" in sql
+        )
+        for column in table.columns:
+            assert f"{column.name} " in statement + added
+
+
+def test_migrations_on_baseline_schema() -> None:
+    """
+    Test migrations on tables create_all made before migrations existed,
+    manual ones after the rest as partition-tables runs them. Expect columns
+    copied by later migrations added first, models matched
+    """
+
+    tables: Dict[str, Set[str]] = {}
+    for sql in INITIAL_SCHEMA.statements:
+        _apply_ddl(tables, sql)
+    assert "difficulty" not in tables["game"] and "game_moves" not in tables
+
+    startup: List[Migration] = pending(MIGRATIONS, {INITIAL_SCHEMA.version})
+    applied: Set[int] = {migration.version for migration in startup} | {1}
+    for migration in startup + pending(MIGRATIONS, applied, manual=True):
+        for sql in migration.statements:
+            if match := COPY_ROWS.match(sql):
+                assert set(match["columns"].split(", ")) <= tables[match["table"]]
+            _apply_ddl(tables, sql)
+
+    for table in db.metadata.sorted_tables:
+        assert tables[table.name] == {column.name for column in table.columns}
+
+
+def test_dropped_foreign_keys_replaced_by_triggers() -> None:
+    """
+    Test migrations. Expect delete of row referenced through dropped foreign
+    key handled by trigger on the referenced table
+    """
+
+    statements: List[str] = [
+        sql for migration in MIGRATIONS for sql in migration.statements
+    ]
+    dropped: Set[str] = {
+        match["name"]
+        for sql in statements
+        if (match := re.search(r"DROP CONSTRAINT IF EXISTS (?P<name>\w+)", sql))
+    }
+    assert dropped
+    for table in db.metadata.sorted_tables:
+        for key in table.foreign_keys:
+            if f"{table.name}_{key.parent.name}_fkey" in dropped:
+                assert any(
+                    sql.startswith("CREATE TRIGGER ")
+                    and f" AFTER DELETE ON {key.column.table.name} " in sql
+                    for sql in statements
+                )
+
+
+def test_model_indexes_migrated() -> None:
+    """Test migrations. Expect every index declared on models to be created"""
+
+    statements: str = " ".join(
+        sql for migration in MIGRATIONS for sql in migration.statements
+    )
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            assert f"CREATE INDEX CONCURRENTLY {index.name} " in statements
+
+
+def test_pending() -> None:
+    """Test pending. Expect applied versions skipped and the rest ordered"""
+
+    migrations: List[Migration] = [
+        Migration(3, "c", ()),
+        Migration(1, "a", ()),
+        Migration(2, "b", ()),
+    ]
+
+    assert [m.version for m in pending(migrations, {2})] == [1, 3]
+
+
+def test_pending_manual() -> None:
+    """Test pending. Expect manual migration left out unless asked for"""
+
+    migrations: List[Migration] = [
+        Migration(1, "a", ()),
+        Migration(2, "copy", (), manual=True),
+        Migration(3, "c", ()),
+    ]
+
+    assert [m.version for m in pending(migrations, set())] == [1, 3]
+    assert [m.version for m in pending(migrations, {1, 3}, manual=True)] == [2]
+
+
+def test_partitioning_is_manual() -> None:
+    """Test migration list. Expect statements copying tables out of startup"""
+
+    for migration in pending(MIGRATIONS, set()):
+        assert not any(COPY_ROWS.match(sql) for sql in migration.statements)
+
+
+def test_migrate_applies_pending_only(engine: MagicMock) -> None:
+    """Test migrate. Expect applied version skipped and lock released"""
+
+    migrations: List[Migration] = [
+        Migration(1, "tables", ("CREATE TABLE a (id INTEGER)",)),
+        Migration(2, "more tables", ("CREATE TABLE b (id INTEGER)",)),
+    ]
+
+    applied: List[Migration] = migrate(engine, migrations)
+
+    connection: MagicMock = engine.connect.return_value.__enter__.return_value
+    transaction: MagicMock = engine.begin.return_value.__enter__.return_value
+    statements: List[str] = [_sql(call) for call in connection.execute.call_args_list]
+    assert applied == [migrations[1]]
+    assert statements[0] == "SELECT pg_advisory_lock(:key)"
+    assert connection.execute.call_args_list[0].args[1] == {"key": LOCK_KEY}
+    assert statements[-1] == "SELECT pg_advisory_unlock(:key)"
+    assert [_sql(call) for call in transaction.execute.call_args_list] == [
+        "CREATE TABLE b (id INTEGER)",
+        str(INSERT_VERSION),
+    ]
+    assert transaction.execute.call_args_list[-1].args[1] == {
+        "version": 2,
+        "name": "more tables",
+    }
+
+
+def test_migrate_non_transactional(engine: MagicMock) -> None:
+    """Test migrate. Expect concurrent statements run outside of transaction"""
+
+    migration: Migration = Migration(
+        2, "index", ("CREATE INDEX CONCURRENTLY a_idx ON a (id)",), False
+    )
+
+    migrate(engine, [migration])
+
+    connection: MagicMock = engine.connect.return_value.__enter__.return_value
+    statements: List[str] = [_sql(call) for call in connection.execute.call_args_list]
+    engine.begin.assert_not_called()
+    connection.execution_options.assert_called_once_with(isolation_level="AUTOCOMMIT")
+    assert statements.index("CREATE INDEX CONCURRENTLY a_idx ON a (id)") < (
+        statements.index(str(INSERT_VERSION))
+    )
+
+
+def test_migrate_releases_lock_on_error(engine: MagicMock) -> None:
+    """Test migrate. Expect advisory lock released when migration fails"""
+
+    engine.begin.side_effect = RuntimeError
+
+    with pytest.raises(RuntimeError):
+        migrate(engine, [Migration(2, "broken", ("SELECT 1",))])
+
+    connection: MagicMock = engine.connect.return_value.__enter__.return_value
+    assert _sql(connection.execute.call_args_list[-1]) == (
+        "SELECT pg_advisory_unlock(:key)"
+    )
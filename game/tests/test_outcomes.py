@@ -0,0 +1,51 @@
+from typing import List, Optional, Tuple
+
+from repos.outcomes import OUTCOMES, STATES, board_index, outcome
+
+
+def naive_game_state(board: List[Optional[str]]) -> Tuple[bool, Optional[str]]:
+    """Reference game state check on flat board, lines scanned one by one."""
+    lines: List[Tuple[int, int, int]] = []
+    for element in range(3):
+        lines.append((element * 3, element * 3 + 1, element * 3 + 2))
+        lines.append((element, element + 3, element + 6))
+    lines.extend([(0, 4, 8), (2, 4, 6)])
+    for first, second, third in lines:
+        if board[first] and board[first] == board[second] == board[third]:
+            return True, board[first]
+    if None not in board:
+        return True, None
+    return False, None
+
+
+def decode(index: int) -> List[Optional[str]]:
+    """Decode ternary board index into flat board."""
+    board: List[Optional[str]] = []
+    for _ in range(9):
+        index, digit = divmod(index, 3)
+        board.append([None, "X", "O"][digit])
+    return board
+
+
+def test_outcomes_table_is_compact() -> None:
+    """Test if table keeps one byte per board encoding."""
+    assert len(OUTCOMES) == STATES == 19683
+    assert OUTCOMES.itemsize == 1
+
+
+def test_outcomes_table_matches_line_scan() -> None:
+    """Test every board encoding against reference line scan."""
+    for index in range(STATES):
+        board: List[Optional[str]] = decode(index)
+        is_finished, winner, free_count = outcome(index)
+
+        assert (is_finished, winner) == naive_game_state(board)
+        assert free_count == board.count(None)
+
+
+def test_board_index() -> None:
+    """Test if board index is built from both symbol masks."""
+    assert board_index(0, 0) == 0
+    assert board_index(0b1, 0) == 1
+    assert board_index(0, 0b1) == 2
+    assert board_index(0b100000000, 0b1) == 3**8 + 2
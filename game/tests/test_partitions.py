@@ -0,0 +1,140 @@
+from datetime import date
+from typing import List
+from unittest.mock import MagicMock
+
+import pytest
+
+from migrations.partitions import (
+    MONTHS_AHEAD,
+    SELECT_PARTITIONED,
+    add_months,
+    create_default_partition,
+    create_partition,
+    detach_partitions,
+    ensure_partitions,
+    partition_month,
+)
+
+
+def _sql(connection: MagicMock) -> List[str]:
+    return [str(call.args[0]) for call in connection.execute.call_args_list]
+
+
+@pytest.mark.parametrize(
+    "day, months, expected",
+    [
+        (date(2026, 10, 17), 0, date(2026, 10, 1)),
+        (date(2026, 10, 17), 3, date(2027, 1, 1)),
+        (date(2026, 1, 31), -1, date(2025, 12, 1)),
+        (date(2026, 12, 1), -12, date(2025, 12, 1)),
+    ],
+)
+def test_add_months(day: date, months: int, expected: date) -> None:
+    """Test add_months. Expect first day of the month, across years"""
+
+    assert add_months(day, months) == expected
+
+
+def test_partition_month() -> None:
+    """Test partition_month. Expect month of partition, None for other tables"""
+
+    assert partition_month("session", "session_p2026_10") == date(2026, 10, 1)
+    assert partition_month("session", "session_unpartitioned") is None
+    assert partition_month("game", "session_p2026_10") is None
+
+
+def test_create_partition() -> None:
+    """Test create_partition. Expect range of one month, upper bound exclusive"""
+
+    assert create_partition("game", date(2026, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS game_p2026_12 PARTITION OF game "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+
+
+def test_ensure_partitions() -> None:
+    """Test ensure_partitions. Expect current and coming months of both tables"""
+
+    connection: MagicMock = MagicMock()
+
+    ensure_partitions(connection, date(2026, 10, 17))
+
+    statements: List[str] = [
+        sql for sql in _sql(connection) if sql.startswith("CREATE TABLE")
+    ]
+    assert len(statements) == 2 * (MONTHS_AHEAD + 2)
+    assert statements[0] == create_default_partition("session")
+    assert statements[1] == create_partition("session", date(2026, 10, 1))
+    assert statements[-1] == create_partition("game", date(2027, 1, 1))
+
+
+def test_ensure_partitions_moves_rows_out_of_default() -> None:
+    """
+    Test ensure_partitions. Expect existing months skipped, rows of months
+    caught by default partition moved while it is detached
+    """
+
+    connection: MagicMock = MagicMock()
+    connection.execute.return_value.scalars.side_effect = [
+        ["session_default", "session_p2026_10", "session_p2026_11"],
+        [date(2026, 8, 1), date(2026, 10, 1)],
+        ["game_default"],
+        [],
+    ]
+
+    ensure_partitions(connection, date(2026, 10, 17), 1)
+
+    statements: List[str] = _sql(connection)
+    session: List[str] = statements[: statements.index(str(SELECT_PARTITIONED), 1)]
+    assert [sql for sql in session if sql.startswith("CREATE TABLE")] == [
+        create_default_partition("session"),
+        create_partition("session", date(2026, 8, 1)),
+    ]
+    move: List[str] = session[
+        session.index(create_partition("session", date(2026, 8, 1))) - 1 :
+    ]
+    assert move == [
+        "ALTER TABLE session DETACH PARTITION session_default",
+        create_partition("session", date(2026, 8, 1)),
+        "INSERT INTO session SELECT * FROM session_default "
+        "WHERE created_at >= '2026-08-01' AND created_at < '2026-09-01'",
+        "DELETE FROM session_default "
+        "WHERE created_at >= '2026-08-01' AND created_at < '2026-09-01'",
+        "ALTER TABLE session ATTACH PARTITION session_default DEFAULT",
+    ]
+    assert create_partition("game", date(2026, 11, 1)) in statements
+
+
+def test_ensure_partitions_skips_plain_tables() -> None:
+    """Test ensure_partitions. Expect nothing created before partition-tables"""
+
+    connection: MagicMock = MagicMock()
+    connection.execute.return_value.scalar.return_value = False
+
+    ensure_partitions(connection, date(2026, 10, 17))
+
+    assert set(_sql(connection)) == {str(SELECT_PARTITIONED)}
+
+
+def test_detach_partitions() -> None:
+    """Test detach_partitions. Expect only months before kept ones detached"""
+
+    connection: MagicMock = MagicMock()
+    connection.execute.return_value.scalars.side_effect = [
+        ["session_p2026_09", "session_p2026_08", "session_p2026_10"],
+        ["game_p2026_08", "game_p2026_10"],
+    ]
+
+    detached: List[str] = detach_partitions(connection, date(2026, 10, 17), 2)
+
+    assert detached == ["session_p2026_08", "game_p2026_08"]
+    assert "ALTER TABLE session DETACH PARTITION session_p2026_08 CONCURRENTLY" in (
+        _sql(connection)
+    )
+
+
+def test_detach_keeps_current_month() -> None:
+    """Test detach_partitions. Expect error instead of detaching current month"""
+
+    with pytest.raises(ValueError):
+        detach_partitions(MagicMock(), date(2026, 10, 17), 0)
@@ -0,0 +1,101 @@
+import random
+from typing import Optional, Tuple
+
+import pytest
+from repos.managers import GridManager
+from repos.outcomes import SYMBOLS
+from repos.policy import FILE_SIZE, PerfectPlayPolicy, write_policy
+from repos.search import SearchEngine
+from utils.exceptions import ImproperlyConfigured
+
+
+@pytest.fixture(scope="module")
+def policy(tmp_path_factory: pytest.TempPathFactory) -> PerfectPlayPolicy:
+    path: str = str(tmp_path_factory.mktemp("policy") / "policy.bin")
+    write_policy(path)
+    policy: PerfectPlayPolicy = PerfectPlayPolicy(path)
+    yield policy
+    policy.close()
+
+
+def test_policy_empty_board_is_draw(policy: PerfectPlayPolicy) -> None:
+    """Test if empty board is a draw for both players moving first."""
+    assert policy.value((0, 0), "X") == 0
+    assert policy.value((0, 0), "O") == 0
+    assert policy.best_move((0, 0), "X") is not None
+
+
+def test_policy_takes_quickest_win(policy: PerfectPlayPolicy) -> None:
+    """Test if policy finishes the game instead of making another threat."""
+    grid: GridManager = GridManager([["X", "X", None], ["O", "O", None], [None] * 3])
+
+    assert policy.best_move(grid.symbol_masks(), "X") == (0, 2)
+    assert policy.value(grid.symbol_masks(), "X") == 1
+
+
+def test_policy_finished_board(policy: PerfectPlayPolicy) -> None:
+    """Test if finished board has no move."""
+    grid: GridManager = GridManager([["X", "X", "X"], ["O", "O", None], [None] * 3])
+
+    assert policy.best_move(grid.symbol_masks(), "O") is None
+    assert policy.value(grid.symbol_masks(), "O") == -1
+
+
+@pytest.mark.parametrize("first", SYMBOLS)
+def test_policy_never_loses_against_random_player(
+    policy: PerfectPlayPolicy, first: str
+) -> None:
+    """Test random games, policy plays second with either symbol."""
+    rnd: random.Random = random.Random(7)
+    bot: str = "O" if first == "X" else "X"
+    for _ in range(200):
+        grid: GridManager = GridManager(GridManager.initialize_grid())
+        symbol: str = first
+        winner: Optional[str] = None
+        is_finished: bool = False
+        while not is_finished:
+            move: Tuple[int, int]
+            if symbol == bot:
+                move = policy.best_move(grid.symbol_masks(), symbol)
+            else:
+                move = rnd.choice(grid.find_free_spots())
+            grid.make_move(*move, symbol)
+            is_finished, winner = grid.check_game_state()
+            symbol = bot if symbol == first else first
+        assert winner in (bot, None)
+
+
+def test_policy_agrees_with_search_engine(policy: PerfectPlayPolicy) -> None:
+    """Test if policy move keeps the value found by the search engine."""
+    engine: SearchEngine = SearchEngine(time_budget=5)
+    rnd: random.Random = random.Random(3)
+    for _ in range(30):
+        grid: GridManager = GridManager(GridManager.initialize_grid())
+        plies: int = rnd.randint(1, 4)
+        for ply in range(plies):
+            grid.make_move(*rnd.choice(grid.find_free_spots()), SYMBOLS[ply % 2])
+        symbol: str = SYMBOLS[plies % 2]
+        if grid.check_game_state()[0]:
+            continue
+        value: int = policy.value(grid.symbol_masks(), symbol)
+        row, col = engine.best_move(grid.get_board(), symbol)
+        grid.make_move(row, col, symbol)
+        other: str = "O" if symbol == "X" else "X"
+        is_finished, winner = grid.check_game_state()
+        child: int = 1 if winner else -policy.value(grid.symbol_masks(), other)
+        assert child == value
+
+
+def test_policy_missing_file(tmp_path) -> None:
+    """Test if missing file is reported as configuration error."""
+    with pytest.raises(ImproperlyConfigured):
+        PerfectPlayPolicy(str(tmp_path / "missing.bin"))
+
+
+def test_policy_wrong_file(tmp_path) -> None:
+    """Test if file with other content is rejected."""
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * FILE_SIZE)
+
+    with pytest.raises(ImproperlyConfigured):
+        PerfectPlayPolicy(str(path))
@@ -0,0 +1,96 @@
+import logging
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Response
+from flask.testing import FlaskClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from utils.pool import InstrumentedPool
+
+
+@pytest.fixture
+def pool() -> InstrumentedPool:
+    return InstrumentedPool(MagicMock, pool_size=1, max_overflow=1, timeout=0.01)
+
+
+def test_pool_stats_checkouts(pool: InstrumentedPool) -> None:
+    """Test InstrumentedPool. Expect checked out and overflow connections counted"""
+
+    first = pool.connect()
+    second = pool.connect()
+    stats: dict = pool.stats()
+
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 0
+
+    first.close()
+    second.close()
+    assert pool.stats()["checked_out"] == 0
+
+
+def test_pool_timeout_logged(
+    pool: InstrumentedPool, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test InstrumentedPool. Expect timeout counted and logged with stats"""
+
+    connections: list = [pool.connect(), pool.connect()]
+
+    with caplog.at_level(logging.WARNING, logger="utils.pool"):
+        with pytest.raises(PoolTimeoutError):
+            pool.connect()
+
+    stats: dict = pool.stats()
+    assert len(connections) == stats["checked_out"]
+    assert stats["timeouts"] == 1
+    assert stats["wait_max_ms"] >= 10
+    assert "Connection pool timed out" in caplog.text
+    assert "'timeouts': 1" in caplog.text
+
+
+def test_pool_slow_checkout_logged(
+    pool: InstrumentedPool, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test InstrumentedPool. Expect checkout over threshold logged"""
+
+    with patch("utils.pool.settings.db.pool_slow_checkout", 0.0):
+        with caplog.at_level(logging.WARNING, logger="utils.pool"):
+            pool.connect().close()
+
+    assert "for connection" in caplog.text
+
+
+def test_pool_stats_endpoint(client: FlaskClient) -> None:
+    """Test pool statistics endpoint. Expect live numbers of engine pool"""
+
+    with patch("app.settings.internal_token", "secret"):
+        response: Response = client.get(
+            "/internal/pool", headers={"Authorization": "Bearer secret"}
+        )
+
+    assert response.status_code == 200
+    assert {"size", "checked_out", "overflow", "wait_avg_ms"} <= set(response.json)
+
+
+@pytest.mark.parametrize(
+    "token, headers, status_code",
+    [
+        ("secret", {}, 401),
+        ("secret", {"Authorization": "Bearer wrong"}, 401),
+        ("secret", {"Authorization": "secret"}, 401),
+        (None, {"Authorization": "Bearer "}, 403),
+    ],
+)
+def test_pool_stats_endpoint_unauthorized(
+    client: FlaskClient, token: Optional[str], headers: dict, status_code: int
+) -> None:
+    """Test pool statistics endpoint. Expect no statistics without valid token"""
+
+    with patch("app.settings.internal_token", token):
+        response: Response = client.get("/internal/pool", headers=headers)
+
+    assert response.status_code == status_code
+    assert "size" not in response.json
@@ -0,0 +1,71 @@
+import pytest
+from flask import Flask
+
+from entities.models import User, db
+from repos.db_repo import UserDBRepo
+from repos.replicas import ReadScope, choose_replica, current_read_scope
+
+
+@pytest.fixture
+def replicated_app(tmp_path) -> Flask:
+    """Two SQLite files standing in for the primary and its replica"""
+
+    app: Flask = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'primary.db'}"
+    app.config["SQLALCHEMY_BINDS"] = {
+        "replica_0": f"sqlite:///{tmp_path / 'replica.db'}"
+    }
+    db.init_app(app)
+    with app.app_context():
+        for engine, credits in ((db.engines[None], 10), (db.engines["replica_0"], 3)):
+            db.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(
+                    User.__table__.insert().values(
+                        id=1, email="a@a.pl", credits=credits
+                    )
+                )
+        yield app
+
+
+def test_read_scope() -> None:
+    """Test ReadScope. Expect replica reads until the first write"""
+
+    assert current_read_scope() is None
+    with ReadScope("replica_0") as scope:
+        assert current_read_scope() is scope
+        assert scope.read_bind == "replica_0"
+        scope.wrote = True
+        assert scope.read_bind is None
+    assert current_read_scope() is None
+
+
+def test_choose_replica() -> None:
+    """Test choose_replica. Expect None without replicas"""
+
+    assert choose_replica([]) is None
+    assert choose_replica(["replica_0", "replica_1"]) in {"replica_0", "replica_1"}
+
+
+def test_reads_go_to_replica(replicated_app: Flask) -> None:
+    """Test RoutingSession. Expect reads from replica only inside scope"""
+
+    repo: UserDBRepo = UserDBRepo()
+
+    assert repo.filter(id=1).__root__[0].credits == 10
+    with ReadScope("replica_0"):
+        assert repo.filter(id=1).__root__[0].credits == 3
+    with ReadScope():
+        assert repo.filter(id=1).__root__[0].credits == 10
+
+
+def test_reads_own_writes(replicated_app: Flask) -> None:
+    """Test RoutingSession. Expect reads from primary after write in scope"""
+
+    repo: UserDBRepo = UserDBRepo()
+
+    with ReadScope("replica_0") as scope:
+        assert repo.filter(id=1).__root__[0].credits == 3
+        assert repo.debit_credits(1, 2) == 8
+        assert scope.wrote
+        assert repo.filter(id=1).__root__[0].credits == 8
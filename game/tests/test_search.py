@@ -0,0 +1,125 @@
+import random
+from typing import List, Optional, Tuple
+
+from repos.managers import GridManager
+from repos.search import SearchEngine, TranspositionTable, get_geometry
+
+
+def empty_board(size: int) -> List[List[Optional[str]]]:
+    return [[None] * size for _ in range(size)]
+
+
+def test_search_engine_takes_winning_move() -> None:
+    """Test if engine completes its own line. Expected: winning field."""
+    board: List[List[Optional[str]]] = [
+        ["O", "O", None],
+        ["X", "X", None],
+        [None, None, None],
+    ]
+    move: Tuple[int, int] = SearchEngine().best_move(board, "X")
+    assert move == (1, 2)
+
+
+def test_search_engine_blocks_opponent() -> None:
+    """Test if engine blocks opponent line. Expected: blocking field."""
+    board: List[List[Optional[str]]] = [
+        ["X", "X", None],
+        [None, "O", None],
+        [None, None, None],
+    ]
+    move: Tuple[int, int] = SearchEngine().best_move(board, "O")
+    assert move == (0, 2)
+
+
+def test_search_engine_full_board() -> None:
+    """Test best_move on full board. Expected: None"""
+    board: List[List[Optional[str]]] = [
+        ["X", "O", "X"],
+        ["X", "O", "O"],
+        ["O", "X", "X"],
+    ]
+    assert SearchEngine().best_move(board, "X") is None
+
+
+def test_search_engine_never_loses_against_random_player() -> None:
+    """Test engine as second player against random moves. Expected: no loss."""
+    engine: SearchEngine = SearchEngine()
+    rnd: random.Random = random.Random(7)
+    for _ in range(20):
+        grid: GridManager = GridManager(GridManager.initialize_grid())
+        while not grid.check_game_state()[0]:
+            grid.make_move(*rnd.choice(grid.find_free_spots()), "X")
+            if grid.check_game_state()[0]:
+                break
+            grid.make_move(*engine.best_move(grid.get_board(), "O"), "O")
+        assert grid.check_game_state()[1] != "X"
+
+
+def test_search_engine_large_board_blocks_four() -> None:
+    """Test 15x15 five-in-a-row board. Expected: engine blocks open four."""
+    board: List[List[Optional[str]]] = empty_board(15)
+    for col in range(3, 7):
+        board[3][col] = "X"
+    board[10][10] = board[10][11] = board[11][11] = "O"
+
+    move: Tuple[int, int] = SearchEngine().best_move(
+        board, "O", win_length=5, time_budget=0.3
+    )
+    assert move in [(3, 2), (3, 7)]
+
+
+def test_search_engine_reuses_table_between_calls() -> None:
+    """Test if positions searched before are served from the table."""
+    engine: SearchEngine = SearchEngine()
+    engine.best_move(empty_board(3), "X")
+    first_nodes: int = engine.nodes
+    board: List[List[Optional[str]]] = empty_board(3)
+    board[1][1] = "X"
+    engine.best_move(board, "O")
+
+    assert engine.nodes < first_nodes
+    assert engine.table.hits > 0
+
+
+def test_search_engine_serves_symmetric_position_from_replies() -> None:
+    """Test if mirrored position is answered from the cache, mapped back."""
+    engine: SearchEngine = SearchEngine()
+    board: List[List[Optional[str]]] = [
+        ["X", "X", None],
+        [None, "O", None],
+        [None, None, None],
+    ]
+    mirrored: List[List[Optional[str]]] = [list(reversed(row)) for row in board]
+
+    assert engine.best_move(board, "O") == (0, 2)
+    assert engine.best_move(mirrored, "O") == (0, 0)
+    assert engine.replies.hits == 1
+    assert len(engine.replies) == 1
+
+
+def test_transposition_table_is_bounded() -> None:
+    """Test if table drops oldest entries when full."""
+    table: TranspositionTable = TranspositionTable(size=2)
+    table.store(1, (1, 0, 0, None))
+    table.store(2, (1, 0, 0, None))
+    table.store(3, (1, 0, 0, None))
+
+    assert len(table) == 2
+    assert table.get(1) is None
+    assert table.get(3) == (1, 0, 0, None)
+
+
+def test_geometry_windows_count() -> None:
+    """Test number of k-long segments on 15x15 board with k=5."""
+    assert len(get_geometry(15, 5).windows) == 2 * 15 * 11 + 2 * 11 * 11
+    assert len(get_geometry(3, 3).windows) == 8
+
+
+def test_geometry_has_line_finds_every_window() -> None:
+    """Test if shift based scan finds every single window, also at board edges."""
+    for size, win_length in ((3, 3), (5, 3), (7, 4), (15, 5)):
+        geometry = get_geometry(size, win_length)
+        for window in geometry.windows:
+            assert geometry.has_line(window)
+            low: int = window & -window
+            assert not geometry.has_line(window ^ low)
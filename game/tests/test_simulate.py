@@ -0,0 +1,51 @@
+import random
+from collections import Counter
+
+from entities.types import Difficulty, GameOptions
+from simulate import SimulationOptions, parse_args, play_game, play_session, run
+from use_cases.use_case import UserUseCase
+
+
+def test_play_game_hard_players_draw(use_case: UserUseCase) -> None:
+    """Test if two perfect players always draw on 3x3 board."""
+    options: SimulationOptions = SimulationOptions(
+        player=Difficulty.HARD.value, game=GameOptions(Difficulty.HARD.value)
+    )
+
+    assert play_game(use_case, options, "O") == "draw"
+
+
+def test_play_session_credits_balance(use_case: UserUseCase) -> None:
+    """Test if credits spent and won add up to credits left."""
+    random.seed(1)
+    options: SimulationOptions = SimulationOptions(start_credits=10)
+
+    stats: Counter = play_session(use_case, options)
+
+    assert stats["sessions"] == 1
+    assert stats["games"] == stats["credits_spent"] // 3
+    assert stats["credits_left"] == 10 - stats["credits_spent"] + stats["credits_won"]
+    assert stats["credits_left"] < 3 or stats["capped_sessions"] == 1
+
+
+def test_play_session_game_limit(use_case: UserUseCase) -> None:
+    """Test if session is cut after max games."""
+    options: SimulationOptions = SimulationOptions(start_credits=100, max_games=2)
+
+    stats: Counter = play_session(use_case, options)
+
+    assert stats["games"] == 2
+    assert stats["capped_sessions"] == 1
+
+
+def test_run_sums_all_chunks() -> None:
+    """Test if sessions spread over workers are all counted."""
+    options: SimulationOptions = parse_args(["--sessions", "300", "--workers", "2"])
+
+    stats, seconds = run(options)
+
+    assert stats["sessions"] == 300
+    assert stats["games"] == sum(
+        stats[f"winner_{result}"] for result in ("X", "O", "draw")
+    )
+    assert seconds > 0
@@ -0,0 +1,97 @@
+import random
+from typing import List, Optional, Tuple
+
+from repos.managers import GridManager
+from repos.symmetry import (
+    SymmetricCache,
+    canonical_form,
+    from_canonical_move,
+    to_canonical_move,
+    transform_masks,
+)
+
+
+def random_masks(size: int, rnd: random.Random) -> Tuple[int, int]:
+    x_mask: int = 0
+    o_mask: int = 0
+    for cell in range(size * size):
+        value: int = rnd.randint(0, 2)
+        if value == 1:
+            x_mask |= 1 << cell
+        elif value == 2:
+            o_mask |= 1 << cell
+    return x_mask, o_mask
+
+
+def test_canonical_form_is_shared_by_all_symmetries() -> None:
+    """Test if all 8 transforms of a board have the same canonical form."""
+    rnd: random.Random = random.Random(3)
+    for size in (3, 5):
+        for _ in range(20):
+            masks: Tuple[int, int] = random_masks(size, rnd)
+            canonical, _ = canonical_form(masks, size)
+            for transform in range(8):
+                transformed = transform_masks(masks, transform, size)
+                assert canonical_form(transformed, size)[0] == canonical
+
+
+def test_canonical_form_transform_leads_to_canonical() -> None:
+    """Test if returned transform maps board onto its canonical form."""
+    masks: Tuple[int, int] = (0b000000011, 0b000010000)
+    canonical, transform = canonical_form(masks, 3)
+
+    assert transform_masks(masks, transform, 3) == canonical
+
+
+def test_moves_round_trip() -> None:
+    """Test if move mapped to canonical board and back is unchanged."""
+    for size in (3, 4):
+        for transform in range(8):
+            for row in range(size):
+                for col in range(size):
+                    canonical = to_canonical_move(row, col, transform, size)
+                    assert from_canonical_move(*canonical, transform, size) == (
+                        row,
+                        col,
+                    )
+
+
+def test_grid_manager_canonical_form() -> None:
+    """Test if rotated GridManager boards share canonical form."""
+    board: List[List[Optional[str]]] = [
+        ["X", None, None],
+        [None, "O", None],
+        [None, None, None],
+    ]
+    rotated: List[List[Optional[str]]] = [list(row) for row in zip(*board[::-1])]
+
+    assert (
+        GridManager(board).canonical_form()[0]
+        == GridManager(rotated).canonical_form()[0]
+    )
+
+
+def test_symmetric_cache_maps_moves_back() -> None:
+    """Test if move cached for one board is returned mapped for its mirror."""
+    cache: SymmetricCache[int] = SymmetricCache()
+    board: GridManager = GridManager(
+        [["X", "X", None], [None, "O", None], [None, None, None]]
+    )
+    mirrored: GridManager = GridManager(
+        [[None, "X", "X"], [None, "O", None], [None, None, None]]
+    )
+    cache.store(board.symbol_masks(), 3, (0, 2), 1)
+
+    assert cache.get(mirrored.symbol_masks(), 3) == (0, 0, 1)
+    assert cache.hits == 1
+
+
+def test_symmetric_cache_is_bounded() -> None:
+    """Test if cache drops oldest entry when full."""
+    cache: SymmetricCache[int] = SymmetricCache(max_size=1)
+    cache.store((0b1, 0), 3, (1, 1), 0)
+    cache.store((0b10, 0), 3, (1, 1), 0)
+
+    assert len(cache) == 1
+    assert cache.get((0b1, 0), 3) is None
+    assert cache.hit_rate() == 0.0
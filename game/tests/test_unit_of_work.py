@@ -0,0 +1,77 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from entities.models import UNIT_OF_WORK, User
+from repos.unit_of_work import UnitOfWork
+
+
+@pytest.fixture
+def session() -> MagicMock:
+    session: MagicMock = MagicMock()
+    session.info = {}
+    return session
+
+
+def test_unit_of_work_commits_once(session: MagicMock) -> None:
+    """Test UnitOfWork. Expect single commit at the end of outermost block"""
+
+    with UnitOfWork(session):
+        with UnitOfWork(session):
+            assert session.info[UNIT_OF_WORK] == 2
+        session.commit.assert_not_called()
+
+    session.commit.assert_called_once()
+    session.rollback.assert_not_called()
+    assert UNIT_OF_WORK not in session.info
+
+
+def test_unit_of_work_rolls_back_on_error(session: MagicMock) -> None:
+    """Test UnitOfWork. Expect rollback and the error raised again"""
+
+    with pytest.raises(ValueError):
+        with UnitOfWork(session):
+            raise ValueError
+
+    session.commit.assert_not_called()
+    session.rollback.assert_called_once()
+    assert UNIT_OF_WORK not in session.info
+
+
+def test_unit_of_work_rolls_back_failed_commit(session: MagicMock) -> None:
+    """Test UnitOfWork. Expect rollback when commit itself fails"""
+
+    session.commit.side_effect = RuntimeError
+    with pytest.raises(RuntimeError):
+        with UnitOfWork(session):
+            pass
+
+    session.rollback.assert_called_once()
+
+
+def test_unit_of_work_decorator(session: MagicMock) -> None:
+    """Test UnitOfWork used as decorator. Expect commit after every call"""
+
+    @UnitOfWork(session)
+    def view() -> int:
+        return session.info[UNIT_OF_WORK]
+
+    assert view() == 1
+    assert view() == 1
+    assert session.commit.call_count == 2
+
+
+def test_save_flushes_inside_unit_of_work(session: MagicMock) -> None:
+    """Test BaseMixin.save. Expect flush in unit of work and commit outside of it"""
+
+    with patch("entities.models.db") as db:
+        db.session = session
+        with UnitOfWork(session):
+            User.save()
+            User.save()
+        session.flush.assert_called()
+        session.expire_all.assert_called()
+        assert session.commit.call_count == 1
+
+        User.save()
+        assert session.commit.call_count == 2
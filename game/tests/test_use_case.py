@@ -1,6 +1,6 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from typing import Any, Dict, List, Tuple
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 import pytest
 from entities.entites import (
@@ -11,20 +11,26 @@ from entities.entites import (
     UserSessionListPydantic,
     UserSessionPydantic,
 )
-from entities.types import GameStatus, SessionStatus, SessionStatusStates
+from entities.types import (
+    Difficulty,
+    GameOptions,
+    GameStatus,
+    PlayState,
+    SessionStatus,
+    SessionStatusStates,
+)
 from pytest_mock import MockerFixture
-from settings import PlayCredits
+from repos.managers import GridManager
+from settings import MAX_SESSION_LENGTH, PlayCredits
 from tests.factories import GameFactory, UserFactory, UserSessionFactory
 from tests.utils import (
     game2pydantic,
-    game2pydantic_list,
     user2pydantic,
     user2pydantic_list,
     user_session2pydantic,
     user_session2pydantic_list,
 )
 from use_cases.use_case import UserUseCase
-from utils.exceptions import NoGameFoundException
 
 
 def test_create_or_400_method_exists(
@@ -228,7 +234,7 @@ def test_start_session_method(use_case: UserUseCase, mocker: "MockerFixture") ->
     mocker.patch(
         "repos.db_repo.UserSessionDBRepo.create", return_value=user_session_pydantic
     )
-    mocker.patch("repos.db_repo.UserDBRepo.update_fields", return_value=None)
+    debit_mock = mocker.patch("repos.db_repo.UserDBRepo.debit_credits", return_value=7)
 
     expected_res: Dict[str, Any] = {
         **user_session_pydantic.dict(),
@@ -239,6 +245,27 @@ def test_start_session_method(use_case: UserUseCase, mocker: "MockerFixture") ->
 
     assert res[1] == 200
     assert res[0] == expected_res
+    debit_mock.assert_called_once_with(user.id, PlayCredits.PLAY.value)
+
+
+def test_start_session_method_no_credits(
+    use_case: UserUseCase, mocker: "MockerFixture"
+) -> None:
+    """
+    Test use_case.start_session method.
+    Expect error and no session created when debit of credits fails
+    """
+
+    user_pydantic: UserPydantic = user2pydantic(UserFactory.create(credits=2))
+    mocker.patch("use_cases.use_case.UserUseCase.get_user", return_value=user_pydantic)
+    mocker.patch("repos.db_repo.UserSessionDBRepo.filter", return_value=None)
+    mocker.patch("repos.db_repo.UserDBRepo.debit_credits", return_value=None)
+    create_mock = mocker.patch("repos.db_repo.UserSessionDBRepo.create")
+
+    res: Tuple[Dict[str, str], int] = use_case.start_session(user_id=1)
+
+    assert res == ({"error": "Not enough credits. Game cannot start"}, 400)
+    create_mock.assert_not_called()
 
 
 def test_create_new_game_method_no_user(
@@ -382,14 +409,18 @@ def test_create_new_game_method_no_credits(
     mocker.patch(
         "repos.db_repo.GameDBRepo.create", return_value=game_pydantic_list.__root__[0]
     )
-    mocker.patch(
+    session_status_mock = mocker.patch(
         "use_cases.use_case.UserUseCase.update_session_status", return_value=None
     )
+    mocker.patch("repos.db_repo.UserDBRepo.debit_credits", return_value=None)
+    create_mock = mocker.patch("repos.db_repo.GameDBRepo.create")
 
     res: Tuple[Dict[str, str], int] = use_case.create_new_game(user_id=1, session_id=1)
 
     assert res[1] == 400
     assert res[0]["error"] == "Not enough credits. Game cannot start"
+    session_status_mock.assert_called_once()
+    create_mock.assert_not_called()
 
 
 def test_create_new_game_method_success(
@@ -426,7 +457,7 @@ def test_create_new_game_method_success(
     mocker.patch(
         "use_cases.use_case.UserUseCase.update_session_status", return_value=None
     )
-    mocker.patch("repos.db_repo.UserDBRepo.update_fields", return_value=None)
+    debit_mock = mocker.patch("repos.db_repo.UserDBRepo.debit_credits", return_value=7)
 
     expected_result: Dict[str, Any] = {
         "game_details": game_pydantic_list.__root__[0].dict(exclude={"board"})
@@ -436,6 +467,7 @@ def test_create_new_game_method_success(
 
     assert res[1] == 200
     assert res[0] == expected_result
+    debit_mock.assert_called_once_with(user_pydantic.id, PlayCredits.PLAY.value)
 
 
 def test_get_session_obj(use_case: UserUseCase, mocker: "MockerFixture") -> None:
@@ -561,500 +593,6 @@ def test_validate_field_indexes_method_not_an_int(use_case: UserUseCase) -> None
     assert res == expected
 
 
-def test_player_play_method_fields_not_valid(
-    use_case: UserUseCase,
-) -> None:
-    """
-    Test use_case.player_play method.
-    Expected to return error because fields are not valid (col too high)
-    """
-
-    expected = {
-        "status": "error",
-        "error list": {
-            "col": "The number is wrong. Should be between 1 and 3",
-        },
-    }
-
-    game: GameFactory = GameFactory()
-    game_pydantic: GamePydantic = game2pydantic(game)
-
-    res: Tuple[Dict[str, str], int] = use_case._player_play(
-        data={"row": 1, "col": 10}, user_game=game_pydantic
-    )
-
-    assert res[0] == expected
-    assert res[1] == 400
-
-
-def test_player_play_method_fields_none(use_case) -> None:
-    """
-    Test use_case.player_play method.
-    Expected to return error because fields are not sent
-    """
-    game: GameFactory = GameFactory()
-    game_pydantic: GamePydantic = game2pydantic(game)
-
-    expected = {"error": "Invalid request. You didnt sent row and col"}
-
-    res: Tuple[Dict[str, str], int] = use_case._player_play(
-        data={}, user_game=game_pydantic
-    )
-
-    assert res[0] == expected
-    assert res[1] == 400
-
-
-def test_player_play_method_fields_invalid_move(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.player_play method.
-    Expected to return error because move is not possible
-    """
-    game: GameFactory = GameFactory()
-    game_pydantic: GamePydantic = game2pydantic(game)
-
-    mocker.patch("repos.managers.GridManager.is_move_possible", return_value=False)
-
-    expected = {
-        "error": "Invalid move. Field is taken",
-        "actual_board": game.board["board"],
-        "player_sign": game.symbol,
-    }
-
-    res: Tuple[Dict[str, str], int] = use_case._player_play(
-        data={"row": 1, "col": 1}, user_game=game_pydantic
-    )
-
-    assert res[0] == expected
-    assert res[1] == 400
-
-
-def test_player_play_method_fields_valid_move(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.player_play method.
-    Expected to return status code 200 with updated game board
-    """
-    game: GameFactory = GameFactory()
-    game_pydantic: GamePydantic = game2pydantic(game)
-
-    mocker.patch("repos.managers.GridManager.is_move_possible", return_value=True)
-    mocker.patch("repos.db_repo.GameDBRepo.update_fields", return_value=False)
-
-    res: Tuple[Dict[str, str], int] = use_case._player_play(
-        data={"row": 1, "col": 1}, user_game=game_pydantic
-    )
-
-    game_pydantic.board["board"][0][0] = game.symbol
-
-    assert res[0] == game_pydantic.board["board"]
-    assert res[1] == 200
-
-
-def test_random_play_method(use_case: UserUseCase, mocker: "MockerFixture") -> None:
-    """
-    Test use_case.random_play method.
-    Expected to make a move and return updated game board
-    """
-
-    class MockRefresh:
-        def __call__(self, obj, **kwargs):
-            """Update obj attributes"""
-            for key, val in kwargs.items():
-                setattr(obj, key, val)
-
-            return obj
-
-    with patch("repos.db_repo.GameDBRepo.update_fields", side_effect=MockRefresh()):
-        user: UserFactory = UserFactory()
-        user_pydantic: UserPydantic = user2pydantic(user)
-        game: GameFactory = GameFactory()
-        game_pydantic: GamePydantic = game2pydantic(game)
-
-        mocker.patch(
-            "use_cases.use_case.UserUseCase.get_user", return_value=user_pydantic
-        )
-
-        mocker.patch(
-            "use_cases.use_case.UserUseCase.get_random_field_indexes",
-            return_value=(1, 1),
-        )
-
-        res: Tuple[Dict[str, Any], int] = use_case.random_play(
-            game_pydantic, 1, user_id=user.id
-        )
-        expected_board = game_pydantic.board["board"]
-        expected_board[0][0] = "X" if game_pydantic.symbol != "X" else "O"
-        expected_response: Dict[str, Any] = {
-            "actual_board": expected_board,
-            "player_sign": game_pydantic.symbol,
-            "credits": user.credits,
-        }
-
-        assert res[0] == expected_response
-        assert res[1] == 200
-
-
-def test_random_play_method_not_possible_move(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.random_play method.
-    Expected to return error, because there is no possible move - board is full
-    """
-
-    user: UserFactory = UserFactory()
-    user_pydantic: UserPydantic = user2pydantic(user)
-    game: GameFactory = GameFactory(
-        board={"board": [["X", "O", "X"], ["O", "X", "O"], ["X", "O", "X"]]}
-    )
-
-    game_pydantic: GamePydantic = game2pydantic(game)
-
-    mocker.patch("use_cases.use_case.UserUseCase.get_user", return_value=user_pydantic)
-
-    mocker.patch(
-        "use_cases.use_case.UserUseCase.get_random_field_indexes", return_value=(1, 1)
-    )
-
-    res: Tuple[Dict[str, str], int] = use_case.random_play(
-        game_pydantic, 1, user_id=user.id
-    )
-
-    assert res[0] == {"error": "Board is full. Game over"}
-    assert res[1] == 400
-
-
-def test_lets_play_method_no_game(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.lets_play method. Expected to return error, because there is no game
-    """
-    mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=None)
-    res: Tuple[Dict[str, str], int] = use_case.lets_play_POST(
-        user_id=1, game_id=1, session_id=1, data={}
-    )
-    assert res[0] == {"error": "Game not found"}
-    assert res[1] == 404
-
-
-def test_lets_play_method_game_not_started(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.lets_play method.
-    Expected to return error, because game is not started
-    """
-
-    game: GameFactory = GameFactory(status="not_started")
-    game_pydantic_list: GameListPydantic = game2pydantic_list(game)
-
-    mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=game_pydantic_list)
-    mocker.patch(
-        "use_cases.use_case.UserUseCase._player_play",
-        return_value=({"error": "Game is not started"}, 400),
-    )
-
-    res: Tuple[Dict[str, str], int] = use_case.lets_play_POST(
-        user_id=1, game_id=1, session_id=1, data={}
-    )
-
-    assert res[0] == {"error": "Game is not started"}
-    assert res[1] == 400
-
-
-def test_lets_play_method_game_finished(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.lets_play method.
-    Expected to return error, because game is finished
-    """
-
-    game: GameFactory = GameFactory(status="finished")
-    game_pydantic_list: GameListPydantic = game2pydantic_list(game)
-
-    mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=game_pydantic_list)
-    mocker.patch("use_cases.use_case.UserUseCase._player_play", return_value=({}, 200))
-    mocker.patch(
-        "use_cases.use_case.UserUseCase.check_game_status", return_value=(True, "X")
-    )
-
-    res: Tuple[Dict[str, str], int] = use_case.lets_play_POST(
-        user_id=1, game_id=1, session_id=1, data={}
-    )
-
-    assert res[0] == "X"
-    assert res[1] == 200
-
-
-def test_lets_play_method_game_in_progress(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.lets_play method.
-    Expected to return game board - status code is 200
-    """
-
-    user: UserFactory = UserFactory()
-    game: GameFactory = GameFactory()
-    game_pydantic_list: GameListPydantic = game2pydantic_list(game)
-    game.board = {"board": [["X", None, "X"], ["O", "X", None], [None, "O", "X"]]}
-
-    random_play_response: Dict[str, Any] = {
-        "actual_board": game.board["board"],
-        "player_sign": game.symbol,
-        "credits": user.credits,
-    }
-
-    mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=game_pydantic_list)
-    mocker.patch("use_cases.use_case.UserUseCase._player_play", return_value=({}, 200))
-    mocker.patch(
-        "use_cases.use_case.UserUseCase.check_game_status", return_value=(False, None)
-    )
-    mocker.patch(
-        "use_cases.use_case.UserUseCase.random_play",
-        return_value=(random_play_response, 200),
-    )
-
-    res: Tuple[Dict[str, str], int] = use_case.lets_play_POST(
-        user_id=1, game_id=1, session_id=1, data={}
-    )
-
-    assert res[0] == random_play_response
-    assert res[1] == 200
-
-
-def test_check_game_status_method_raise_exception(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.check_game_status method.
-    Expected to raise exception because there is no game
-    """
-
-    with pytest.raises(NoGameFoundException):
-        mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=None)
-
-        use_case.check_game_status(session_id=1, game_id=1, user_id=1)
-
-
-def test_check_game_status_method_game_in_progress(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.check_game_status method.
-    Expected to return information, that game is in progress
-    """
-
-    user: UserFactory = UserFactory()
-    user_pydantic: UserPydantic = user2pydantic(user)
-    game: GameFactory = GameFactory()
-    game_pydantic_list: GameListPydantic = game2pydantic_list(game)
-
-    mocker.patch("use_cases.use_case.UserUseCase.get_user", return_value=user_pydantic)
-    mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=game_pydantic_list)
-    mocker.patch(
-        "repos.managers.GridManager.check_game_state", return_value=(False, None)
-    )
-    expected_res: dict = {
-        "status": "game is in progress",
-        "actual_board": game.board["board"],
-        "credits": user.credits,
-        "user_sign": game.symbol,
-    }
-
-    res: Tuple[bool, str] = use_case.check_game_status(
-        session_id=1, game_id=1, user_id=1
-    )
-
-    assert res[1] == expected_res
-    assert res[0] is False
-
-
-def test_check_game_status_method_game_finished_player_win(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.check_game_status method.
-    Expected to update objects and user win
-    """
-
-    class MockRefresh:
-        def __call__(self, obj, **kwargs):
-            """Update obj attributes"""
-            for key, val in kwargs.items():
-                setattr(obj, key, val)
-
-            return obj
-
-    with patch("repos.db_repo.UserDBRepo.update_fields", side_effect=MockRefresh()):
-        with patch(
-            "repos.db_repo.UserSessionDBRepo.update_fields", side_effect=MockRefresh()
-        ):
-            with patch(
-                "repos.db_repo.GameDBRepo.update_fields", side_effect=MockRefresh()
-            ):
-                user: UserFactory = UserFactory()
-                user_pydantic: UserPydantic = user2pydantic(user)
-                game: GameFactory = GameFactory()
-                game_pydantic_list: GameListPydantic = game2pydantic_list(game)
-
-                user_credits: int = user.credits
-
-                session: UserSessionFactory = UserSessionFactory()
-                session_pydantic: UserSessionListPydantic = user_session2pydantic_list(
-                    session
-                )
-
-                mocker.patch(
-                    "use_cases.use_case.UserUseCase.get_session_object",
-                    return_value=session_pydantic,
-                )
-                mocker.patch(
-                    "use_cases.use_case.UserUseCase.get_user",
-                    return_value=user_pydantic,
-                )
-                mocker.patch(
-                    "repos.db_repo.GameDBRepo.filter", return_value=game_pydantic_list
-                )
-                mocker.patch(
-                    "repos.managers.GridManager.check_game_state",
-                    return_value=(True, game.symbol),
-                )
-
-                res: Tuple[bool, str] = use_case.check_game_status(
-                    session_id=1, game_id=1, user_id=1
-                )
-
-                expected_res = {
-                    "status": "You won",
-                    "actual_board": game.board["board"],
-                    "credits": user_pydantic.credits,
-                    "user_sign": game.symbol,
-                }
-
-                assert res[1] == expected_res
-                assert res[0] is True
-                assert session_pydantic.__root__[0].score == 1
-                assert user_pydantic.credits == user_credits + PlayCredits.WIN.value
-                assert (game_res := game_pydantic_list.__root__[0]).status == "finished"
-                assert game_res.winner is True
-
-
-def test_check_game_status_method_game_finished_no_winner(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.check_game_status method.
-    Expected to return information about no winner
-    """
-
-    class MockRefresh:
-        def __call__(self, obj, **kwargs):
-            """Update obj attributes"""
-            for key, val in kwargs.items():
-                setattr(obj, key, val)
-
-            return obj
-
-    with patch("repos.db_repo.GameDBRepo.update_fields", side_effect=MockRefresh()):
-        user: UserFactory = UserFactory()
-        user_pydantic: UserPydantic = user2pydantic(user)
-        game: GameFactory = GameFactory()
-        game_pydantic_list: GameListPydantic = game2pydantic_list(game)
-
-        session: UserSessionFactory = UserSessionFactory()
-        session_pydantic: UserSessionListPydantic = user_session2pydantic_list(session)
-
-        mocker.patch(
-            "use_cases.use_case.UserUseCase.get_session_object",
-            return_value=session_pydantic,
-        )
-        mocker.patch(
-            "use_cases.use_case.UserUseCase.get_user", return_value=user_pydantic
-        )
-        mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=game_pydantic_list)
-        mocker.patch(
-            "repos.managers.GridManager.check_game_state", return_value=(True, None)
-        )
-
-        res: Tuple[bool, str] = use_case.check_game_status(
-            session_id=1, game_id=1, user_id=1
-        )
-
-        expected_res = {
-            "status": "There is no winner",
-            "actual_board": game.board["board"],
-            "credits": user_pydantic.credits,
-            "user_sign": game.symbol,
-        }
-
-        assert res[1] == expected_res
-        assert res[0] is True
-        assert (game_res := game_pydantic_list.__root__[0]).status == "finished"
-        assert game_res.winner is False
-
-
-def test_check_game_status_method_game_finished_player_lost(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.check_game_status method.
-    Expected to update objects and information about user lost
-    """
-
-    class MockRefresh:
-        def __call__(self, obj, **kwargs):
-            """Update obj attributes"""
-            for key, val in kwargs.items():
-                setattr(obj, key, val)
-
-            return obj
-
-    with patch("repos.db_repo.GameDBRepo.update_fields", side_effect=MockRefresh()):
-        user: UserFactory = UserFactory()
-        user_pydantic: UserPydantic = user2pydantic(user)
-        game: GameFactory = GameFactory()
-        game_pydantic_list: GameListPydantic = game2pydantic_list(game)
-
-        session: UserSessionFactory = UserSessionFactory()
-        session_pydantic: UserSessionListPydantic = user_session2pydantic_list(session)
-
-        mocker.patch(
-            "use_cases.use_case.UserUseCase.get_session_object",
-            return_value=session_pydantic,
-        )
-        mocker.patch(
-            "use_cases.use_case.UserUseCase.get_user", return_value=user_pydantic
-        )
-        mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=game_pydantic_list)
-        mocker.patch(
-            "repos.managers.GridManager.check_game_state",
-            return_value=(True, "X" if game.symbol == "O" else "O"),
-        )
-
-        res: Tuple[bool, str] = use_case.check_game_status(
-            session_id=1, game_id=1, user_id=1
-        )
-
-        expected_res = {
-            "status": "You lost",
-            "actual_board": game.board["board"],
-            "credits": user_pydantic.credits,
-            "user_sign": game.symbol,
-        }
-
-        assert res[1] == expected_res
-        assert res[0] is True
-        assert (game_res := game_pydantic_list.__root__[0]).status == "finished"
-        assert game_res.winner is None
-
-
 def test_update_session_status_method(
     use_case: UserUseCase, mocker: "MockerFixture"
 ) -> None:
@@ -1133,59 +671,6 @@ def test_update_session_status_method_no_update(
         assert session_obj.ended_at is None
 
 
-def test_lets_play_get_method_no_game(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.lets_play get method. Expect to return game not found error
-    """
-
-    user: UserFactory = UserFactory()
-    user_pydantic: UserPydantic = user2pydantic(user)
-
-    mocker.patch("use_cases.use_case.UserUseCase.get_user", return_value=user_pydantic)
-    mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=None)
-
-    res: Tuple[GameListPydantic, UserSessionListPydantic] = use_case.lets_play_GET(
-        session_id=1, game_id=1, user_id=1
-    )
-
-    assert res[0] == {"error": "Game not found"}
-    assert res[1] == 404
-
-
-def test_lets_play_get_method_ok(
-    use_case: UserUseCase, mocker: "MockerFixture"
-) -> None:
-    """
-    Test use_case.lets_play get method. Expect to return game information
-    """
-
-    user: UserFactory = UserFactory()
-    user_pydantic: UserPydantic = user2pydantic(user)
-    game: GameFactory = GameFactory()
-    game.board = {"board": ["X", "O", "X", "O", "X", "O", "X", "O", "X"]}
-    game_pydantic: GameListPydantic = game2pydantic_list(game)
-
-    mocker.patch("use_cases.use_case.UserUseCase.get_user", return_value=user_pydantic)
-    mocker.patch("repos.db_repo.GameDBRepo.filter", return_value=game_pydantic)
-
-    res: Tuple[GameListPydantic, UserSessionListPydantic] = use_case.lets_play_GET(
-        session_id=1, game_id=1, user_id=1
-    )
-
-    expected: dict = {
-        "actual_board": game.board["board"],
-        "player_sign": game.symbol,
-        "game": game.id,
-        "session": game.session_id,
-        "credits": user.credits,
-    }
-
-    assert res[0] == expected
-    assert res[1] == 200
-
-
 def test_check_session_status_method_error(
     use_case: UserUseCase, mocker: "MockerFixture"
 ) -> None:
@@ -1236,7 +721,7 @@ def test_check_session_status_session_active(
     """
 
     session: UserSessionFactory = UserSessionFactory(
-        status=SessionStatusStates.ACTIVE.value
+        status=SessionStatusStates.ACTIVE.value, created_at=datetime.now()
     )
     session_pydantic: UserSessionListPydantic = user_session2pydantic_list(session)
 
@@ -1253,6 +738,44 @@ def test_check_session_status_session_active(
     assert res.status_code == 200
 
 
+def test_check_session_status_session_expired(
+    use_case: UserUseCase, mocker: "MockerFixture"
+) -> None:
+    """
+    Test use_case.check_session_status method. Expect active session started
+    longer than MAX_SESSION_LENGTH ago to be finished
+    """
+
+    session: UserSessionFactory = UserSessionFactory(
+        status=SessionStatusStates.ACTIVE.value,
+        created_at=datetime.now() - MAX_SESSION_LENGTH - timedelta(minutes=1),
+    )
+    mocker.patch(
+        "use_cases.use_case.UserUseCase.get_session_object",
+        return_value=user_session2pydantic_list(session),
+    )
+
+    res: SessionStatus = use_case.check_session_status(session_id=1, user_id=1)
+
+    assert res.active is False
+    assert res.session_data == {"message": "Game session is finished"}
+
+
+def test_session_end(use_case: UserUseCase) -> None:
+    """Test use_case.session_end method. Expect end never past maximum length"""
+
+    started: datetime = datetime.now() - MAX_SESSION_LENGTH * 2
+    old: UserSessionPydantic = user_session2pydantic(
+        UserSessionFactory(created_at=started)
+    )
+    new: UserSessionPydantic = user_session2pydantic(
+        UserSessionFactory(created_at=datetime.now())
+    )
+
+    assert use_case.session_end(old) == started + MAX_SESSION_LENGTH
+    assert use_case.session_end(new) - datetime.now() < timedelta(seconds=1)
+
+
 def test_time_spent_method_minutes(use_case: UserUseCase) -> None:
     """Test use_case.time_spent method. Expect to return minutes"""
 
@@ -1303,7 +826,9 @@ def test_get_high_scores_method(use_case: UserUseCase, mocker: "MockerFixture")
     user_session.created_at = datetime.now()
     user_session.ended_at = datetime.now() + timedelta(minutes=10)
 
-    mocker.patch("repos.db_repo.UserSessionDBRepo.all", return_value=[user_session])
+    ended_since = mocker.patch(
+        "repos.db_repo.UserSessionDBRepo.ended_since", return_value=[user_session]
+    )
     time_diff: timedelta = user_session.ended_at - user_session.created_at
 
     result: str
@@ -1327,3 +852,412 @@ def test_get_high_scores_method(use_case: UserUseCase, mocker: "MockerFixture")
 
     assert response == expected_result
     assert status_code == 200
+    today: datetime = datetime.combine(date.today(), time.min)
+    ended_since.assert_called_once_with(
+        ended_after=today, started_after=today - MAX_SESSION_LENGTH
+    )
+
+
+def test_choose_bot_field_hard_difficulty(
+    use_case: UserUseCase, mocker: "MockerFixture"
+) -> None:
+    """
+    Test use_case.choose_bot_field method with hard bot.
+    Expected to return search engine move counted from 1
+    """
+    grid: GridManager = GridManager(GridManager.initialize_grid())
+    best_move = mocker.patch("repos.search.SearchEngine.best_move", return_value=(0, 2))
+
+    res: Tuple[int, int] = use_case.choose_bot_field(grid, "O", Difficulty.HARD.value)
+
+    assert res == (1, 3)
+    best_move.assert_called_once_with(grid.get_board(), "O", 3)
+
+
+def test_choose_bot_field_unbeatable_difficulty(
+    use_case: UserUseCase, mocker: "MockerFixture"
+) -> None:
+    """
+    Test use_case.choose_bot_field method with unbeatable bot.
+    Expected to return policy move counted from 1, without search
+    """
+    grid: GridManager = GridManager([["X", "X", None], [None, "O", None], [None] * 3])
+    policy = mocker.patch("use_cases.use_case.PerfectPlayPolicy")
+    policy.return_value.best_move.return_value = (0, 2)
+    best_move = mocker.patch("repos.search.SearchEngine.best_move")
+
+    res: Tuple[int, int] = use_case.choose_bot_field(
+        grid, "O", Difficulty.UNBEATABLE.value
+    )
+
+    assert res == (1, 3)
+    policy.return_value.best_move.assert_called_once_with(grid.symbol_masks(), "O")
+    best_move.assert_not_called()
+
+
+def test_start_session_method_invalid_difficulty(use_case: UserUseCase) -> None:
+    """Test use_case.start_session method. Expect error for unknown difficulty"""
+
+    res: Tuple[Dict[str, str], int] = use_case.start_session(
+        user_id=1, options=GameOptions(difficulty="impossible")
+    )
+
+    assert res == ({"error": "Invalid difficulty"}, 400)
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        (GameOptions(size=20, win_length=5), "Invalid board size"),
+        (GameOptions(size=2, win_length=2), "Invalid board size"),
+        (GameOptions(size=5, win_length=6), "Invalid line length"),
+        (GameOptions(size=15, win_length=2), "Invalid line length"),
+        (GameOptions("unbeatable", size=4, win_length=3), "Unbeatable bot"),
+    ],
+)
+def test_create_new_game_method_invalid_options(
+    use_case: UserUseCase, options: GameOptions, error: str
+) -> None:
+    """Test use_case.create_new_game method. Expect error for wrong board options"""
+
+    res, status = use_case.create_new_game(user_id=1, session_id=1, options=options)
+
+    assert status == 400
+    assert res["error"].startswith(error)
+
+
+def test_validate_field_indexes_big_board() -> None:
+    """Test use_case.validate_field_indexes method with board size given"""
+
+    _, errors = UserUseCase.validate_field_indexes({"row": 15, "col": 16}, size=15)
+
+    assert errors == {"col": "The number is wrong. Should be between 1 and 15"}
+
+
+@pytest.mark.parametrize("row, col", [(0, 1), ("0", "2"), (1, -1), (4, 3), (2, "4")])
+def test_validate_field_indexes_out_of_board(row: Any, col: Any) -> None:
+    """
+    Test use_case.validate_field_indexes method.
+    Expected error for fields below 1 and above size, also sent as strings
+    """
+
+    _, errors = UserUseCase.validate_field_indexes({"row": row, "col": col}, size=3)
+
+    assert list(errors.values()) == ["The number is wrong. Should be between 1 and 3"]
+
+
+def _play_state(board: list, credits: int = 10, status: str = "active") -> PlayState:
+    user: UserFactory = UserFactory(credits=credits)
+    session: UserSessionFactory = UserSessionFactory(status=status, score=2)
+    game: GameFactory = GameFactory(
+        board={"board": board}, status=GameStatus.IN_PROGRESS.value
+    )
+    return PlayState(
+        user=user2pydantic(user),
+        session=user_session2pydantic(session),
+        game=game2pydantic(game),
+    )
+
+
+def test_play_move_player_and_bot_move(
+    use_case: UserUseCase, mocker: "MockerFixture"
+) -> None:
+    """
+    Test use_case.play_move method.
+    Expected both moves written with one insert and one game update
+    """
+    state: PlayState = _play_state([[None] * 3 for _ in range(3)])
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+    mocker.patch(
+        "use_cases.use_case.UserUseCase.get_random_field_indexes", return_value=(1, 1)
+    )
+    create_many = mocker.patch("repos.db_repo.GameMoveDBRepo.create_many")
+    update_fields = mocker.patch("repos.db_repo.GameDBRepo.update_fields")
+
+    response, status_code = use_case.play_move(1, 1, 1, {"row": 2, "col": 2})
+
+    board: list = [["O", None, None], [None, "X", None], [None, None, None]]
+    assert status_code == 200
+    assert response == {"actual_board": board, "player_sign": "X", "credits": 10}
+    create_many.assert_called_once_with(1, 0, [4, 0])
+    update_fields.assert_called_once_with(obj=state.game, board={"board": board})
+
+
+def test_play_move_player_wins(use_case: UserUseCase, mocker: "MockerFixture") -> None:
+    """
+    Test use_case.play_move method.
+    Expected win paid out, session scored and game finished, without bot move
+    """
+    state: PlayState = _play_state([["X", "X", None], ["O", "O", None], [None] * 3])
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+    add_credits = mocker.patch("repos.db_repo.UserDBRepo.add_credits", return_value=14)
+    create_many = mocker.patch("repos.db_repo.GameMoveDBRepo.create_many")
+    session_update = mocker.patch("repos.db_repo.UserSessionDBRepo.update_fields")
+    game_update = mocker.patch("repos.db_repo.GameDBRepo.update_fields")
+
+    response, status_code = use_case.play_move(1, 1, 1, {"row": 1, "col": 3})
+
+    board: list = [["X", "X", "X"], ["O", "O", None], [None] * 3]
+    assert status_code == 200
+    assert response == {
+        "status": "You won",
+        "actual_board": board,
+        "credits": 14,
+        "user_sign": "X",
+    }
+    create_many.assert_called_once_with(1, 4, [2])
+    add_credits.assert_called_once_with(1, PlayCredits.WIN.value)
+    session_update.assert_called_once_with(state.session, score=3)
+    game_update.assert_called_once_with(
+        obj=state.game,
+        board={"board": board},
+        status=GameStatus.FINISHED.value,
+        winner=True,
+    )
+
+
+def test_play_move_invalid_move(use_case: UserUseCase, mocker: "MockerFixture") -> None:
+    """Test use_case.play_move method. Expected 400 and nothing written"""
+    state: PlayState = _play_state([["X", None, None], [None] * 3, [None] * 3])
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+    create_many = mocker.patch("repos.db_repo.GameMoveDBRepo.create_many")
+    update_fields = mocker.patch("repos.db_repo.GameDBRepo.update_fields")
+
+    response, status_code = use_case.play_move(1, 1, 1, {"row": 1, "col": 1})
+
+    assert status_code == 400
+    assert response["error"] == "Invalid move. Field is taken"
+    create_many.assert_not_called()
+    update_fields.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "data, error",
+    [
+        ({}, {"error": "Invalid request. You didnt sent row and col"}),
+        (
+            {"row": 1, "col": 4},
+            {
+                "status": "error",
+                "error list": {"col": "The number is wrong. Should be between 1 and 3"},
+            },
+        ),
+    ],
+)
+def test_play_move_invalid_fields(
+    use_case: UserUseCase, mocker: "MockerFixture", data: dict, error: dict
+) -> None:
+    """Test use_case.play_move method. Expected 400 for missing or wrong fields"""
+    state: PlayState = _play_state([[None] * 3 for _ in range(3)])
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+    update_fields = mocker.patch("repos.db_repo.GameDBRepo.update_fields")
+
+    assert use_case.play_move(1, 1, 1, data) == (error, 400)
+    update_fields.assert_not_called()
+
+
+@pytest.mark.parametrize("row, col", [("0", "1"), ("1", "0"), (4, 1), (1, 4)])
+def test_play_move_field_out_of_board(
+    use_case: UserUseCase, mocker: "MockerFixture", row: Any, col: Any
+) -> None:
+    """Test use_case.play_move method. Expected 400 for row or col 0 and size + 1"""
+    state: PlayState = _play_state([[None] * 3 for _ in range(3)])
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+    update_fields = mocker.patch("repos.db_repo.GameDBRepo.update_fields")
+
+    response, status_code = use_case.play_move(1, 1, 1, {"row": row, "col": col})
+
+    assert status_code == 400
+    assert response["status"] == "error"
+    update_fields.assert_not_called()
+
+
+def test_play_move_draw(use_case: UserUseCase, mocker: "MockerFixture") -> None:
+    """
+    Test use_case.play_move method.
+    Expected game on full board finished as draw, no credits paid out
+    """
+    board: list = [["X", "O", "X"], ["X", "O", "O"], ["O", "X", None]]
+    state: PlayState = _play_state(board)
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+    add_credits = mocker.patch("repos.db_repo.UserDBRepo.add_credits")
+    mocker.patch("repos.db_repo.GameMoveDBRepo.create_many")
+    game_update = mocker.patch("repos.db_repo.GameDBRepo.update_fields")
+
+    response, status_code = use_case.play_move(1, 1, 1, {"row": 3, "col": 3})
+
+    board[2][2] = "X"
+    assert (response["status"], response["actual_board"]) == (
+        "There is no winner",
+        board,
+    )
+    add_credits.assert_not_called()
+    game_update.assert_called_once_with(
+        obj=state.game,
+        board={"board": board},
+        status=GameStatus.FINISHED.value,
+        winner=False,
+    )
+
+
+def test_play_move_bot_wins_session_finished(
+    use_case: UserUseCase, mocker: "MockerFixture"
+) -> None:
+    """
+    Test use_case.play_move method.
+    Expected lost game, session finished when credits don't pay for next game
+    """
+    state: PlayState = _play_state(
+        [["O", "O", None], ["X", None, None], ["X", None, None]], credits=1
+    )
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+    mocker.patch(
+        "use_cases.use_case.UserUseCase.get_random_field_indexes", return_value=(1, 3)
+    )
+    mocker.patch("repos.db_repo.GameMoveDBRepo.create_many")
+    game_update = mocker.patch("repos.db_repo.GameDBRepo.update_fields")
+    session_update = mocker.patch("repos.db_repo.UserSessionDBRepo.update_fields")
+
+    response, status_code = use_case.play_move(1, 1, 1, {"row": 2, "col": 2})
+
+    assert (response["status"], status_code) == ("You lost", 200)
+    assert game_update.call_args.kwargs["winner"] is None
+    assert session_update.call_args.kwargs["status"] == (
+        SessionStatusStates.FINISHED.value
+    )
+
+
+def test_play_move_game_finished(
+    use_case: UserUseCase, mocker: "MockerFixture"
+) -> None:
+    """
+    Test use_case.play_move method.
+    Expected result of already settled game repeated and nothing written
+    """
+    board: list = [["X", "X", "X"], ["O", "O", None], [None] * 3]
+    state: PlayState = _play_state(board)
+    state.game.status = GameStatus.FINISHED.value
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+    writes: List = [
+        mocker.patch("repos.db_repo.UserDBRepo.add_credits"),
+        mocker.patch("repos.db_repo.UserSessionDBRepo.update_fields"),
+        mocker.patch("repos.db_repo.GameDBRepo.update_fields"),
+        mocker.patch("repos.db_repo.GameMoveDBRepo.create_many"),
+    ]
+
+    response, status_code = use_case.play_move(1, 1, 1, {"row": 3, "col": 3})
+
+    assert (response["status"], status_code) == ("You won", 200)
+    for write in writes:
+        write.assert_not_called()
+
+
+def test_play_move_session_finished(
+    use_case: UserUseCase, mocker: "MockerFixture"
+) -> None:
+    """Test use_case.play_move method. Expected 400 for finished session"""
+    state: PlayState = _play_state(
+        [[None] * 3 for _ in range(3)], status=SessionStatusStates.FINISHED.value
+    )
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+
+    response, status_code = use_case.play_move(1, 1, 1, {"row": 1, "col": 1})
+
+    assert (response, status_code) == ({"message": "Game session is finished"}, 400)
+
+
+def test_play_move_not_found(use_case: UserUseCase, mocker: "MockerFixture") -> None:
+    """
+    Test use_case.play_move method.
+    Expected session error when session isn't loaded, 404 without game
+    """
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=None)
+    mocker.patch(
+        "use_cases.use_case.UserUseCase.check_session_status",
+        side_effect=[
+            SessionStatus(False, {"error": "not found"}, 404),
+            SessionStatus(True, {}, 200),
+        ],
+    )
+
+    assert use_case.play_move(1, 1, 1, {}) == ({"error": "not found"}, 404)
+    assert use_case.play_move(1, 1, 1, {}) == ({"error": "Game not found"}, 404)
+
+
+def test_game_status_in_progress(
+    use_case: UserUseCase, mocker: "MockerFixture"
+) -> None:
+    """Test use_case.game_status method. Expected board details of the game"""
+    state: PlayState = _play_state([["X", None, None], [None] * 3, [None] * 3])
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+
+    response, status_code, etag = use_case.game_status(1, 1, 1)
+
+    assert status_code == 200
+    assert etag == "1.1"
+    assert response == {
+        "actual_board": [["X", None, None], [None] * 3, [None] * 3],
+        "player_sign": "X",
+        "game": 1,
+        "session": 1,
+        "credits": 10,
+    }
+
+
+def test_game_status_not_found(use_case: UserUseCase, mocker: "MockerFixture") -> None:
+    """Test use_case.game_status method. Expected 404 and no ETag without game"""
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=None)
+    mocker.patch(
+        "use_cases.use_case.UserUseCase.check_session_status",
+        return_value=SessionStatus(True, {}, 200),
+    )
+
+    assert use_case.game_status(1, 1, 1) == ({"error": "Game not found"}, 404, None)
+
+
+def test_game_status_finished_never_writes(
+    use_case: UserUseCase, mocker: "MockerFixture"
+) -> None:
+    """
+    Test use_case.game_status method.
+    Expected result of finished game reported, even unsettled one, with no writes
+    """
+    board: list = [["X", "X", "X"], ["O", "O", None], [None] * 3]
+    state: PlayState = _play_state(board)
+    mocker.patch("repos.db_repo.GameDBRepo.load_play", return_value=state)
+    writes: List = [
+        mocker.patch("repos.db_repo.UserDBRepo.add_credits"),
+        mocker.patch("repos.db_repo.UserSessionDBRepo.update_fields"),
+        mocker.patch("repos.db_repo.GameDBRepo.update_fields"),
+        mocker.patch("repos.db_repo.GameMoveDBRepo.create_many"),
+    ]
+
+    response, status_code, _ = use_case.game_status(1, 1, 1)
+
+    assert status_code == 200
+    assert response == {
+        "status": "You won",
+        "actual_board": board,
+        "credits": 10,
+        "user_sign": "X",
+    }
+    for write in writes:
+        write.assert_not_called()
+
+
+def test_game_etag(use_case: UserUseCase, mocker: "MockerFixture") -> None:
+    """
+    Test use_case.game_etag method.
+    Expected ETag of game_status from versions, None when it would be an error
+    """
+    play_versions = mocker.patch(
+        "repos.db_repo.GameDBRepo.play_versions",
+        side_effect=[(3, 7, "active"), (3, 7, "finished"), None],
+    )
+
+    assert use_case.game_etag(1, 1, 1) == use_case.play_etag(3, 7) == "3.7"
+    assert use_case.game_etag(1, 1, 1) is None
+    assert use_case.game_etag(1, 1, 1) is None
+    play_versions.assert_called_with(
+        session_id=1, user_id=1, game_id=1, started_after=ANY
+    )
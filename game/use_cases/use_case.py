@@ -1,7 +1,9 @@
+import json
 import random
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Type
+from datetime import date, datetime, time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 
+from entities.columns import BOARD_KEY
 from entities.entites import (
     GameListPydantic,
     GamePydantic,
@@ -10,11 +12,21 @@ from entities.entites import (
     UserSessionListPydantic,
     UserSessionPydantic,
 )
-from entities.types import GameStatus, SessionStatus, SessionStatusStates
-from repos.db_repo import GameDBRepo, UserDBRepo, UserSessionDBRepo
-from repos.managers import GridManager
-from settings import PlayCredits
-from utils.exceptions import NoGameFoundException
+from entities.types import (
+    Difficulty,
+    GameOptions,
+    GameStatus,
+    PlayState,
+    SessionStatus,
+    SessionStatusStates,
+)
+from repos.archive import SessionArchive
+from repos.db_repo import GameDBRepo, GameMoveDBRepo, UserDBRepo, UserSessionDBRepo
+from repos.managers import MAX_BOARD_SIZE, MIN_BOARD_SIZE, GridManager
+from repos.outcomes import BOARD_SIZE
+from repos.policy import PerfectPlayPolicy
+from repos.search import SearchEngine
+from settings import MAX_SESSION_LENGTH, PlayCredits, settings
 
 
 class UserUseCase:
@@ -23,11 +35,28 @@ class UserUseCase:
         db_repo: Type[UserDBRepo],
         user_session_repo: Type[UserSessionDBRepo],
         game_db_repo: Type[GameDBRepo],
+        move_db_repo: Type[GameMoveDBRepo] = GameMoveDBRepo,
+        archive: Optional[SessionArchive] = None,
     ):
         self.db_repo: UserDBRepo = db_repo()
         self.user_session_repo: UserSessionDBRepo = user_session_repo()
         self.grid_manager: Type[GridManager] = GridManager
         self.game_db_repo: GameDBRepo = game_db_repo()
+        self.move_db_repo: GameMoveDBRepo = move_db_repo()
+        # finished sessions moved out of the database, see repos.archive
+        self.archive: SessionArchive = archive or SessionArchive()
+        # One engine per worker, so its transposition table outlives requests
+        self.search_engine: SearchEngine = SearchEngine(
+            table_size=settings.bot.table_size, time_budget=settings.bot.time_budget
+        )
+        self._policy: Optional[PerfectPlayPolicy] = None
+
+    @property
+    def policy(self) -> PerfectPlayPolicy:
+        """Perfect play policy, mapped on first use, pages are shared by workers."""
+        if self._policy is None:
+            self._policy = PerfectPlayPolicy(settings.bot.policy_path)
+        return self._policy
 
     def create_or_400(self, player_data: dict) -> Tuple[dict, int]:
         """Create new user or return 400 if user already exists."""
@@ -68,19 +97,47 @@ class UserUseCase:
 
         return {"error": "User not found"}, 404
 
-    def start_session(self, user_id: int) -> Tuple[dict, int]:
+    @staticmethod
+    def validate_game_options(options: GameOptions) -> Optional[str]:
+        """Validate options of new game. Return error message if any is wrong."""
+        if options.difficulty not in {level.value for level in Difficulty}:
+            return "Invalid difficulty"
+        if not MIN_BOARD_SIZE <= options.size <= MAX_BOARD_SIZE:
+            return (
+                f"Invalid board size. Should be between {MIN_BOARD_SIZE} "
+                f"and {MAX_BOARD_SIZE}"
+            )
+        if not MIN_BOARD_SIZE <= options.win_length <= options.size:
+            return (
+                f"Invalid line length. Should be between {MIN_BOARD_SIZE} "
+                "and board size"
+            )
+        if options.difficulty == Difficulty.UNBEATABLE.value and (
+            options.size != BOARD_SIZE or options.win_length != BOARD_SIZE
+        ):
+            return "Unbeatable bot plays only on 3x3 board"
+        return None
+
+    def start_session(
+        self, user_id: int, options: GameOptions = GameOptions()
+    ) -> Tuple[dict, int]:
         """
         Start new game session. User shouldn't have more than one active session,
         that's why we check if there is an active one. Expected is return of
         active session or create new one. With session, we create new game.
         """
+        if error := self.validate_game_options(options):
+            return {"error": error}, 400
+
         user: UserPydantic | None = self.get_user(id=user_id)
 
         if not user:
             return {"error": "User not found"}, 404
 
         session: UserSessionListPydantic | None = self.user_session_repo.filter(
-            user_id=user_id, status=SessionStatusStates.ACTIVE.value
+            user_id=user_id,
+            status=SessionStatusStates.ACTIVE.value,
+            created_at__gte=self.started_after(),
         )
         if session and session.__root__:
             message: str = f"Session already started with id {session.__root__[0].id}"
@@ -102,30 +159,39 @@ class UserUseCase:
             )
             return {"error": message, "session_detail": session_detail}, 400
 
+        credits: Optional[int] = self.db_repo.debit_credits(
+            user.id, PlayCredits.PLAY.value
+        )
+        if credits is None:
+            return {"error": "Not enough credits. Game cannot start"}, 400
+
         new_session: UserSessionPydantic = self.user_session_repo.create(
             user_id=user.id
         )
-        new_board: list = self.grid_manager.initialize_grid()
+        new_board: list = self.grid_manager.initialize_grid(options.size)
         game: GamePydantic = self.game_db_repo.create(
             user_id=user.id,
             session_id=new_session.id,
-            board={"new_board": new_board},
+            board={BOARD_KEY: new_board},
             status=GameStatus.IN_PROGRESS.value,
+            **options._asdict(),
         )
 
-        user.credits -= PlayCredits.PLAY.value
-        self.db_repo.update_fields(obj=user, credits=user.credits)
-
         result: dict = new_session.dict()
         result.update({"game_id": game.id})
         result.update({"message": "Game session started"})
         return result, 200
 
-    def create_new_game(self, user_id: int, session_id: int) -> Tuple[dict, int]:
+    def create_new_game(
+        self, user_id: int, session_id: int, options: GameOptions = GameOptions()
+    ) -> Tuple[dict, int]:
         """
         Create new game object with empty board, or return existing one.
         Link game to session.
         """
+        if error := self.validate_game_options(options):
+            return {"error": error}, 400
+
         user: UserPydantic | None = self.get_user(id=user_id)
 
         if not user:
@@ -133,7 +199,9 @@ class UserUseCase:
 
         # Check if there is active session with given id
         user_session: UserSessionListPydantic = self.user_session_repo.filter(
-            user_id=user.id, status=SessionStatusStates.ACTIVE.value
+            user_id=user.id,
+            status=SessionStatusStates.ACTIVE.value,
+            created_at__gte=self.started_after(),
         )
         if not user_session or not user_session.__root__:
             return {"error": "No active session found"}, 400
@@ -155,20 +223,21 @@ class UserUseCase:
         if session_obj.status == SessionStatusStates.FINISHED.value:
             return {"error": "Session already finished"}, 400
 
-        # Check if user has enough credits to start new game
-        if user.credits < PlayCredits.PLAY.value:
+        # Pay for new game, debit fails when there is not enough credits
+        credits: Optional[int] = self.db_repo.debit_credits(
+            user.id, PlayCredits.PLAY.value
+        )
+        if credits is None:
             self.update_session_status(session_id=session_obj.id, user_id=user.id)
             return {"error": "Not enough credits. Game cannot start"}, 400
 
-        user.credits -= PlayCredits.PLAY.value
-        self.db_repo.update_fields(obj=user, credits=user.credits)
-
-        new_board: list = self.grid_manager.initialize_grid()
+        new_board: list = self.grid_manager.initialize_grid(options.size)
         game: GamePydantic = self.game_db_repo.create(
             user_id=user.id,
             session_id=session_obj.id,
-            board={"new_board": new_board},
+            board={BOARD_KEY: new_board},
             status=GameStatus.IN_PROGRESS.value,
+            **options._asdict(),
         )
         return {
             "game_details": game.dict(
@@ -178,18 +247,39 @@ class UserUseCase:
             )
         }, 200
 
+    @staticmethod
+    def started_after() -> datetime:
+        """Earliest start of session not finished yet, see MAX_SESSION_LENGTH."""
+        return datetime.now() - MAX_SESSION_LENGTH
+
+    @staticmethod
+    def session_end(session: UserSessionPydantic) -> datetime:
+        """End time of finishing session, never past its maximum length."""
+        now: datetime = datetime.now()
+        if session.created_at is None:
+            return now
+        return min(now, session.created_at + MAX_SESSION_LENGTH)
+
     def get_session_object(
         self, session_id: int, user_id: int
     ) -> UserSessionListPydantic | None:
-        """Get session object by id and user id."""
+        """
+        Get session object by id and user id. Session moved to archive is
+        read back from there. Any past session may be asked for, so the
+        lookup is not bounded by created_at; moves don't go through it.
+        """
         session: UserSessionListPydantic | None = self.user_session_repo.filter(
             id=session_id, user_id=user_id
         )
+        if session is None and (
+            record := self.archive.find_session(user_id, session_id)
+        ):
+            session = UserSessionListPydantic.from_rows([record["session"]])
         return session
 
     @staticmethod
-    def validate_field_indexes(fields: dict) -> Tuple[list, dict]:
-        """Validate field indexes. Check if they are in range 1-3."""
+    def validate_field_indexes(fields: dict, size: int = 3) -> Tuple[list, dict]:
+        """Validate field indexes. Check if they are in range 1-size."""
         errors: dict = {}
         check_range: bool = True
         row: int = fields.get("row")
@@ -208,205 +298,264 @@ class UserUseCase:
             errors.update({"col": "Should be integer, not object or string"})
 
         if check_range:
-            if row > 3 or row < 0:
-                errors.update({"row": "The number is wrong. Should be between 1 and 3"})
-            if col > 3 or col < 0:
-                errors.update({"col": "The number is wrong. Should be between 1 and 3"})
+            message: str = f"The number is wrong. Should be between 1 and {size}"
+            if row > size or row < 1:
+                errors.update({"row": message})
+            if col > size or col < 1:
+                errors.update({"col": message})
 
         return [row, col], errors
 
-    def _player_play(
-        self, data: dict, user_game: GamePydantic
-    ) -> Tuple[List[List[str | None]], int] | Tuple[dict, int]:
-        """
-        Validate fields, make move on board. Check if move is possible.
-        Return updated board.
-        """
-
-        row = data.get("row")
-        col = data.get("col")
-        if not row or not col:
+    def _move_error(
+        self, data: dict, user_game: GamePydantic, user_board: GridManager
+    ) -> Optional[Tuple[dict, int]]:
+        """Return error response for invalid player move, None for valid one."""
+        if not data.get("row") or not data.get("col"):
             return {"error": "Invalid request. You didnt sent row and col"}, 400
-        _, errors = self.validate_field_indexes(data)
+        (row, col), errors = self.validate_field_indexes(data, user_game.size)
         if errors:
             return {"status": "error", "error list": errors}, 400
-
-        key: str = list(user_game.board.keys())[0]
-        board_list: list = list(user_game.board.values())[0]
-
-        user_board: GridManager = self.grid_manager(board_list)
         if not user_board.is_move_possible(row - 1, col - 1):
             return {
                 "error": "Invalid move. Field is taken",
                 "actual_board": user_board.get_board(),
                 "player_sign": user_game.symbol,
             }, 400
+        return None
 
-        user_board.make_move(row - 1, col - 1, user_game.symbol)
-        self.game_db_repo.update_fields(
-            obj=user_game, board={key: user_board.get_board()}
-        )
-        return user_board.get_board(), 200
-
-    def random_play(
-        self, user_game: GamePydantic, session_id: int, user_id: int
-    ) -> Tuple[List[List[str | None]], int] | Tuple[dict, int]:
-        """Make random play for second player."""
-
-        user: UserPydantic | None = self.get_user(id=user_id)
-
-        row, col = self.get_random_field_indexes()
-
-        key: str = list(user_game.board.keys())[0]
-        board_list: list = list(user_game.board.values())[0]
-
-        user_board: GridManager = self.grid_manager(board_list)
-
-        if user_board.is_full():
-            return {"error": "Board is full. Game over"}, 400
-
-        while not user_board.is_move_possible(row - 1, col - 1):
-            row, col = self.get_random_field_indexes()
-
-        if user_game.symbol == "X":
-            user_board.make_move(row - 1, col - 1, "O")
-        else:
-            user_board.make_move(row - 1, col - 1, "X")
-
-        self.game_db_repo.update_fields(
-            obj=user_game, board={key: user_board.get_board()}
+    def _load_play(
+        self, session_id: int, user_id: int, game_id: int
+    ) -> Tuple[Optional[PlayState], Optional[Tuple[dict, int]]]:
+        """
+        Load user, session and game with one joined query. Return the state,
+        or error response if session or game is missing or session finished.
+        """
+        state: Optional[PlayState] = self.game_db_repo.load_play(
+            session_id=session_id,
+            user_id=user_id,
+            game_id=game_id,
+            started_after=self.started_after(),
         )
+        if state is None or state.game is None:
+            # only error path reads the session again, it may be archived
+            session_status: SessionStatus = self.check_session_status(
+                session_id, user_id
+            )
+            if not session_status.active:
+                return None, (session_status.session_data, session_status.status_code)
+            return None, ({"error": "Game not found"}, 404)
+        if state.session.status == SessionStatusStates.FINISHED.value:
+            return None, ({"message": "Game session is finished"}, 400)
+        return state, None
 
-        return {
-            "actual_board": user_board.get_board(),
-            "player_sign": user_game.symbol,
-            "credits": user.credits,
-        }, 200
+    @staticmethod
+    def play_etag(game_version: int, user_version: int) -> str:
+        """ETag of game status, it shows the game and credits of the user."""
+        return f"{game_version}.{user_version}"
 
-    def lets_play_POST(self, session_id: int, user_id: int, game_id: int, data: dict):
+    def game_etag(self, session_id: int, user_id: int, game_id: int) -> Optional[str]:
         """
-        Make move on board. Check if move is possible. Return updated board.
-        Basically this is a main function for playing.
+        ETag game_status would return, read from row versions only. None when
+        game_status answers with an error.
         """
-
-        user_game: GameListPydantic | None = self.game_db_repo.filter(
-            user_id=user_id, session_id=session_id, id=game_id
+        versions: Optional[Tuple[int, int, str]] = self.game_db_repo.play_versions(
+            session_id=session_id,
+            user_id=user_id,
+            game_id=game_id,
+            started_after=self.started_after(),
         )
-        if not user_game or not user_game.__root__:
-            return {"error": "Game not found"}, 404
-
-        user_game_obj: GamePydantic = user_game.__root__[0]
-
-        response: Tuple[List[List[str | None]], int] | Tuple[dict, int]
-        status_code: int
-
-        # player play
-        response, status_code = self._player_play(data, user_game_obj)
-        if status_code != 200:
-            return response, status_code
-
-        is_finished, winner = self.check_game_status(
-            session_id, user_id, game_id=game_id
+        if versions is None:
+            return None
+        game_version, user_version, session_status = versions
+        if session_status == SessionStatusStates.FINISHED.value:
+            return None
+        return self.play_etag(game_version, user_version)
+
+    def account_etag(self, user_id: int) -> Optional[str]:
+        """ETag of account details read from user row version only."""
+        version: Optional[int] = self.db_repo.version(user_id)
+        return str(version) if version is not None else None
+
+    def game_status(
+        self, session_id: int, user_id: int, game_id: int
+    ) -> Tuple[dict, int, Optional[str]]:
+        """
+        Game status for GET requests, read with one joined query and never
+        written. Finished game was already settled by the move which ended
+        it, see play_move, so polling only reports the result. Return
+        response, status code and ETag, None for errors.
+        """
+        state, error = self._load_play(session_id, user_id, game_id)
+        if error:
+            return (*error, None)
+        etag: str = self.play_etag(state.game.version, state.user.version)
+
+        game: GamePydantic = state.game
+        board: GridManager = self.grid_manager(
+            list(game.board.values())[0], game.win_length
         )
+        is_finished, winner = board.check_game_state()
         if is_finished:
-            return winner, 200
-
-        # random play
-        response, status_code = self.random_play(user_game_obj, session_id, user_id)
-
-        is_finished, winner = self.check_game_status(
-            session_id, user_id, game_id=game_id
+            message: dict = self.result_message(game, board, winner, state.user.credits)
+            return message, 200, etag
+        return (
+            {
+                "actual_board": board.get_board(),
+                "player_sign": game.symbol,
+                "game": game.id,
+                "session": game.session_id,
+                "credits": state.user.credits,
+            },
+            200,
+            etag,
         )
-        if is_finished:
-            return winner, 200
-
-        return response, status_code
 
     @staticmethod
-    def get_random_field_indexes() -> Tuple[int, int]:
-        """Get random field indexes. Method used for computer move."""
-        row: int = random.randint(1, 3)
-        col: int = random.randint(1, 3)
-        return row, col
-
-    def check_game_status(self, session_id: int, user_id: int, game_id: int):
-        """Check if game is finished. Return winner if exists."""
+    def result_message(
+        game: GamePydantic, board: GridManager, winner: Optional[str], credits: int
+    ) -> dict:
+        """Response about finished game."""
+        status: str = "You lost"
+        if winner == game.symbol:
+            status = "You won"
+        elif winner is None:
+            status = "There is no winner"
+        return {
+            "status": status,
+            "actual_board": board.get_board(),
+            "credits": credits,
+            "user_sign": game.symbol,
+        }
 
-        user_game: GameListPydantic | None = self.game_db_repo.filter(
-            user_id=user_id, session_id=session_id, id=game_id
+    def play_move(
+        self, session_id: int, user_id: int, game_id: int, data: dict
+    ) -> Tuple[dict, int]:
+        """
+        Handle move request on a single joined load of user, session and
+        game. Checks, player move, bot move and the result run in memory,
+        changes are written once at the end. Game row is written only at the
+        version it was loaded at; StaleGameException of a concurrent move
+        rolls back the whole unit of work.
+        """
+        state, error = self._load_play(session_id, user_id, game_id)
+        if error:
+            return error
+
+        game: GamePydantic = state.game
+        key: str = list(game.board.keys())[0]
+        board: GridManager = self.grid_manager(
+            list(game.board.values())[0], game.win_length
         )
-        if not user_game:
-            raise NoGameFoundException
-
-        user_game_obj: GamePydantic = user_game.__root__[0]
-
-        board_list: list = list(user_game_obj.board.values())[0]
+        cells: List[int] = []
+        first_ply: int = bin(board.occupied()).count("1")
+        is_finished, winner = board.check_game_state()
+        if not is_finished:
+            cells, error = self._play_round(data, game, board)
+            if error:
+                return error
+            is_finished, winner = board.check_game_state()
+
+        fields: dict = {"board": {key: board.get_board()}} if cells else {}
+        if is_finished and game.status != GameStatus.FINISHED.value:
+            fields.update(
+                status=GameStatus.FINISHED.value,
+                winner=self.winner_value(game, winner),
+            )
+        if fields:
+            # game row goes first: concurrent move of the same game waits for
+            # its lock and fails on version, before any other write is made
+            self.game_db_repo.update_fields(obj=game, **fields)
+        if cells:
+            self.move_db_repo.create_many(game.id, first_ply, cells)
+        if is_finished:
+            return self._settle_game(state, board, winner), 200
+        return {
+            "actual_board": board.get_board(),
+            "player_sign": game.symbol,
+            "credits": state.user.credits,
+        }, 200
 
-        user_board: GridManager = self.grid_manager(board_list)
-        is_finished, winner = user_board.check_game_state()
-        user: UserPydantic | None = self.get_user(id=user_id)
+    def _play_round(
+        self, data: dict, game: GamePydantic, board: GridManager
+    ) -> Tuple[List[int], Optional[Tuple[dict, int]]]:
+        """
+        Make player move and bot answer, unless player move ends the game.
+        Return cells of moves made, or error response of invalid player move.
+        """
+        if error := self._move_error(data, game, board):
+            return [], error
+        (row, col), _ = self.validate_field_indexes(data, game.size)
+        board.make_move(row - 1, col - 1, game.symbol)
+        cells: List[int] = [(row - 1) * board.size + col - 1]
+        if not board.check_game_state()[0]:
+            bot_symbol: str = "O" if game.symbol == "X" else "X"
+            row, col = self.choose_bot_field(board, bot_symbol, game.difficulty)
+            board.make_move(row - 1, col - 1, bot_symbol)
+            cells.append((row - 1) * board.size + col - 1)
+        return cells, None
+
+    def _settle_game(
+        self, state: PlayState, board: GridManager, winner: Optional[str]
+    ) -> dict:
+        """
+        Pay out finished game of the loaded state, unless it is settled
+        already. Return result message.
+        """
+        user: UserPydantic = state.user
+        settle: bool = state.game.status != GameStatus.FINISHED.value
+        if settle and winner == state.game.symbol:
+            user.credits = self.db_repo.add_credits(user.id, PlayCredits.WIN.value)
+            self.user_session_repo.update_fields(
+                state.session, score=(state.session.score or 0) + 1
+            )
+        elif (
+            settle
+            and winner not in (None, state.game.symbol)
+            and user.credits < PlayCredits.PLAY.value
+        ):
+            self.user_session_repo.update_fields(
+                state.session,
+                status=SessionStatusStates.FINISHED.value,
+                ended_at=self.session_end(state.session),
+            )
+        return self.result_message(state.game, board, winner, user.credits)
 
-        message: dict = {
-            "status": "game is in progress",
-            "actual_board": user_board.get_board(),
-            "credits": user.credits,
-            "user_sign": user_game_obj.symbol,
-        }
-        winner_res: Optional[bool]
+    @staticmethod
+    def winner_value(game: GamePydantic, winner: Optional[str]) -> Optional[bool]:
+        """Winner column of finished game: True won, False draw, None lost."""
+        if winner == game.symbol:
+            return True
+        return False if winner is None else None
+
+    def choose_bot_field(
+        self, user_board: GridManager, symbol: str, difficulty: str
+    ) -> Tuple[int, int]:
+        """
+        Choose computer move on not full board. Easy bot picks random free field,
+        hard one asks search engine and unbeatable one reads the precomputed
+        policy. Return row and col counted from 1.
+        """
+        if difficulty == Difficulty.UNBEATABLE.value:
+            row, col = self.policy.best_move(user_board.symbol_masks(), symbol)
+            return row + 1, col + 1
 
-        if is_finished:
-            if winner == user_game_obj.symbol:
-                user_game_obj.winner = user_game_obj.user_id
-                if (
-                    user
-                    and user_game.__root__[0]
-                    and user_game_obj.status != GameStatus.FINISHED.value
-                ):
-                    user.credits += PlayCredits.WIN.value
-                    self.db_repo.update_fields(obj=user, credits=user.credits)
-                    session: UserSessionListPydantic = self.get_session_object(
-                        user_id=user_id, session_id=session_id
-                    )
-                    if session_obj := session.__root__[0]:
-                        self.user_session_repo.update_fields(
-                            session_obj, score=session_obj.score + 1
-                        )
+        if difficulty == Difficulty.HARD.value:
+            row, col = self.search_engine.best_move(
+                user_board.get_board(), symbol, user_board.win_length
+            )
+            return row + 1, col + 1
 
-                message = {
-                    "status": "You won",
-                    "actual_board": user_board.get_board(),
-                    "credits": user.credits,
-                    "user_sign": user_game_obj.symbol,
-                }
-                winner_res = True
-
-            elif winner is None:
-                message = {
-                    "status": "There is no winner",
-                    "actual_board": user_board.get_board(),
-                    "credits": user.credits,
-                    "user_sign": user_game_obj.symbol,
-                }
-                winner_res = False
-
-            else:
-                if user.credits < PlayCredits.PLAY.value:
-                    self.update_session_status(session_id=session_id, user_id=user_id)
-                message = {
-                    "status": "You lost",
-                    "actual_board": user_board.get_board(),
-                    "credits": user.credits,
-                    "user_sign": user_game_obj.symbol,
-                }
-                winner_res = None
-            if user_game_obj.status != GameStatus.FINISHED.value:
-                self.game_db_repo.update_fields(
-                    obj=user_game_obj,
-                    winner=winner_res,
-                    status=GameStatus.FINISHED.value,
-                )
+        row, col = self.get_random_field_indexes(user_board.size)
+        while not user_board.is_move_possible(row - 1, col - 1):
+            row, col = self.get_random_field_indexes(user_board.size)
+        return row, col
 
-        return is_finished, message
+    @staticmethod
+    def get_random_field_indexes(size: int = 3) -> Tuple[int, int]:
+        """Get random field indexes. Method used for computer move."""
+        row: int = random.randint(1, size)
+        col: int = random.randint(1, size)
+        return row, col
 
     def update_session_status(self, session_id: int, user_id: int):
         """
@@ -430,31 +579,50 @@ class UserUseCase:
             self.user_session_repo.update_fields(
                 obj=session.__root__[0],
                 status=SessionStatusStates.FINISHED.value,
-                ended_at=datetime.now(),
+                ended_at=self.session_end(session.__root__[0]),
             )
 
-    def lets_play_GET(self, user_id: int, session_id: int, game_id: int):
-        """Get game status."""
-
-        user: UserPydantic | None = self.get_user(id=user_id)
+    def replay(
+        self, session_id: int, user_id: int, game_id: int
+    ) -> Tuple[Iterator[str], int] | Tuple[dict, int]:
+        """
+        Return game moves as NDJSON lines, one move per line with row and col
+        counted from 1. Lines are produced while moves are read from DB.
+        Archived game is replayed from the archive.
+        """
         game_instance: GameListPydantic | None = self.game_db_repo.filter(
             user_id=user_id, session_id=session_id, id=game_id
         )
-        if not game_instance or not game_instance.__root__:
+        moves: Iterable[Tuple[int, int]]
+        if game_instance and game_instance.__root__:
+            game: GamePydantic = game_instance.__root__[0]
+            moves = self.move_db_repo.stream(game.id)
+        elif archived := self.archive.find_game(user_id, session_id, game_id):
+            game = GamePydantic.from_row(archived)
+            moves = archived["moves"]
+        else:
             return {"error": "Game not found"}, 404
 
-        board_list: list = list(game_instance.__root__[0].board.values())[0]
-        result: dict = {
-            "actual_board": self.grid_manager(board_list).get_board(),
-            "player_sign": (game_obj := game_instance.__root__[0]).symbol,
-            "game": game_obj.id,
-            "session": game_obj.session_id,
-            "credits": user.credits,
-        }
-        return result, 200
+        symbols: Tuple[str, str] = (game.symbol, "O" if game.symbol == "X" else "X")
+
+        def lines() -> Iterator[str]:
+            for ply, cell in moves:
+                row, col = divmod(cell, game.size)
+                move: dict = {
+                    "ply": ply,
+                    "row": row + 1,
+                    "col": col + 1,
+                    "symbol": symbols[ply % 2],
+                }
+                yield json.dumps(move) + "\n"
+
+        return lines(), 200
 
     def check_session_status(self, session_id: int, user_id: int):
-        """Check session status. Return SessionStatus object"""
+        """
+        Check session status. Session past MAX_SESSION_LENGTH is finished.
+        Return SessionStatus object
+        """
 
         session: UserSessionListPydantic | None = self.get_session_object(
             session_id, user_id
@@ -463,15 +631,18 @@ class UserUseCase:
             return SessionStatus(
                 False, {"error": "Game session not found for requested user"}, 404
             )
-        if (
-            session
-            and session.__root__
-            and session.__root__[0].status == SessionStatusStates.FINISHED.value
-        ):
+        if session and session.__root__ and self.session_expired(session.__root__[0]):
             return SessionStatus(False, {"message": "Game session is finished"}, 400)
 
         return SessionStatus(True, session.dict(), 200)
 
+    @classmethod
+    def session_expired(cls, session: UserSessionPydantic) -> bool:
+        """Whether session is finished or past its maximum length."""
+        return session.status == SessionStatusStates.FINISHED.value or (
+            session.created_at is not None and session.created_at < cls.started_after()
+        )
+
     @staticmethod
     def time_played(start_time: datetime, end_time: Optional[datetime]) -> str:
         """Calculate time played in minutes or seconds"""
@@ -491,7 +662,12 @@ class UserUseCase:
         return email[:3] + "****" + email[-3:]
 
     def get_high_scores(self):
-        """Get high scores for all users for today"""
+        """
+        Get high scores for all users for today. Sessions end within
+        MAX_SESSION_LENGTH, so only ones started since that long before today
+        are read.
+        """
+        today: datetime = datetime.combine(date.today(), time.min)
         data: List[Dict[str, Any]] = [
             {
                 "date": obj.ended_at.strftime("%d-%m-%Y")
@@ -501,7 +677,8 @@ class UserUseCase:
                 "user": self.anonymize_email(obj.user.email),
                 "time_played": self.time_played(obj.created_at, obj.ended_at),
             }
-            for obj in self.user_session_repo.all(desc=True)
-            if obj.ended_at.date() == datetime.now().date()
+            for obj in self.user_session_repo.ended_since(
+                ended_after=today, started_after=today - MAX_SESSION_LENGTH
+            )
         ]
         return data, 200
@@ -15,3 +15,7 @@ class ShouldBeCalledOnInstanceException(CustomBaseException):
 
 class NoGameFoundException(CustomBaseException):
     default_message = "No game found in DB"
+
+
+class StaleGameException(CustomBaseException):
+    default_message = "Game was changed by another request, reload it and try again"
@@ -0,0 +1,67 @@
+"""
+Connection pool with checkout telemetry.
+
+InstrumentedPool is QueuePool which measures how long callers wait for a
+connection and counts pool timeouts. Its stats are served live by
+/internal/pool; slow checkouts are logged as warnings and timeouts as errors,
+both with the stats of that moment, so pool exhaustion under burst load shows
+up in logs too.
+"""
+import logging
+import threading
+import time
+from typing import Dict
+
+from settings import settings
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class InstrumentedPool(QueuePool):
+    """QueuePool counting checkouts, their wait time and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock: threading.Lock = threading.Lock()
+        self.checkouts: int = 0
+        self.timeouts: int = 0
+        self.wait_total: float = 0.0
+        self.wait_max: float = 0.0
+
+    def connect(self):
+        start: float = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self._record(time.perf_counter() - start, timed_out=True)
+            logger.error("Connection pool timed out: %s", self.stats())
+            raise
+        waited: float = time.perf_counter() - start
+        self._record(waited)
+        if waited >= settings.db.pool_slow_checkout:
+            logger.warning("Waited %.3f s for connection: %s", waited, self.stats())
+        return connection
+
+    def _record(self, waited: float, timed_out: bool = False) -> None:
+        with self._stats_lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> Dict[str, float]:
+        """Return live pool numbers, wait times in milliseconds."""
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            # QueuePool counts unused pool slots as negative overflow
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / (self.checkouts or 1) * 1000, 3),
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }